@@ -1 +1,12 @@
+from ._cache import FitCache, get_fit_cache, set_fit_cache
+from ._graph import invalidate_compiled_graph
+from ._instrument import (
+    JsonlSink,
+    LoggingSink,
+    MemorySink,
+    get_instrumentation,
+    instrument_labels,
+    set_instrumentation,
+)
+from ._plan import FeaturePlan, GraphFeatureUnion
 from .sampling import GraphSampler
@@ -1,3 +1,4 @@
+import numbers
 import re
 
 import networkx as nx
@@ -6,6 +7,15 @@ import pandas as pd
 from sklearn.base import BaseEstimator, TransformerMixin
 from sklearn.utils import check_array
 
+from ._cache import cached_fit
+from ._global import clustering_statistics, degree_assortativity, degree_moments
+from ._graph import compile_graph
+from ._index import INDEX_DTYPES
+from ._instrument import instrumented
+from ._neighborhood import DEFAULT_CHUNK_SIZE, NEIGHBORHOOD_SCORES, neighborhood_scores
+from ._parallel import DEFAULT_BLOCK_SIZE, can_start_workers, parallel_transform
+from ._paths import diameter_bounds
+
 # TODO: Add check fitted
 
 
@@ -14,18 +24,193 @@ def camel_to_snake_case(input_str):
     return re.sub(r"([a-z0-9])([A-Z])", r"\1_\2", s1).lower()
 
 
+class SharedBatch:
+    """Rows of X together with the per-batch primitives derived from them.
+
+    Scorers accept a batch wherever they accept X. The validated node columns, the node
+    indices of X in every compiled graph and the neighborhood scores of its pairs are
+    computed on first use and then shared by every scorer transforming the batch. ``neighborhood``
+    computes the union of the scores in ``requirements``, which maps compiled graphs to
+    the score names needed by their scorers, in one pass per graph.
+    """
+
+    def __init__(self, X, requirements=None, chunk_size=DEFAULT_CHUNK_SIZE):
+        self.X = X
+        self.requirements = {} if requirements is None else requirements
+        self.chunk_size = chunk_size
+        self._columns = None
+        self._dataset = None
+        self._values = {}
+
+    def _shared(self, graph, name, compute):
+        key = (id(graph), name)
+        if key not in self._values:
+            # keep the graph alive so that its id is not reused within the batch
+            self._values[key] = (graph, compute())
+        return self._values[key][1]
+
+    def columns(self):
+        if self._columns is None:
+            self._columns = node_columns(self.X)
+        return self._columns
+
+    def dataset(self):
+        if self._dataset is None:
+            self._dataset = as_dataset(self.columns())
+        return self._dataset
+
+    def node_indices(self, graph):
+        return self._shared(graph, "node_indices", lambda: graph.encode(self.columns())[:, 0])
+
+    def pairs(self, graph):
+        return self._shared(graph, "pairs", lambda: encode_pair_columns(graph, self.columns()))
+
+    def neighborhood(self, graph):
+        names = self.requirements.get(graph, ())
+        scores = tuple(name for name in NEIGHBORHOOD_SCORES if name in names)
+        return self._shared(
+            graph,
+            "neighborhood",
+            lambda: neighborhood_scores(graph, self.pairs(graph), scores, self.chunk_size),
+        )
+
+
+def is_node_array(X):
+    """Whether X is a non-empty C-contiguous int32/int64 array of one or two node columns."""
+    return (
+        isinstance(X, np.ndarray)
+        and X.dtype in INDEX_DTYPES
+        and X.ndim == 2
+        and X.shape[0] > 0
+        and X.shape[1] in (1, 2)
+        and X.flags.c_contiguous
+    )
+
+
+def node_columns(X, estimator=None):
+    """Validated (n_rows, 1) ``node_i`` or (n_rows, 2) ``node_i``/``node_j`` array of X.
+
+    A :func:`is_node_array` X is returned as is, without validation or copy, so that the
+    compiled graphs recognize it and check its node range once, see
+    :meth:`CompiledGraph.encode`.
+    """
+    if is_node_array(X):
+        return X
+    X = check_array(X, accept_large_sparse=False, dtype=None, estimator=estimator)
+    if X.shape[1] not in (1, 2):
+        raise ValueError("Bad input shape")
+    return X
+
+
+def encode_pair_columns(graph, columns):
+    if columns.shape[1] != 2:
+        raise ValueError("Pairwise scorers need node_i and node_j columns")
+    return graph.encode(columns)
+
+
+def as_dataset(X, estimator=None):
+    """Validated frame of X with a ``node_i`` or ``node_i``/``node_j`` column layout."""
+    X = node_columns(X, estimator=estimator)
+    return pd.DataFrame(X, columns=["node_i", "node_j"][: X.shape[1]])
+
+
 class GraphScorer(BaseEstimator, TransformerMixin):
-    def __init__(self, input_network):
+    # fitted attributes that a parallel transform does not send to the worker processes
+    worker_excluded_state = ()
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        # restore fitted state from the on-disk cache when one is configured, split large
+        # transforms over processes when enabled, and record fit and transform calls when
+        # instrumentation is on
+        if "fit" in cls.__dict__:
+            cls.fit = instrumented(cached_fit(cls.__dict__["fit"]), "fit")
+        if "transform" in cls.__dict__:
+            cls.transform = instrumented(parallel_transform(cls.__dict__["transform"]), "transform")
+
+    def __init__(self, input_network, compiled_graph=None):
         self.input_network = input_network
+        self.compiled_graph = compiled_graph
+
+    def fit_is_deterministic(self):
+        """Whether ``fit`` gives the same result every time, so it may be cached."""
+        random_state = getattr(self, "random_state", None)
+        return "random_state" not in self.get_params(deep=False) or isinstance(
+            random_state, numbers.Integral
+        )
+
+    def supports_parallel_transform(self):
+        """Whether transform only reads the encoded pairs, the compiled graph and fitted state."""
+        return False
+
+    def transform_is_parallel(self, X):
+        """Whether transform splits X over ``n_jobs`` worker processes.
+
+        Needs ``n_jobs`` other than 1, :meth:`supports_parallel_transform` and more than
+        ``block_size`` rows. Scorers reading the shared neighborhood pass of a
+        :class:`SharedBatch` stay in process, as do those in daemonic processes such as
+        pool workers, see :func:`~eelp.models._parallel.can_start_workers`.
+        """
+        if getattr(self, "n_jobs", 1) == 1 or not self.supports_parallel_transform():
+            return False
+        if isinstance(X, SharedBatch) and self.neighborhood_score_names():
+            return False
+        if self.node_columns(X).shape[0] <= self.block_size:
+            return False
+        return can_start_workers(f"{type(self).__name__}.transform with n_jobs={self.n_jobs}")
+
+    def get_compiled_graph(self):
+        """Return the :class:`CompiledGraph` of ``input_network``.
+
+        Uses ``compiled_graph`` when one was passed in, otherwise the snapshot shared by
+        every scorer of the same ``input_network`` object, so the conversion happens once.
+        See :func:`~eelp.models._graph.compile_graph` for modifying a graph after that.
+        """
+        if self.compiled_graph is not None:
+            return self.compiled_graph
+        return compile_graph(self.input_network)
+
+    def lookup_node_values(self, values, X):
+        """Gather ``values``, aligned to the compiled node index, for the ``node_i`` column of X."""
+        graph = self.get_compiled_graph()
+        if isinstance(X, SharedBatch):
+            return values[X.node_indices(graph)].reshape(-1, 1)
+        idx = graph.encode(self.node_columns(X))[:, 0]
+        return values[idx].reshape(-1, 1)
+
+    def encode_pairs(self, X):
+        """(n_rows, 2) node-index array for the ``node_i``/``node_j`` columns of X."""
+        graph = self.get_compiled_graph()
+        if isinstance(X, SharedBatch):
+            return X.pairs(graph)
+        return encode_pair_columns(graph, self.node_columns(X))
+
+    def neighborhood_score_names(self):
+        """Scores of :func:`neighborhood_scores` that transform reads, see :meth:`neighborhood`."""
+        return ()
+
+    def neighborhood(self, X):
+        """Dict of the :meth:`neighborhood_score_names` of every pair in X.
+
+        When X is a :class:`SharedBatch` the scores come from one pass shared by all
+        scorers of the batch.
+        """
+        graph = self.get_compiled_graph()
+        if isinstance(X, SharedBatch):
+            return X.neighborhood(graph)
+        return neighborhood_scores(graph, self.encode_pairs(X), self.neighborhood_score_names())
+
+    def node_columns(self, X):
+        """Validated node label array of X, see :func:`node_columns`."""
+        if isinstance(X, SharedBatch):
+            return X.columns()
+        return node_columns(X, estimator=self)
 
     def make_dataset(self, X):
-        X = check_array(X, accept_large_sparse=False, estimator=self)
-        if X.shape[1] == 1:
-            return pd.DataFrame(X, columns=["node_i"])
-        elif X.shape[1] == 2:
-            return pd.DataFrame(X, columns=["node_i", "node_j"])
-        else:
-            raise ValueError("Bad input shape")
+        """Validated frame of X, for the scorers that still iterate over rows."""
+        if isinstance(X, SharedBatch):
+            return X.dataset()
+        return as_dataset(X, estimator=self)
 
     def get_feature_names_out(self, input_features=None):
         estimator_name = self.__class__.__name__
@@ -35,9 +220,38 @@ class GraphScorer(BaseEstimator, TransformerMixin):
         return [estimator_name]
 
 
+class PairwiseScorer(GraphScorer):
+    """Scorer of node pairs whose transform can run on ``n_jobs`` processes.
+
+    Rows are scored in blocks of ``block_size``, see :func:`transform_in_parallel`.
+    ``n_jobs=None`` or negative uses every core.
+    """
+
+    def __init__(self, input_network, n_jobs=1, block_size=DEFAULT_BLOCK_SIZE, compiled_graph=None):
+        super(PairwiseScorer, self).__init__(input_network, compiled_graph)
+        self.n_jobs = n_jobs
+        self.block_size = block_size
+
+    def supports_parallel_transform(self):
+        return True
+
+
 class GlobalGraphPropertiesScorer(GraphScorer):
-    def __init__(self, input_network):
-        super(GlobalGraphPropertiesScorer, self).__init__(input_network)
+    """Graph-level statistics repeated for every row of X.
+
+    ``mode="fast"`` computes them on the compiled graph: the diameter with iFUB, which is
+    exact unless ``max_sweeps`` caps the number of BFS, and transitivity, average
+    clustering and assortativity from one vectorized triangle and degree pass.
+    ``diameter_bounds_`` holds the lower and upper diameter bound, equal when exact, and
+    ``network_diameter`` the lower one. ``mode="networkx"`` uses the networkx functions.
+    """
+
+    modes = ("fast", "networkx")
+
+    def __init__(self, input_network, mode="fast", max_sweeps=None, compiled_graph=None):
+        super(GlobalGraphPropertiesScorer, self).__init__(input_network, compiled_graph)
+        self.mode = mode
+        self.max_sweeps = max_sweeps
         self.num_nodes = None
         self.num_edges = None
         self.average_degree = None
@@ -46,22 +260,31 @@ class GlobalGraphPropertiesScorer(GraphScorer):
         self.degree_assortativity = None
         self.network_transitivity = None
         self.avg_clustering_coefficient = None
+        self.diameter_bounds_ = None
 
     def fit(self, X, y=None):
-        self.num_nodes = nx.number_of_nodes(self.input_network)
-        self.num_edges = nx.number_of_edges(self.input_network)
-        self.network_diameter = nx.diameter(self.input_network)
-        self.degree_assortativity = nx.degree_assortativity_coefficient(self.input_network)
-        self.network_transitivity = nx.transitivity(self.input_network)
-        self.avg_clustering_coefficient = nx.average_clustering(self.input_network)
-        degrees = self.input_network.degree()
-        self.average_degree = np.mean([degrees[idx] for idx in range(self.num_nodes)])
-        self.degree_variance = np.var([degrees[idx] for idx in range(self.num_nodes)])
+        if self.mode not in self.modes:
+            raise ValueError(f"mode must be one of {self.modes}, got {self.mode!r}")
+        graph = self.get_compiled_graph()
+        self.num_nodes = graph.num_nodes
+        self.num_edges = graph.num_edges
+        self.average_degree, self.degree_variance = degree_moments(graph)
+        if self.mode == "networkx":
+            self.network_diameter = nx.diameter(self.input_network)
+            self.diameter_bounds_ = (self.network_diameter, self.network_diameter)
+            self.degree_assortativity = nx.degree_assortativity_coefficient(self.input_network)
+            self.network_transitivity = nx.transitivity(self.input_network)
+            self.avg_clustering_coefficient = nx.average_clustering(self.input_network)
+            return self
+        lower, upper, _ = diameter_bounds(graph, self.max_sweeps)
+        self.network_diameter = lower
+        self.diameter_bounds_ = (lower, upper)
+        self.degree_assortativity = degree_assortativity(graph)
+        self.network_transitivity, self.avg_clustering_coefficient = clustering_statistics(graph)
         return self
 
     def transform(self, X):
-        X = self.make_dataset(X)
-        num_rows = X.shape[0]
+        num_rows = self.node_columns(X).shape[0]
         output_vector = np.array(
             [
                 self.num_nodes,
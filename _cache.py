@@ -0,0 +1,258 @@
+import functools
+import hashlib
+import os
+import pickle
+import shutil
+import uuid
+from pathlib import Path
+
+import numpy as np
+
+from ._lru import LRUCache
+
+CACHE_DIR_ENV = "EELP_FIT_CACHE_DIR"
+CACHE_BYTES_ENV = "EELP_FIT_CACHE_MAX_BYTES"
+DEFAULT_MAX_BYTES = 2**30
+# bumped when the layout of the stored entries changes
+CACHE_FORMAT_VERSION = 1
+
+# parameters that change how a fit runs, not what it computes
+_UNKEYED_PARAMS = ("input_network", "compiled_graph", "n_jobs", "block_size")
+_PLAIN_TYPES = (type(None), bool, int, float, str, np.integer, np.floating)
+
+_fit_cache = None
+_fit_cache_configured = False
+
+
+def _is_plain(value):
+    if isinstance(value, _PLAIN_TYPES):
+        return True
+    if isinstance(value, (tuple, list)):
+        return all(_is_plain(item) for item in value)
+    if isinstance(value, dict):
+        return all(_is_plain(k) and _is_plain(v) for k, v in value.items())
+    return False
+
+
+@functools.lru_cache(maxsize=None)
+def code_version():
+    """SHA-256 hex digest of the source of this package's modules.
+
+    Part of every cache key, so that a change to any scorer or to the code computing its
+    fitted state invalidates the entries written by the previous version.
+    """
+    digest = hashlib.sha256()
+    for path in sorted(Path(__file__).resolve().parent.glob("*.py")):
+        digest.update(path.name.encode())
+        digest.update(path.read_bytes())
+    return digest.hexdigest()
+
+
+def _edge_attribute_digest(G, graph, name):
+    """SHA-256 digest of the ``name`` attribute of the edges of ``G``, 1 where missing.
+
+    Values are ordered by the node indices of their edge in ``graph``, the compiled graph
+    of ``G``, so the digest depends on which edge has which value but not on edge order.
+    """
+    edges = np.sort(graph.index.encode_edges(G.edges, G.number_of_edges()), axis=1)
+    order = np.lexsort((edges[:, 1], edges[:, 0]))
+    values = [value for *_, value in G.edges(data=name, default=1)]
+    try:
+        data = np.asarray(values, dtype=np.float64)[order].tobytes()
+    except (TypeError, ValueError):
+        data = repr([values[i] for i in order.tolist()]).encode()
+    return hashlib.sha256(data).digest()
+
+
+def _dir_size(path):
+    return sum(entry.stat().st_size for entry in os.scandir(path) if entry.is_file())
+
+
+class FitCache:
+    """Content-addressed on-disk cache of the fitted state of graph scorers.
+
+    Entries are keyed by the content hash of the compiled graph, the scorer class, its
+    hyperparameters and the :func:`code_version` of the package. Fitted arrays are stored
+    as ``.npy`` files and memory-mapped on load, the remaining fitted attributes, with
+    caches emptied, are pickled. Entries are written to a temporary directory and renamed
+    into place, so processes sharing ``directory`` never see a partial entry. Once the
+    entries exceed ``max_bytes`` the least recently used ones are removed. ``hits`` and
+    ``misses`` count lookups made by this process.
+    """
+
+    def __init__(self, directory, max_bytes=DEFAULT_MAX_BYTES):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def key_for(self, scorer):
+        """Cache key of ``scorer``, or None when its fit is not a function of its params.
+
+        Scorers whose ``fit_is_deterministic`` is false, such as those with a
+        non-integer ``random_state``, or with parameters other than plain Python values are
+        not cached. A ``weight`` parameter naming another edge attribute than ``"weight"``
+        adds the values of that attribute to the key.
+        """
+        params = scorer.get_params(deep=False)
+        for name in _UNKEYED_PARAMS:
+            params.pop(name, None)
+        if not scorer.fit_is_deterministic() or not _is_plain(params):
+            return None
+        digest = hashlib.sha256()
+        digest.update(f"{CACHE_FORMAT_VERSION}:{code_version()}".encode())
+        graph = scorer.get_compiled_graph()
+        digest.update(graph.content_hash.encode())
+        digest.update(f"{type(scorer).__module__}.{type(scorer).__qualname__}".encode())
+        digest.update(repr(sorted(params.items())).encode())
+        # the content hash only covers the "weight" attribute
+        weight = params.get("weight", "weight")
+        if weight is not None and weight != "weight":
+            digest.update(_edge_attribute_digest(scorer.input_network, graph, weight))
+        return digest.hexdigest()
+
+    def _entry_path(self, key):
+        return self.directory / key[:2] / key
+
+    def load(self, key):
+        """Fitted attributes stored under ``key``, or None on a miss."""
+        path = self._entry_path(key)
+        try:
+            with open(path / "state.pkl", "rb") as f:
+                state = pickle.load(f)
+            for name in state.pop("__arrays__"):
+                state[name] = np.load(path / f"{name}.npy", mmap_mode="r")
+            # the modification time of an entry records its last use
+            os.utime(path)
+        except (OSError, EOFError, pickle.UnpicklingError):
+            # missing, or evicted by another process while reading
+            self.misses += 1
+            return None
+        self.hits += 1
+        return state
+
+    def store(self, key, state):
+        """Store the ``state`` dict of fitted attributes, skipping unpicklable states."""
+        arrays = {
+            name: value
+            for name, value in state.items()
+            if isinstance(value, np.ndarray) and value.dtype.kind not in "OV"
+        }
+        others = {name: value for name, value in state.items() if name not in arrays}
+        others["__arrays__"] = list(arrays)
+        try:
+            payload = pickle.dumps(others, protocol=pickle.HIGHEST_PROTOCOL)
+        except Exception:
+            return False
+        path = self._entry_path(key)
+        tmp = self.directory / f".tmp-{os.getpid()}-{uuid.uuid4().hex}"
+        tmp.mkdir()
+        try:
+            for name, value in arrays.items():
+                np.save(tmp / f"{name}.npy", value)
+            with open(tmp / "state.pkl", "wb") as f:
+                f.write(payload)
+            path.parent.mkdir(exist_ok=True)
+            os.rename(tmp, path)
+        except OSError:
+            # another process stored the same entry first
+            shutil.rmtree(tmp, ignore_errors=True)
+            return False
+        self.evict()
+        return True
+
+    def entries(self):
+        """``(path, size, last_used)`` of every stored entry."""
+        entries = []
+        for shard in os.scandir(self.directory):
+            if not shard.is_dir() or shard.name.startswith("."):
+                continue
+            for entry in os.scandir(shard.path):
+                try:
+                    entries.append((entry.path, _dir_size(entry.path), entry.stat().st_mtime))
+                except OSError:
+                    continue
+        return entries
+
+    def evict(self):
+        """Remove least recently used entries until the cache fits in ``max_bytes``."""
+        entries = sorted(self.entries(), key=lambda entry: entry[2])
+        total = sum(size for _, size, _ in entries)
+        for path, size, _ in entries[:-1]:
+            if total <= self.max_bytes:
+                break
+            shutil.rmtree(path, ignore_errors=True)
+            total -= size
+
+    def clear(self):
+        for path, _, _ in self.entries():
+            shutil.rmtree(path, ignore_errors=True)
+
+
+def set_fit_cache(directory, max_bytes=DEFAULT_MAX_BYTES):
+    """Cache the fits of every graph scorer under ``directory``, or disable with None.
+
+    Worker processes pick up the cache from the ``EELP_FIT_CACHE_DIR`` and
+    ``EELP_FIT_CACHE_MAX_BYTES`` environment variables, which this also sets.
+    """
+    global _fit_cache, _fit_cache_configured
+    _fit_cache_configured = True
+    if directory is None:
+        _fit_cache = None
+        os.environ.pop(CACHE_DIR_ENV, None)
+        return None
+    os.environ[CACHE_DIR_ENV] = str(directory)
+    os.environ[CACHE_BYTES_ENV] = str(max_bytes)
+    _fit_cache = FitCache(directory, max_bytes)
+    return _fit_cache
+
+
+def get_fit_cache():
+    """The active :class:`FitCache`, configured from the environment on first use."""
+    global _fit_cache, _fit_cache_configured
+    if not _fit_cache_configured:
+        _fit_cache_configured = True
+        directory = os.environ.get(CACHE_DIR_ENV)
+        if directory:
+            max_bytes = int(os.environ.get(CACHE_BYTES_ENV, DEFAULT_MAX_BYTES))
+            _fit_cache = FitCache(directory, max_bytes)
+    return _fit_cache
+
+
+def fitted_state(scorer):
+    """Instance attributes of ``scorer`` that are not constructor parameters."""
+    params = scorer.get_params(deep=False)
+    return {name: value for name, value in vars(scorer).items() if name not in params}
+
+
+def persisted_state(scorer):
+    """:func:`fitted_state` of ``scorer`` without the contents of its caches.
+
+    Caches are transient, an :class:`LRUCache` is stored empty with its byte budget.
+    """
+    state = fitted_state(scorer)
+    for name, value in state.items():
+        if isinstance(value, LRUCache):
+            state[name] = LRUCache(value.max_bytes)
+    return state
+
+
+def cached_fit(fit):
+    """Wrap a scorer ``fit`` so that it restores the fitted state from the active cache."""
+
+    @functools.wraps(fit)
+    def wrapper(self, X, y=None):
+        cache = get_fit_cache()
+        key = None if cache is None else cache.key_for(self)
+        if key is None:
+            return fit(self, X, y)
+        state = cache.load(key)
+        if state is not None:
+            vars(self).update(state)
+            return self
+        result = fit(self, X, y)
+        cache.store(key, persisted_state(self))
+        return result
+
+    return wrapper
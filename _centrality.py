@@ -0,0 +1,165 @@
+import os
+from multiprocessing import Pool
+
+import numpy as np
+from sklearn.utils import check_random_state
+
+from ._parallel import can_start_workers
+from ._paths import neighbors_of
+
+PATH_MEASURES = ("betweenness", "load", "closeness")
+
+_worker_graph = None
+
+
+def _sweep(graph, source, totals):
+    """Add the shortest path dependencies of one BFS from ``source`` into ``totals``.
+
+    One level-synchronous BFS over the CSR arrays counts shortest paths, then the tree
+    edges are walked back level by level to accumulate Brandes dependencies (betweenness),
+    Newman's equal-split load and the distance sums used by closeness.
+    """
+    n = graph.num_nodes
+    dist = np.full(n, -1, dtype=np.int64)
+    sigma = np.zeros(n)
+    dist[source] = 0
+    sigma[source] = 1.0
+    frontier = np.array([source], dtype=np.int64)
+    tree_edges = []
+    depth = 0
+    while frontier.shape[0]:
+        src = np.repeat(frontier, graph.degree[frontier])
+        dst = neighbors_of(graph, frontier)
+        unseen = dst[dist[dst] < 0]
+        dist[unseen] = depth + 1
+        forward = dist[dst] == depth + 1
+        src, dst = src[forward], dst[forward]
+        np.add.at(sigma, dst, sigma[src])
+        tree_edges.append((src, dst))
+        frontier = np.unique(dst)
+        depth += 1
+    reached = dist >= 0
+    totals["dist_sum"][reached] += dist[reached]
+    totals["reach"][reached] += 1
+    delta = np.zeros(n)
+    load = reached.astype(np.float64)
+    num_preds = np.zeros(n)
+    for src, dst in tree_edges:
+        np.add.at(num_preds, dst, 1.0)
+    for src, dst in reversed(tree_edges):
+        np.add.at(delta, src, sigma[src] / sigma[dst] * (1.0 + delta[dst]))
+        keep = src != source
+        np.add.at(load, src[keep], load[dst[keep]] / num_preds[dst[keep]])
+    delta[source] = 0.0
+    load[source] = 1.0
+    totals["betweenness"] += delta
+    totals["load"][reached] += load[reached] - 1.0
+
+
+def accumulate_sources(graph, sources):
+    """Unscaled betweenness, load, distance-sum and reach totals over BFS sweeps."""
+    n = graph.num_nodes
+    totals = {
+        "betweenness": np.zeros(n),
+        "load": np.zeros(n),
+        "dist_sum": np.zeros(n),
+        "reach": np.zeros(n),
+    }
+    for source in sources:
+        _sweep(graph, int(source), totals)
+    return totals
+
+
+def _init_worker(graph):
+    global _worker_graph
+    _worker_graph = graph
+
+
+def _accumulate_in_worker(sources):
+    return accumulate_sources(_worker_graph, sources)
+
+
+def hoeffding_num_sources(num_nodes, epsilon, delta):
+    """Pivots needed for an additive ``epsilon`` error on every normalized betweenness.
+
+    Each pivot gives an estimate in ``[0, n / (n - 1)]``, so by Hoeffding's inequality
+    and a union bound over the nodes the error exceeds ``epsilon`` with probability at
+    most ``delta``.
+    """
+    value_range = num_nodes / max(num_nodes - 1, 1)
+    return int(np.ceil(value_range**2 * np.log(2 * num_nodes / delta) / (2 * epsilon**2)))
+
+
+def hoeffding_error_bound(num_nodes, num_sources, delta):
+    """Additive normalized betweenness error bound of ``num_sources`` pivots."""
+    value_range = num_nodes / max(num_nodes - 1, 1)
+    return float(value_range * np.sqrt(np.log(2 * num_nodes / delta) / (2 * num_sources)))
+
+
+def path_centralities(
+    graph,
+    mode="exact",
+    k=None,
+    epsilon=0.01,
+    delta=0.1,
+    random_state=None,
+    n_jobs=1,
+):
+    """Betweenness, load and closeness centrality of every node from shared BFS sweeps.
+
+    ``mode="exact"`` sweeps from every node. ``mode="approximate"`` sweeps from ``k``
+    pivots drawn without replacement and rescales the totals by ``n / k``; without ``k``
+    the number of pivots is chosen by :func:`hoeffding_num_sources` from ``epsilon`` and
+    ``delta``. Sources are split over ``n_jobs`` worker processes whose partial totals are
+    summed, unless this is a daemonic process that cannot start them. Returns a dict with
+    the unnormalized ``betweenness`` and ``load`` sums, the ``closeness`` array,
+    ``num_sources`` and the normalized betweenness ``error_bound``.
+    """
+    n = graph.num_nodes
+    if mode == "exact":
+        sources = np.arange(n)
+    elif mode == "approximate":
+        if k is None:
+            k = hoeffding_num_sources(n, epsilon, delta)
+        k = min(k, n)
+        sources = check_random_state(random_state).choice(n, size=k, replace=False)
+    else:
+        raise ValueError(f"mode must be 'exact' or 'approximate', got {mode!r}")
+    num_sources = sources.shape[0]
+    if n_jobs is not None and n_jobs < 0:
+        n_jobs = None
+    if n_jobs == 1 or num_sources < 2 or not can_start_workers(f"{mode} path centralities"):
+        totals = accumulate_sources(graph, sources)
+    else:
+        num_workers = (os.cpu_count() or 1) if n_jobs is None else n_jobs
+        with Pool(processes=num_workers, initializer=_init_worker, initargs=(graph,)) as pool:
+            partials = pool.map(_accumulate_in_worker, np.array_split(sources, 4 * num_workers))
+        totals = {key: sum(partial[key] for partial in partials) for key in partials[0]}
+    scale = n / num_sources if num_sources else 0.0
+    reach = totals["reach"] * scale
+    dist_sum = totals["dist_sum"] * scale
+    closeness = np.zeros(n)
+    if n > 1:
+        valid = dist_sum > 0
+        closeness[valid] = (reach[valid] - 1) ** 2 / (dist_sum[valid] * (n - 1))
+    return {
+        "betweenness": totals["betweenness"] * scale,
+        "load": totals["load"] * scale,
+        "closeness": closeness,
+        "num_sources": num_sources,
+        "error_bound": 0.0 if num_sources == n else hoeffding_error_bound(n, num_sources, delta),
+    }
+
+
+def rescale_betweenness(values, num_nodes, normalized=True):
+    """Apply the ``networkx.betweenness_centrality`` scaling for undirected graphs."""
+    if normalized:
+        return values / ((num_nodes - 1) * (num_nodes - 2)) if num_nodes > 2 else values
+    return values * 0.5
+
+
+def rescale_load(values, num_nodes, normalized=True):
+    """Apply the ``networkx.load_centrality`` scaling."""
+    if normalized and num_nodes > 2:
+        return values / ((num_nodes - 1) * (num_nodes - 2))
+    return values
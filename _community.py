@@ -0,0 +1,144 @@
+import numpy as np
+
+
+def edge_weight_array(G, graph, weight="weight"):
+    """Node-index pairs in ``graph`` and ``weight`` values of the edges of ``G``.
+
+    Self-loops are listed once and edges without the attribute weigh 1.
+    """
+    num_edges = G.number_of_edges()
+    labels = np.empty(2 * num_edges, dtype=object)
+    labels[:] = [n for e in G.edges for n in e]
+    edges = graph.encode(labels).reshape(-1, 2)
+    weights = np.fromiter(
+        (w for *_, w in G.edges(data=weight, default=1)), dtype=np.float64, count=num_edges
+    )
+    return edges, weights
+
+
+def modularity_aggregates(membership, edges, weights):
+    """Per-community sums behind the Newman-Girvan modularity of ``membership``.
+
+    ``membership`` holds the community of every node index and ``edges``/``weights`` the
+    undirected edges. Returns the total edge weight, the degree sum of every community and
+    the total weight of intra-community edges, the terms used by ``community_louvain``.
+    """
+    num_communities = membership.max() + 1 if membership.shape[0] else 0
+    total_weight = weights.sum()
+    community_degree = np.bincount(
+        membership[edges.ravel()], weights=np.repeat(weights, 2), minlength=num_communities
+    )
+    internal_weight = weights[membership[edges[:, 0]] == membership[edges[:, 1]]].sum()
+    return float(total_weight), community_degree, float(internal_weight)
+
+
+def modularity(total_weight, community_degree, internal_weight):
+    if total_weight == 0:
+        raise ValueError("A graph without link has an undefined modularity")
+    return internal_weight / total_weight - (community_degree**2).sum() / (2 * total_weight) ** 2
+
+
+def modularity_gain(pairs, membership, total_weight, community_degree, internal_weight):
+    """Modularity change from adding a unit weight edge for each of the node-index ``pairs``.
+
+    Only the two community degree sums at the ends of the new edge and the intra-community
+    weight change, so every pair is scored in O(1) from the :func:`modularity_aggregates`
+    of the graph, without modifying it.
+    """
+    ci = membership[pairs[:, 0]]
+    cj = membership[pairs[:, 1]]
+    same = ci == cj
+    di = community_degree[ci]
+    dj = community_degree[cj]
+    squares = (community_degree**2).sum()
+    # the new edge adds one to the degree sums of both end communities
+    squares_gain = np.where(same, 4 * di + 4, 2 * (di + dj) + 2)
+    new_weight = total_weight + 1
+    new_q = (internal_weight + same) / new_weight - (squares + squares_gain) / (2 * new_weight) ** 2
+    return new_q - modularity(total_weight, community_degree, internal_weight)
+
+
+def _xlogx(x):
+    x = np.asarray(x, dtype=np.float64)
+    return x * np.log2(np.where(x > 0, x, 1.0))
+
+
+def map_equation_aggregates(membership, edges, weights, num_nodes):
+    """Unnormalized flow terms of the two-level map equation for undirected links.
+
+    Returns the strength of every node, and the total strength (flow) and cut weight
+    (exit flow) of every module of ``membership``. Self-loops count once towards the
+    strength of their node, as in Infomap.
+    """
+    num_modules = membership.max() + 1 if membership.shape[0] else 0
+    loops = edges[:, 0] == edges[:, 1]
+    node_strength = np.bincount(edges[:, 0], weights=weights, minlength=num_nodes)
+    node_strength += np.bincount(edges[~loops, 1], weights=weights[~loops], minlength=num_nodes)
+    module_flow = np.bincount(membership, weights=node_strength, minlength=num_modules)
+    ends = membership[edges]
+    cut = ends[:, 0] != ends[:, 1]
+    module_exit = np.bincount(
+        ends[cut].ravel(), weights=np.repeat(weights[cut], 2), minlength=num_modules
+    )
+    return node_strength, module_flow, module_exit
+
+
+def codelength(node_strength, module_flow, module_exit):
+    """Two-level map equation codelength in bits of the :func:`map_equation_aggregates`.
+
+    With flows normalized by the total strength ``Z`` the ``log Z`` terms cancel, so the
+    codelength is a sum of ``x log x`` terms of the raw aggregates divided by ``Z``.
+    """
+    total_exit = module_exit.sum()
+    return (
+        _xlogx(total_exit)
+        - 2 * _xlogx(module_exit).sum()
+        - _xlogx(node_strength).sum()
+        + _xlogx(module_exit + module_flow).sum()
+    ) / node_strength.sum()
+
+
+def codelength_gain(pairs, membership, node_strength, module_flow, module_exit):
+    """Codelength saved by adding a unit weight link for each of the node-index ``pairs``.
+
+    A new link only changes the strength of its end nodes and the flow and exit flow of
+    their modules, so each pair updates the few affected ``x log x`` terms of
+    :func:`codelength` and is scored in O(1) without rerunning Infomap.
+    """
+    i, j = pairs[:, 0], pairs[:, 1]
+    a, b = membership[i], membership[j]
+    loop = i == j
+    cross = a != b
+    total_exit = module_exit.sum()
+    total_strength = node_strength.sum()
+    base = codelength(node_strength, module_flow, module_exit)
+
+    node_term = (
+        _xlogx(node_strength).sum() + _xlogx(node_strength[i] + 1) - _xlogx(node_strength[i])
+    )
+    node_term += np.where(loop, 0.0, _xlogx(node_strength[j] + 1) - _xlogx(node_strength[j]))
+
+    exit_term = _xlogx(module_exit).sum() + np.where(
+        cross,
+        _xlogx(module_exit[a] + 1)
+        - _xlogx(module_exit[a])
+        + _xlogx(module_exit[b] + 1)
+        - _xlogx(module_exit[b]),
+        0.0,
+    )
+
+    # a self-loop adds 1 to its module, a link within a module 2, a link across modules
+    # adds 1 to the flow and 1 to the exit flow of both
+    module_total = module_exit + module_flow
+    gain_a = np.where(loop, 1.0, 2.0)
+    module_term = (
+        _xlogx(module_total).sum() + _xlogx(module_total[a] + gain_a) - _xlogx(module_total[a])
+    )
+    module_term += np.where(cross, _xlogx(module_total[b] + 2) - _xlogx(module_total[b]), 0.0)
+
+    new_total_exit = total_exit + 2 * cross
+    new_total_strength = total_strength + gain_a
+    new_codelength = (
+        _xlogx(new_total_exit) - 2 * exit_term - node_term + module_term
+    ) / new_total_strength
+    return base - new_codelength
@@ -0,0 +1,87 @@
+import numpy as np
+
+from ._edges import EdgeArrayGraph
+
+
+def random_edge_sample(graph, number_of_edges, rng):
+    """Uniform edge sample without replacement, like littleballoffur's RandomEdgeSampler."""
+    choice = rng.choice(graph.number_of_edges(), size=number_of_edges, replace=False)
+    return np.sort(graph.keys[choice])
+
+
+def random_edge_sample_with_induction(graph, number_of_edges, rng):
+    """Uniform edge sample followed by induction of every edge between the sampled nodes.
+
+    Mirrors littleballoffur's RandomEdgeSamplerWithInduction.
+    """
+    sampled = graph.edge_subgraph(random_edge_sample(graph, number_of_edges, rng)).edges
+    in_sample = np.zeros(graph.num_nodes, dtype=bool)
+    in_sample[sampled.ravel()] = True
+    edges = graph.edges
+    return graph.keys[in_sample[edges[:, 0]] & in_sample[edges[:, 1]]]
+
+
+def hybrid_node_edge_sample(graph, number_of_edges, rng, p=0.8):
+    """Hybrid node-edge sample, like littleballoffur's HybridNodeEdgeSampler.
+
+    Each draw is, with probability ``p``, a uniform node followed by a uniform neighbor and
+    otherwise a uniform edge. Draws are generated in vectorized batches and the first
+    ``number_of_edges`` distinct edges are kept, which is the sequential algorithm's result.
+    Isolated nodes are redrawn instead of failing.
+    """
+    n = graph.num_nodes
+    m = graph.number_of_edges()
+    indptr, indices = graph.adjacency()
+    degree = np.diff(indptr)
+    non_isolated = np.flatnonzero(degree)
+    collected = np.empty(0, dtype=np.int64)
+    while collected.shape[0] < number_of_edges:
+        batch = 2 * (number_of_edges - collected.shape[0]) + 16
+        node_draw = rng.random(batch) < p
+        u = non_isolated[rng.integers(0, len(non_isolated), size=batch)]
+        v = indices[indptr[u] + (rng.random(batch) * degree[u]).astype(np.int64)]
+        keys = np.minimum(u, v) * np.int64(n) + np.maximum(u, v)
+        keys = np.where(node_draw, keys, graph.keys[rng.integers(0, m, size=batch)])
+        collected = np.concatenate((collected, keys))
+        _, first = np.unique(collected, return_index=True)
+        collected = collected[np.sort(first)]
+    return np.sort(collected[:number_of_edges])
+
+
+edge_sampler_dict = {
+    "rs": random_edge_sample,
+    "rswi": random_edge_sample_with_induction,
+    "hnes": hybrid_node_edge_sample,
+}
+
+
+def sample_edges(graph, sampling_method, number_of_edges, rng):
+    """Sample ``number_of_edges`` edges of an :class:`EdgeArrayGraph` as a new view."""
+    if number_of_edges > graph.number_of_edges():
+        raise ValueError(
+            f"Cannot sample {number_of_edges} edges from a graph with "
+            f"{graph.number_of_edges()} edges"
+        )
+    keys = edge_sampler_dict[sampling_method](graph, number_of_edges, rng)
+    return EdgeArrayGraph(graph.nodes, keys, assume_unique=True)
+
+
+def sample_split_replicates(graph, sampling_method, alphas, alphas_, seeds):
+    """Draw holdout/training splits of ``graph`` for every ``(alpha, alpha_, seed)`` triple.
+
+    The holdout graph keeps ``int(alpha * m)`` sampled edges of ``graph`` and the training
+    graph keeps ``int(alpha_ * m_ho)`` sampled edges of the holdout graph. Replicates are
+    drawn one after the other, each from its own seed, but all read the same edge arrays
+    and adjacency, so the graph is indexed once per batch. Returns a list of
+    ``(ho_graph, tr_graph)`` :class:`EdgeArrayGraph` pairs.
+    """
+    graph.adjacency()
+    splits = []
+    for alpha, alpha_, seed in zip(alphas, alphas_, seeds):
+        rng = np.random.default_rng(seed)
+        ho_graph = sample_edges(graph, sampling_method, int(alpha * graph.number_of_edges()), rng)
+        tr_graph = sample_edges(
+            ho_graph, sampling_method, int(alpha_ * ho_graph.number_of_edges()), rng
+        )
+        splits.append((ho_graph, tr_graph))
+    return splits
@@ -0,0 +1,180 @@
+import networkx as nx
+import numpy as np
+
+from ._index import NodeIndex, label_array
+
+
+def edge_keys(edges, num_nodes):
+    """Encode (k, 2) node-index pairs as canonical int64 keys ``min * n + max``."""
+    edges = np.asarray(edges, dtype=np.int64).reshape(-1, 2)
+    lo = np.minimum(edges[:, 0], edges[:, 1])
+    hi = np.maximum(edges[:, 0], edges[:, 1])
+    return lo * np.int64(num_nodes) + hi
+
+
+def keys_to_edges(keys, num_nodes):
+    """Inverse of :func:`edge_keys`, returns a (k, 2) int64 array with ``u < v``."""
+    keys = np.asarray(keys, dtype=np.int64)
+    return np.column_stack(np.divmod(keys, np.int64(num_nodes)))
+
+
+def csr_from_edges(edges, num_nodes, sort_indices=True, weights=None):
+    """Symmetric CSR ``(indptr, indices)`` of undirected (m, 2) index pairs.
+
+    With ``sort_indices`` the neighbors of every row are sorted in increasing order. When
+    per-edge ``weights`` are given they are returned as a third, aligned ``data`` array.
+    """
+    edges = np.asarray(edges, dtype=np.int64).reshape(-1, 2)
+    src = np.concatenate((edges[:, 0], edges[:, 1]))
+    dst = np.concatenate((edges[:, 1], edges[:, 0]))
+    order = np.lexsort((dst, src)) if sort_indices else np.argsort(src, kind="stable")
+    indptr = np.zeros(num_nodes + 1, dtype=np.int64)
+    np.cumsum(np.bincount(src, minlength=num_nodes), out=indptr[1:])
+    if weights is None:
+        return indptr, dst[order]
+    weights = np.asarray(weights, dtype=np.float64)
+    return indptr, dst[order], np.concatenate((weights, weights))[order]
+
+
+class EdgeIndex:
+    """Sorted array of canonical edge keys supporting vectorized membership tests."""
+
+    def __init__(self, keys, num_nodes, assume_unique=False):
+        self.num_nodes = num_nodes
+        keys = np.asarray(keys, dtype=np.int64)
+        self.keys = keys if assume_unique else np.unique(keys)
+
+    @classmethod
+    def from_networkx(cls, G, node_index):
+        """Edge index of ``G`` over the nodes of a :class:`NodeIndex`."""
+        edges = node_index.encode_edges(G.edges, G.number_of_edges())
+        return cls(edge_keys(edges, len(node_index)), len(node_index))
+
+    def __len__(self):
+        return self.keys.shape[0]
+
+    def contains(self, keys):
+        keys = np.asarray(keys, dtype=np.int64)
+        if len(self) == 0:
+            return np.zeros(keys.shape, dtype=bool)
+        pos = np.searchsorted(self.keys, keys)
+        pos[pos == len(self)] = 0
+        return self.keys[pos] == keys
+
+    def difference(self, other):
+        """Keys of this index that are not in ``other``, in sorted order."""
+        return self.keys[~other.contains(self.keys)]
+
+    @property
+    def num_non_edges(self):
+        return self.num_nodes * (self.num_nodes - 1) // 2 - len(self)
+
+    def non_edges(self):
+        """All non-edge keys in sorted order. This is O(n ** 2), prefer :func:`sample_non_edges`."""
+        u, v = np.triu_indices(self.num_nodes, k=1)
+        keys = u.astype(np.int64) * self.num_nodes + v
+        return keys[~self.contains(keys)]
+
+
+class EdgeArrayGraph:
+    """Lightweight undirected graph view over a node label array and sorted edge keys.
+
+    Node ``i`` of the view is ``nodes[i]`` and edges are canonical keys over those
+    indices, so views that share ``nodes`` can be compared with vectorized set algebra.
+    A :class:`networkx.Graph` is only built when :meth:`to_networkx` is called.
+    """
+
+    def __init__(self, nodes, keys, assume_unique=False):
+        self.nodes = nodes
+        self.edge_index = EdgeIndex(keys, len(nodes), assume_unique=assume_unique)
+        self._nx_graph = None
+        self._csr = None
+
+    @classmethod
+    def from_networkx(cls, G, node_index=None):
+        """View of ``G`` over the nodes of ``node_index``, by default those of ``G``."""
+        if node_index is None:
+            node_index = NodeIndex(label_array(G.nodes))
+        edge_index = EdgeIndex.from_networkx(G, node_index)
+        return cls(node_index.labels, edge_index.keys, assume_unique=True)
+
+    @property
+    def keys(self):
+        return self.edge_index.keys
+
+    @property
+    def num_nodes(self):
+        return len(self.nodes)
+
+    def number_of_edges(self):
+        return len(self.edge_index)
+
+    @property
+    def edges(self):
+        """(m, 2) array of node indices with ``u < v``."""
+        return keys_to_edges(self.keys, self.num_nodes)
+
+    def edge_labels(self, keys=None):
+        """(m, 2) array of node labels for ``keys``, all edges by default."""
+        keys = self.keys if keys is None else keys
+        return self.nodes[keys_to_edges(keys, self.num_nodes)]
+
+    def adjacency(self):
+        """Cached symmetric CSR ``(indptr, indices)`` with sorted neighbor lists."""
+        if self._csr is None:
+            self._csr = csr_from_edges(self.edges, self.num_nodes)
+        return self._csr
+
+    def edge_subgraph(self, keys):
+        """View over the same nodes restricted to ``keys``."""
+        return EdgeArrayGraph(self.nodes, keys)
+
+    def difference(self, other):
+        return self.edge_index.difference(other.edge_index)
+
+    def to_networkx(self):
+        if self._nx_graph is None:
+            G = nx.Graph()
+            G.add_nodes_from(self.nodes.tolist())
+            G.add_edges_from(self.edge_labels().tolist())
+            self._nx_graph = G
+        return self._nx_graph
+
+
+def sample_non_edges(edge_index, num_samples, random_state, replace=True):
+    """Draw ``num_samples`` node pairs that are not edges of ``edge_index``.
+
+    Pairs are drawn uniformly over unordered pairs by rejection against the sorted edge
+    keys, so memory is proportional to ``num_samples`` rather than to ``n ** 2``.
+    Returns a (num_samples, 2) int64 array of node indices with ``u < v``.
+    """
+    n = edge_index.num_nodes
+    available = edge_index.num_non_edges
+    if num_samples == 0:
+        return np.empty((0, 2), dtype=np.int64)
+    if available <= 0:
+        raise ValueError("Cannot sample non-edges from a complete graph")
+    if not replace and num_samples > available:
+        raise ValueError(
+            f"Cannot sample {num_samples} non-edges without replacement, only {available} exist"
+        )
+    if not replace and 2 * num_samples > available:
+        # rejection stalls on duplicates when most non-edges are requested, and the
+        # output is already of the order of n ** 2, so enumerate instead
+        keys = edge_index.non_edges()
+        return keys_to_edges(random_state.permutation(keys)[:num_samples], n)
+    accept_rate = available / (n * n)
+    collected = np.empty(0, dtype=np.int64)
+    while collected.shape[0] < num_samples:
+        missing = num_samples - collected.shape[0]
+        batch = int(np.ceil(1.2 * missing / accept_rate)) + 16
+        u = random_state.randint(0, n, size=batch)
+        v = random_state.randint(0, n, size=batch)
+        keys = edge_keys(np.column_stack((u, v)), n)[u != v]
+        keys = keys[~edge_index.contains(keys)]
+        collected = np.concatenate((collected, keys))
+        if not replace:
+            # keep the first draw of each pair so the order stays random
+            _, first = np.unique(collected, return_index=True)
+            collected = collected[np.sort(first)]
+    return keys_to_edges(collected[:num_samples], n)
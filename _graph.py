@@ -0,0 +1,198 @@
+import hashlib
+import weakref
+
+import numpy as np
+import scipy.sparse as sp
+
+from ._edges import EdgeIndex, csr_from_edges, edge_keys
+from ._index import NodeIndex, label_array
+
+
+class CompiledGraph:
+    """Immutable CSR snapshot of an undirected graph shared by the graph scorers.
+
+    Node ``i`` of the snapshot is ``nodes[i]``, in the iteration order of the source graph,
+    and ``index`` is the :class:`NodeIndex` translating between labels and indices.
+    The neighbors of node ``i`` are ``indices[indptr[i]:indptr[i + 1]]``, sorted in increasing
+    order when ``sorted_neighbors`` is set. ``degree`` matches ``networkx.Graph.degree``.
+    ``weights`` holds the edge weights aligned with ``indices``, or None for unweighted
+    graphs; only the weighted adjacency uses them.
+
+    Instances are never modified after construction, so copies share the same arrays. This
+    keeps ``sklearn.base.clone`` from duplicating the arrays of every cloned scorer.
+    """
+
+    def __init__(self, nodes, indptr, indices, sorted_neighbors=True, weights=None):
+        self.index = nodes if isinstance(nodes, NodeIndex) else NodeIndex(nodes)
+        self.nodes = self.index.labels
+        self.indptr = indptr
+        self.indices = indices
+        self.weights = weights
+        self.sorted_neighbors = sorted_neighbors
+        self.degree = np.diff(indptr)
+        self._adjacency = {}
+        self._derived = {}
+        for arr in (self.indptr, self.indices, self.degree):
+            arr.flags.writeable = False
+
+    @classmethod
+    def from_networkx(cls, G, sorted_neighbors=True, weight="weight"):
+        index = NodeIndex(label_array(G.nodes))
+        num_edges = G.number_of_edges()
+        edges = index.encode_edges(G.edges, num_edges)
+        weights = None
+        if weight is not None:
+            weights = np.fromiter(
+                (w for *_, w in G.edges(data=weight, default=1.0)),
+                dtype=np.float64,
+                count=num_edges,
+            )
+            if (weights == 1.0).all():
+                weights = None
+        return cls.from_edges(index, edges, sorted_neighbors, weights)
+
+    @classmethod
+    def from_edges(cls, nodes, edges, sorted_neighbors=True, weights=None):
+        """Build from node labels or their :class:`NodeIndex` and (m, 2) node-index pairs."""
+        csr = csr_from_edges(edges, len(nodes), sort_indices=sorted_neighbors, weights=weights)
+        return cls(
+            nodes, csr[0], csr[1], sorted_neighbors, weights=csr[2] if len(csr) > 2 else None
+        )
+
+    def __getstate__(self):
+        # derived caches are rebuilt on demand, do not ship them to worker processes
+        state = self.__dict__.copy()
+        state.update(_adjacency={}, _derived={})
+        return state
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+    @property
+    def num_nodes(self):
+        return self.nodes.shape[0]
+
+    @property
+    def num_edges(self):
+        return self.indices.shape[0] // 2
+
+    @property
+    def contiguous_labels(self):
+        return self.index.contiguous
+
+    def encode(self, labels):
+        """Map an array of node labels to node indices, see :meth:`NodeIndex.encode`."""
+        return self.index.encode(labels)
+
+    def decode(self, idx):
+        """Map node indices back to node labels."""
+        return self.index.decode(idx)
+
+    def values_from_mapping(self, mapping, dtype=np.float64):
+        """Dense array of ``mapping[node]`` aligned to the node index."""
+        return self.index.values_from_mapping(mapping, dtype)
+
+    def neighbors(self, i):
+        start, stop = self.indptr[i], self.indptr[i + 1]
+        return self.indices[start:stop]
+
+    @property
+    def edges(self):
+        """(m, 2) array of node-index pairs with ``u <= v``."""
+        src = np.repeat(np.arange(self.num_nodes), self.degree)
+        upper = src < self.indices
+        # self-loops are stored twice in the symmetric CSR
+        loops = np.unique(src[src == self.indices])
+        return np.concatenate(
+            (np.column_stack((src[upper], self.indices[upper])), np.column_stack((loops, loops)))
+        )
+
+    @property
+    def content_hash(self):
+        """SHA-256 hex digest of the node labels, CSR arrays and weights.
+
+        Equal graphs with the same node order hash equally across processes, so the
+        digest can key results derived from the graph content rather than the object.
+        """
+
+        def compute():
+            digest = hashlib.sha256()
+            if self.nodes.dtype.kind in "biuf":
+                digest.update(self.nodes.dtype.str.encode())
+                digest.update(np.ascontiguousarray(self.nodes).tobytes())
+            else:
+                digest.update(repr(self.nodes.tolist()).encode())
+            for arr in (self.indptr, self.indices):
+                digest.update(np.ascontiguousarray(arr, dtype=np.int64).tobytes())
+            if self.weights is not None:
+                digest.update(b"weights")
+                digest.update(np.ascontiguousarray(self.weights, dtype=np.float64).tobytes())
+            return digest.hexdigest()
+
+        return self.cached("content_hash", compute)
+
+    def has_edges(self, pairs):
+        """Boolean mask of the (k, 2) node-index ``pairs`` that are edges of the graph."""
+        index = self.cached(
+            "edge_index",
+            lambda: EdgeIndex(edge_keys(self.edges, self.num_nodes), self.num_nodes),
+        )
+        return index.contains(edge_keys(pairs, self.num_nodes))
+
+    def cached(self, key, compute):
+        """Return ``compute()``, evaluated once per ``key`` for this snapshot.
+
+        Lets scorers of the same graph share results derived from it, such as the
+        path centralities that come out of one set of BFS sweeps.
+        """
+        if key not in self._derived:
+            self._derived[key] = compute()
+        return self._derived[key]
+
+    def adjacency_matrix(self, weighted=False):
+        """Cached ``scipy.sparse.csr_matrix`` sharing the CSR arrays.
+
+        The matrix is binary unless ``weighted`` is set and the graph has edge weights.
+        """
+        weighted = weighted and self.weights is not None
+        if weighted not in self._adjacency:
+            if weighted:
+                data = self.weights
+            else:
+                data = np.ones(self.indices.shape[0], dtype=np.float64)
+            self._adjacency[weighted] = sp.csr_matrix(
+                (data, self.indices, self.indptr), shape=(self.num_nodes, self.num_nodes)
+            )
+        return self._adjacency[weighted]
+
+
+_compiled_graphs: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+
+
+def compile_graph(G):
+    """Return the shared :class:`CompiledGraph` of ``G``, building it on first use.
+
+    Snapshots are cached per graph object, so every scorer of one graph reads the same
+    arrays. Only a change of the node or edge count is detected and triggers a rebuild: a
+    graph must not otherwise be modified after its first compile, for instance by rewiring
+    edges, unless :func:`invalidate_compiled_graph` is called before scoring it again.
+    """
+    cached = _compiled_graphs.get(G)
+    if cached is not None:
+        compiled, num_nodes, num_edges = cached
+        if num_nodes == G.number_of_nodes() and num_edges == G.number_of_edges():
+            return compiled
+    compiled = CompiledGraph.from_networkx(G)
+    _compiled_graphs[G] = (compiled, G.number_of_nodes(), G.number_of_edges())
+    return compiled
+
+
+def invalidate_compiled_graph(G):
+    """Drop the cached snapshot of ``G`` so that the next :func:`compile_graph` rebuilds it.
+
+    Scorers fitted on the old snapshot keep their fitted state and have to be refit.
+    """
+    _compiled_graphs.pop(G, None)
@@ -0,0 +1,123 @@
+import numbers
+import weakref
+
+import numpy as np
+import pandas as pd
+
+INDEX_DTYPES = (np.dtype(np.int32), np.dtype(np.int64))
+
+
+def buffer_key(arr):
+    """Identity of the memory an array views: data address, shape, strides and dtype."""
+    return (arr.__array_interface__["data"][0], arr.shape, arr.strides, arr.dtype.str)
+
+
+def label_array(labels):
+    """1-D array of node labels that keeps each label intact.
+
+    Integer and string labels get a NumPy dtype, anything else, such as tuples or a mix of
+    types, an object array, so labels are never coerced into one another or broadcast.
+    """
+    labels = list(labels)
+    if labels and all(
+        isinstance(label, numbers.Integral) and not isinstance(label, bool) for label in labels
+    ):
+        arr = np.asarray(labels)
+        if arr.ndim == 1:
+            return arr
+    elif labels and all(isinstance(label, str) for label in labels):
+        return np.asarray(labels)
+    arr = np.empty(len(labels), dtype=object)
+    arr[:] = labels
+    return arr
+
+
+class NodeIndex:
+    """Dense ``0..n-1`` index of arbitrary hashable node labels.
+
+    Node ``i`` is ``labels[i]``. :meth:`encode` maps whole label arrays to int32 indices
+    (int64 beyond 2 ** 31 nodes) through a hash table built on first use, and
+    :meth:`decode` maps them back by fancy indexing. When the labels are exactly
+    ``0..n-1`` encoding only checks the range.
+    """
+
+    def __init__(self, labels):
+        self.labels = labels if isinstance(labels, np.ndarray) else label_array(labels)
+        self.dtype = np.dtype(np.int32 if len(self.labels) < 2**31 else np.int64)
+        self.contiguous = bool(
+            np.issubdtype(self.labels.dtype, np.integer)
+            and np.array_equal(self.labels, np.arange(self.labels.shape[0]))
+        )
+        self._lookup = None
+        self._validated = {}
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state.update(_lookup=None, _validated={})
+        return state
+
+    def __len__(self):
+        return self.labels.shape[0]
+
+    @property
+    def lookup(self):
+        """:class:`pandas.Index` of the labels, the hash table behind :meth:`encode`."""
+        if self._lookup is None:
+            self._lookup = pd.Index(self.labels)
+        return self._lookup
+
+    def encode(self, labels):
+        """Map an array of node labels to node indices, raising ``KeyError`` for unknown labels.
+
+        With contiguous labels an int32 or int64 array is its own index array and is
+        returned without a copy. Its range check is remembered for as long as the same
+        array object is alive, so scorers encoding one candidate array validate it once.
+        The array must not be modified in place in between.
+        """
+        labels = labels if isinstance(labels, np.ndarray) else np.asarray(labels)
+        if self.contiguous and labels.dtype in INDEX_DTYPES:
+            return self._validate_indices(labels)
+        if self.contiguous and labels.dtype.kind in "iuf":
+            # labels are already the indices, only check that they are valid
+            idx = labels.astype(self.dtype)
+            idx[(idx != labels) | (labels < 0) | (labels >= len(self))] = -1
+        else:
+            idx = self.lookup.get_indexer(labels.ravel()).reshape(labels.shape)
+            idx = idx.astype(self.dtype, copy=False)
+        if (idx < 0).any():
+            raise KeyError(f"Nodes not in graph: {np.unique(labels[idx < 0])[:10].tolist()}")
+        return idx
+
+    def _validate_indices(self, labels):
+        key = buffer_key(labels)
+        ref = self._validated.get(key)
+        if ref is not None and ref() is labels:
+            return labels
+        if labels.size and (labels.min() < 0 or labels.max() >= len(self)):
+            invalid = labels[(labels < 0) | (labels >= len(self))]
+            raise KeyError(f"Nodes not in graph: {np.unique(invalid)[:10].tolist()}")
+        validated = self._validated
+        self._validated[key] = weakref.ref(labels, lambda _: validated.pop(key, None))
+        return labels
+
+    def encode_edges(self, edges, num_edges):
+        """(num_edges, 2) node indices of an iterable of ``num_edges`` label pairs."""
+        endpoints = (node for edge in edges for node in edge)
+        dtype = self.labels.dtype if self.labels.dtype.kind in "iu" else object
+        labels = np.fromiter(endpoints, dtype=dtype, count=2 * num_edges)
+        return self.encode(labels).reshape(-1, 2)
+
+    def decode(self, idx):
+        """Map node indices back to node labels."""
+        return self.labels[idx]
+
+    def values_from_mapping(self, mapping, dtype=np.float64):
+        """Dense array of ``mapping[node]`` aligned to the index."""
+        values = np.empty(len(self), dtype=dtype)
+        idx = self.encode(label_array(mapping.keys()))
+        if idx.shape[0] < len(self):
+            missing = np.ones(len(self), dtype=bool)
+            missing[idx] = False
+            raise KeyError(f"Nodes missing from mapping: {self.labels[missing][:10].tolist()}")
+        values[idx] = np.fromiter(mapping.values(), dtype=dtype, count=len(mapping))
+        return values
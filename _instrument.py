@@ -0,0 +1,228 @@
+import contextlib
+import functools
+import json
+import logging
+import os
+import resource
+import threading
+import time
+import tracemalloc
+
+MEMORY_ENV = "EELP_INSTRUMENT_MEMORY"
+MEMORY_MODES = ("tracemalloc", "resource")
+
+_sinks = ()
+_memory = None
+_labels = {}
+_local = threading.local()
+
+
+class LoggingSink:
+    """Write every record as a JSON message to ``logger``."""
+
+    def __init__(self, logger=None, level=logging.INFO):
+        self.logger = logging.getLogger(__name__) if logger is None else logger
+        self.level = level
+
+    def __call__(self, record):
+        self.logger.log(self.level, json.dumps(record))
+
+
+class JsonlSink:
+    """Append every record as one JSON line to ``path``.
+
+    Lines are written with a single ``write`` on a file opened for appending, so
+    processes sharing the file do not interleave records.
+    """
+
+    def __init__(self, path):
+        self.path = path
+
+    def __call__(self, record):
+        with open(self.path, "a") as f:
+            f.write(json.dumps(record) + "\n")
+
+
+class MemorySink:
+    """Keep records in ``records`` until they are :meth:`drain` ed."""
+
+    def __init__(self):
+        self.records = []
+
+    def __call__(self, record):
+        self.records.append(record)
+
+    def drain(self):
+        records, self.records = self.records, []
+        return records
+
+
+def set_instrumentation(*sinks, memory=None):
+    """Send a record of every scorer fit and transform to ``sinks``, or disable without any.
+
+    ``memory`` adds the peak memory growth of each call over the memory in use at its
+    start: that of the allocations traced by ``"tracemalloc"``, which include NumPy
+    arrays, or that of the process resident set with ``"resource"``. The latter resets the
+    peak resident set of the process before every call through ``/proc/self/clear_refs``;
+    where that is not possible it records the growth of the lifetime maximum resident
+    set, zero for any call that stays below an earlier peak, and labels the records
+    ``"resource_high_water_mark"``. Worker processes pick up ``memory`` from the
+    ``EELP_INSTRUMENT_MEMORY`` environment variable, which this also sets.
+    """
+    global _sinks, _memory
+    if memory is not None and memory not in MEMORY_MODES:
+        raise ValueError(f"memory must be one of {MEMORY_MODES} or None, got {memory!r}")
+    _sinks = tuple(sinks)
+    _memory = memory
+    if memory is None:
+        os.environ.pop(MEMORY_ENV, None)
+    else:
+        os.environ[MEMORY_ENV] = memory
+
+
+def get_instrumentation():
+    """The active sinks and memory mode."""
+    return _sinks, _memory
+
+
+def emit(record):
+    """Send ``record`` to the active sinks, e.g. a record forwarded from a worker."""
+    for sink in _sinks:
+        sink(record)
+
+
+@contextlib.contextmanager
+def instrument_labels(**labels):
+    """Add ``labels``, such as the index of the network being processed, to the records."""
+    global _labels
+    previous = _labels
+    _labels = {**previous, **labels}
+    try:
+        yield
+    finally:
+        _labels = previous
+
+
+def _num_rows(X):
+    X = getattr(X, "X", X)
+    shape = getattr(X, "shape", None)
+    return int(shape[0]) if shape else len(X)
+
+
+def _graph_size(scorer):
+    G = getattr(scorer, "input_network", None)
+    try:
+        return G.number_of_nodes(), G.number_of_edges()
+    except AttributeError:
+        return None, None
+
+
+def _max_rss_bytes():
+    # ru_maxrss is in KiB on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def _rss_bytes():
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * resource.getpagesize()
+
+
+def _peak_rss_bytes():
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("VmHWM:"):
+                return int(line.split()[1]) * 1024
+    raise OSError("VmHWM not reported")
+
+
+def _reset_peak_rss():
+    """Reset the peak resident set of the process, False where the kernel does not allow it."""
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+        return True
+    except OSError:
+        return False
+
+
+def _measure(method, scorer, phase, X, args, kwargs):
+    memory = _memory
+    if memory == "tracemalloc":
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+        tracemalloc.reset_peak()
+        memory_before = tracemalloc.get_traced_memory()[0]
+    elif memory == "resource" and _reset_peak_rss():
+        memory_before = _rss_bytes()
+    elif memory == "resource":
+        memory = "resource_high_water_mark"
+        memory_before = _max_rss_bytes()
+    start = time.perf_counter()
+    result = method(scorer, X, *args, **kwargs)
+    seconds = time.perf_counter() - start
+    if memory == "tracemalloc":
+        peak_memory = tracemalloc.get_traced_memory()[1] - memory_before
+    elif memory == "resource":
+        peak_memory = _peak_rss_bytes() - memory_before
+    elif memory == "resource_high_water_mark":
+        peak_memory = _max_rss_bytes() - memory_before
+    else:
+        peak_memory = None
+    num_nodes, num_edges = _graph_size(scorer)
+    emit(
+        {
+            **_labels,
+            "scorer": type(scorer).__name__,
+            "phase": phase,
+            "seconds": seconds,
+            "rows": _num_rows(X),
+            "num_nodes": num_nodes,
+            "num_edges": num_edges,
+            "peak_memory_bytes": peak_memory,
+            "memory": memory,
+            "pid": os.getpid(),
+        }
+    )
+    return result
+
+
+def instrumented(method, phase):
+    """Wrap a scorer ``fit`` or ``transform`` so that it is recorded when instrumentation is on.
+
+    Only the outermost call is recorded, so subclasses calling their parent's method are
+    counted once. With no sinks the wrapper adds a single global lookup.
+    """
+
+    @functools.wraps(method)
+    def wrapper(self, X, *args, **kwargs):
+        if not _sinks or getattr(_local, "active", False):
+            return method(self, X, *args, **kwargs)
+        _local.active = True
+        try:
+            return _measure(method, self, phase, X, args, kwargs)
+        finally:
+            _local.active = False
+
+    return wrapper
+
+
+def forward_records(func, payload):
+    """Run ``func(payload)`` and return its output with the records of the call.
+
+    The records are labelled with the ``network_indices`` of the payload and collected
+    in place of the sinks of the calling process, so that pool workers return them to
+    the parent, which passes them to its own sinks with :func:`emit`. Module level so that
+    ``functools.partial(forward_records, func)`` can be sent to pool workers.
+    """
+    global _sinks, _memory
+    sink = MemorySink()
+    previous = _sinks, _memory
+    _sinks = (sink,)
+    _memory = os.environ.get(MEMORY_ENV) or _memory
+    network_indices = [g["network_index"] for g in payload.get("input_graphs", ())]
+    try:
+        with instrument_labels(network_indices=network_indices):
+            output = func(payload)
+    finally:
+        _sinks, _memory = previous
+    return output, sink.drain()
@@ -0,0 +1,51 @@
+from collections import OrderedDict
+
+import numpy as np
+
+
+def nbytes_of(value):
+    """Total ``nbytes`` of the arrays in ``value``, which may be an array or a tuple."""
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, tuple):
+        return sum(nbytes_of(item) for item in value)
+    return 0
+
+
+class LRUCache:
+    """In-memory LRU cache of array values bounded by the total ``nbytes`` of the values.
+
+    The most recently added value is always kept, even when it alone exceeds the budget.
+    """
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, key):
+        return key in self.entries
+
+    def get(self, key):
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.entries.move_to_end(key)
+        return entry[0]
+
+    def put(self, key, value):
+        if key in self.entries:
+            self.current_bytes -= self.entries.pop(key)[1]
+        nbytes = nbytes_of(value)
+        self.entries[key] = (value, nbytes)
+        self.current_bytes += nbytes
+        while self.current_bytes > self.max_bytes and len(self.entries) > 1:
+            _, (_, evicted_bytes) = self.entries.popitem(last=False)
+            self.current_bytes -= evicted_bytes
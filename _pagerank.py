@@ -0,0 +1,85 @@
+import networkx as nx
+import numpy as np
+
+from ._paths import neighbors_of
+
+
+def pagerank_power(
+    graph, personalization, alpha=0.85, tol=1e-6, max_iter=100, x0=None, strict=True
+):
+    """Batched PageRank power iteration on the CSR adjacency of ``graph``.
+
+    ``personalization`` is a dense (n, batch) block whose columns sum to one. Edge weights
+    are used when the graph has them, as ``networkx.pagerank`` does. Every column
+    follows the update of ``networkx.pagerank``: dangling mass is redistributed along the
+    personalization vector and a column has converged once its L1 change is below
+    ``n * tol``. ``x0`` is a warm start of the same shape, uniform by default. Returns the
+    (n, batch) solution, the number of iterations run and whether all columns converged.
+    With ``strict``, ``networkx.PowerIterationFailedConvergence`` is raised instead of
+    returning an unconverged solution.
+    """
+    n = graph.num_nodes
+    personalization = np.asarray(personalization, dtype=np.float64).reshape(n, -1)
+    adjacency = graph.adjacency_matrix(weighted=True)
+    degree = np.asarray(adjacency.sum(axis=1)).ravel()
+    inv_degree = np.divide(1.0, degree, out=np.zeros_like(degree), where=degree > 0)
+    dangling = degree == 0
+    if x0 is None:
+        x = np.full(personalization.shape, 1.0 / n)
+    else:
+        x = np.asarray(x0, dtype=np.float64).reshape(personalization.shape).copy()
+        x /= x.sum(axis=0, keepdims=True)
+    for iteration in range(1, max_iter + 1):
+        x_last = x
+        dangling_sum = x_last[dangling].sum(axis=0)
+        x = alpha * (adjacency @ (x_last * inv_degree[:, None]) + personalization * dangling_sum)
+        x += (1 - alpha) * personalization
+        if (np.abs(x - x_last).sum(axis=0) < n * tol).all():
+            return x, iteration, True
+    if strict:
+        raise nx.PowerIterationFailedConvergence(max_iter)
+    return x, max_iter, False
+
+
+def personalized_pagerank(graph, sources, alpha=0.85, tol=1e-6, max_iter=100):
+    """(n, len(sources)) personalized PageRank with a one-hot personalization per source."""
+    sources = np.asarray(sources, dtype=np.int64)
+    personalization = np.zeros((graph.num_nodes, sources.shape[0]))
+    personalization[sources, np.arange(sources.shape[0])] = 1.0
+    return pagerank_power(graph, personalization, alpha, tol, max_iter)[0]
+
+
+def push_pagerank(graph, source, alpha=0.85, epsilon=1e-7):
+    """Approximate personalized PageRank of ``source`` by Andersen-Chung-Lang push.
+
+    Every node whose residual exceeds ``epsilon`` times its degree pushes a ``1 - alpha``
+    share of it to its estimate and spreads the rest over its neighbors. Active nodes are
+    pushed together each round and only the neighbors of pushed nodes are rescanned, so
+    the work is local to the source. Residual mass of dangling nodes returns to the
+    source, as with ``networkx.pagerank``. Edge weights are ignored. Returns the sorted
+    node indices with a non-zero estimate and their values.
+    """
+    degree = graph.degree
+    estimate = np.zeros(graph.num_nodes)
+    residual = np.zeros(graph.num_nodes)
+    residual[source] = 1.0
+    active = np.array([source], dtype=np.int64)
+    touched = [active]
+    while active.shape[0]:
+        mass = residual[active]
+        residual[active] = 0.0
+        estimate[active] += (1 - alpha) * mass
+        spread = alpha * mass
+        is_dangling = degree[active] == 0
+        residual[source] += spread[is_dangling].sum()
+        senders = active[~is_dangling]
+        receivers = neighbors_of(graph, senders)
+        np.add.at(
+            residual, receivers, np.repeat(spread[~is_dangling] / degree[senders], degree[senders])
+        )
+        candidates = np.unique(np.append(receivers, source))
+        touched.append(candidates)
+        active = candidates[residual[candidates] > epsilon * np.maximum(degree[candidates], 1)]
+    support = np.unique(np.concatenate(touched))
+    support = support[estimate[support] > 0]
+    return support, estimate[support]
@@ -0,0 +1,173 @@
+import functools
+import multiprocessing
+import warnings
+from multiprocessing import Pool, shared_memory
+
+import numpy as np
+
+from ._cache import fitted_state
+from ._edges import EdgeIndex
+from ._graph import CompiledGraph
+from ._lru import LRUCache
+
+DEFAULT_BLOCK_SIZE = 2**17
+
+# scorer rebuilt by every worker process of a parallel transform
+_worker_scorer = None
+_worker_pairs = None
+_worker_shm = None
+
+
+class SharedArrays:
+    """NumPy arrays copied once into a shared memory block that worker processes map.
+
+    ``spec`` is a small picklable description from which :func:`attach_arrays` rebuilds
+    read-only zero-copy views of the arrays in any process. The block is released on
+    :meth:`close`, or when leaving the ``with`` block.
+    """
+
+    alignment = 64
+
+    def __init__(self, arrays):
+        layout = {}
+        size = 0
+        for name, arr in arrays.items():
+            layout[name] = (arr.dtype.str, arr.shape, size)
+            size += -(-arr.nbytes // self.alignment) * self.alignment
+        self.shm = shared_memory.SharedMemory(create=True, size=max(size, 1))
+        for name, arr in arrays.items():
+            dtype, shape, offset = layout[name]
+            np.ndarray(shape, dtype, buffer=self.shm.buf, offset=offset)[...] = arr
+        self.spec = (self.shm.name, layout)
+
+    def close(self):
+        self.shm.close()
+        self.shm.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def attach_arrays(spec):
+    """Shared memory block and read-only array views described by ``SharedArrays.spec``."""
+    name, layout = spec
+    shm = shared_memory.SharedMemory(name=name)
+    arrays = {}
+    for key, (dtype, shape, offset) in layout.items():
+        arr = np.ndarray(shape, dtype, buffer=shm.buf, offset=offset)
+        arr.flags.writeable = False
+        arrays[key] = arr
+    return shm, arrays
+
+
+def can_start_workers(task):
+    """Whether this process may start worker processes for ``task``, warning when it cannot.
+
+    Daemonic processes, such as the workers of a ``multiprocessing.Pool``, are not allowed
+    to have children, so work split over ``n_jobs`` processes runs serially in them.
+    """
+    if not multiprocessing.current_process().daemon:
+        return True
+    warnings.warn(
+        f"{task} runs serially: this is a daemonic process, such as a pool worker, which "
+        "cannot start worker processes"
+    )
+    return False
+
+
+def _is_shareable(value):
+    return isinstance(value, np.ndarray) and value.dtype.kind in "biufc"
+
+
+def _init_worker(spec, cls, params, state, num_nodes, sorted_neighbors):
+    global _worker_scorer, _worker_pairs, _worker_shm
+    # the views point into the block, keep it mapped for the life of the worker
+    _worker_shm, arrays = attach_arrays(spec)
+    graph = CompiledGraph(
+        np.arange(num_nodes),
+        arrays["indptr"],
+        arrays["indices"],
+        sorted_neighbors,
+        weights=arrays.get("weights"),
+    )
+    if "edge_keys" in arrays:
+        graph.cached("edge_index", lambda: EdgeIndex(arrays["edge_keys"], num_nodes, True))
+    scorer = cls(None, compiled_graph=graph, **params)
+    scorer.n_jobs = 1
+    vars(scorer).update(state)
+    vars(scorer).update(
+        {key.split(":", 1)[1]: arr for key, arr in arrays.items() if key.startswith("state:")}
+    )
+    _worker_scorer = scorer
+    _worker_pairs = arrays["pairs"]
+
+
+def _transform_block(bounds):
+    start, stop = bounds
+    return _worker_scorer.transform(_worker_pairs[start:stop])
+
+
+def transform_in_parallel(scorer, X):
+    """Transform of X split into ``block_size`` row blocks over ``n_jobs`` worker processes.
+
+    X is encoded to node-index pairs once and ordered by source node, so that the rows of
+    a source, whose PPR vector or BFS a scorer may cache, mostly fall in one block. The
+    pairs, the CSR arrays of the compiled graph and the numeric fitted arrays of ``scorer``
+    are placed in shared memory, from which every worker rebuilds the scorer over an
+    index-labelled copy of the graph. Other fitted state is sent to each worker once,
+    except the attributes listed in ``worker_excluded_state``, and caches start empty. The
+    result rows are in the order of X.
+    """
+    graph = scorer.get_compiled_graph()
+    pairs = scorer.encode_pairs(X)
+    # blocks of consecutive sources, so that per-source work is done by a single worker
+    order = np.argsort(pairs[:, 0], kind="stable")
+    pairs = np.ascontiguousarray(pairs[order], dtype=np.int64)
+    arrays = {"pairs": pairs, "indptr": graph.indptr, "indices": graph.indices}
+    if graph.weights is not None:
+        arrays["weights"] = graph.weights
+    if "edge_index" in graph._derived:
+        arrays["edge_keys"] = graph._derived["edge_index"].keys
+    state = {}
+    for name, value in fitted_state(scorer).items():
+        if name in scorer.worker_excluded_state:
+            continue
+        if _is_shareable(value):
+            arrays[f"state:{name}"] = value
+        elif isinstance(value, LRUCache):
+            state[name] = LRUCache(value.max_bytes)
+        else:
+            state[name] = value
+    params = scorer.get_params(deep=False)
+    del params["input_network"], params["compiled_graph"]
+    n_jobs = None if scorer.n_jobs is None or scorer.n_jobs < 0 else scorer.n_jobs
+    bounds = [
+        (start, min(start + scorer.block_size, pairs.shape[0]))
+        for start in range(0, pairs.shape[0], scorer.block_size)
+    ]
+    initargs = (type(scorer), params, state, graph.num_nodes, graph.sorted_neighbors)
+    with SharedArrays(arrays) as shared:
+        with Pool(n_jobs, initializer=_init_worker, initargs=(shared.spec, *initargs)) as pool:
+            blocks = pool.map(_transform_block, bounds, chunksize=1)
+    blocks = np.concatenate(blocks)
+    result = np.empty_like(blocks)
+    result[order] = blocks
+    return result
+
+
+def parallel_transform(transform):
+    """Wrap a scorer ``transform`` to run through :func:`transform_in_parallel` when enabled.
+
+    See :meth:`GraphScorer.transform_is_parallel`.
+    """
+
+    @functools.wraps(transform)
+    def wrapper(self, X):
+        if self.transform_is_parallel(X):
+            return transform_in_parallel(self, X)
+        return transform(self, X)
+
+    return wrapper
@@ -0,0 +1,113 @@
+import networkx as nx
+import numpy as np
+
+
+def neighbors_of(graph, frontier):
+    """Concatenated CSR neighbor lists of the nodes in ``frontier``."""
+    starts = graph.indptr[frontier]
+    lengths = graph.degree[frontier]
+    total = lengths.sum()
+    if total == 0:
+        return np.empty(0, dtype=graph.indices.dtype)
+    offsets = np.repeat(starts - np.cumsum(lengths) + lengths, lengths)
+    return graph.indices[offsets + np.arange(total)]
+
+
+def bfs_distances(graph, source, targets=None, max_hops=None):
+    """Hop distances from ``source`` as an int32 array with -1 for unreached nodes.
+
+    The search runs level by level over the CSR arrays of ``graph`` and stops once every
+    node in ``targets`` has been reached or ``max_hops`` levels were expanded. Returns the
+    distance array and whether the search is complete, i.e. every node with a distance up
+    to ``max_hops`` has been labelled.
+    """
+    dist = np.full(graph.num_nodes, -1, dtype=np.int32)
+    dist[source] = 0
+    frontier = np.array([source], dtype=np.int64)
+    pending = None if targets is None else np.asarray(targets)
+    depth = 0
+    while frontier.shape[0]:
+        if pending is not None:
+            pending = pending[dist[pending] < 0]
+            if pending.shape[0] == 0:
+                return dist, False
+        if max_hops is not None and depth >= max_hops:
+            break
+        depth += 1
+        nxt = neighbors_of(graph, frontier)
+        nxt = np.unique(nxt[dist[nxt] < 0])
+        dist[nxt] = depth
+        frontier = nxt
+    return dist, True
+
+
+def pair_distances(graph, pairs, cache, max_hops=None, unreachable=9999):
+    """Shortest path hop counts of node-index ``pairs`` with one BFS per distinct source.
+
+    Pairs are grouped by source and each BFS stops as soon as all of that source's targets
+    are labelled or ``max_hops`` is hit. Distance arrays are kept in ``cache``, an
+    :class:`LRUCache` keyed by source, so repeated sources are answered without a new
+    search. Pairs that are not connected within ``max_hops`` get ``unreachable``.
+    """
+    pairs = np.asarray(pairs, dtype=np.int64).reshape(-1, 2)
+    output = np.full(pairs.shape[0], unreachable, dtype=np.int64)
+    order = np.argsort(pairs[:, 0], kind="stable")
+    sources, starts = np.unique(pairs[order, 0], return_index=True)
+    for source, rows in zip(sources.tolist(), np.split(order, starts[1:])):
+        targets = pairs[rows, 1]
+        entry = cache.get(source)
+        if entry is not None:
+            dist, complete = entry
+            if not complete and (dist[targets] < 0).any():
+                entry = None
+        if entry is None:
+            dist, complete = bfs_distances(graph, source, targets, max_hops)
+            cache.put(source, (dist, complete))
+        found = dist[targets]
+        output[rows[found >= 0]] = found[found >= 0]
+    return output
+
+
+def diameter_bounds(graph, max_sweeps=None):
+    """Diameter of a connected graph by iterative fringe upper bounding (iFUB).
+
+    A double sweep from the highest degree node gives a lower bound and the middle ``u``
+    of a long shortest path. The eccentricities of the BFS levels of ``u`` are then
+    computed from the outermost level inwards, and the search stops as soon as no node
+    below the current level can be the end of a longer path. On most real graphs this
+    takes a handful of BFS. With ``max_sweeps`` the search stops after that many BFS.
+
+    Returns ``(lower, upper, num_sweeps)``, with ``lower == upper`` when exact.
+    Raises ``networkx.NetworkXError`` when the graph is not connected.
+    """
+    if graph.num_nodes == 0:
+        raise nx.NetworkXPointlessConcept("Cannot compute diameter of the null graph")
+    num_sweeps = 0
+
+    def sweep(source):
+        nonlocal num_sweeps
+        num_sweeps += 1
+        return bfs_distances(graph, source)[0]
+
+    dist = sweep(int(np.argmax(graph.degree)))
+    if (dist < 0).any():
+        raise nx.NetworkXError("Found infinite path length because the graph is not connected")
+    a = int(np.argmax(dist))
+    dist_a = sweep(a)
+    lower = int(dist_a.max())
+    dist_b = sweep(int(np.argmax(dist_a)))
+    on_path = (dist_a + dist_b == lower) & (dist_a == lower // 2)
+    dist_u = sweep(int(np.flatnonzero(on_path)[0]))
+    level = int(dist_u.max())
+    lower = max(lower, level)
+    upper = 2 * min(level, int(dist_a.max()))
+    while upper > lower and level > 0:
+        for node in np.flatnonzero(dist_u == level).tolist():
+            if max_sweeps is not None and num_sweeps >= max_sweeps:
+                return lower, upper, num_sweeps
+            lower = max(lower, int(sweep(node).max()))
+        # nodes of this level may still have an eccentricity up to 2 * level, only once
+        # all of them are done is every remaining node bounded by 2 * (level - 1)
+        upper = min(upper, 2 * (level - 1))
+        level -= 1
+    return lower, lower, num_sweeps
@@ -0,0 +1,77 @@
+from collections import defaultdict
+
+import numpy as np
+from sklearn.pipeline import FeatureUnion
+
+from ._base import GraphScorer, SharedBatch
+from ._neighborhood import DEFAULT_CHUNK_SIZE
+
+
+class FeaturePlan:
+    """Shared primitives needed by a list of fitted scorers.
+
+    Scorers of the same graph share its compiled arrays, including the degrees and the
+    triangle counts memoized on it. For every batch of rows the plan further shares the
+    validated frame, the node indices of the rows in every graph and one neighborhood
+    pass per graph, which computes the union of the neighborhood scores its scorers read.
+    ``requirements_`` maps each compiled graph to that union and ``consumers_`` each
+    ``(graph, primitive)`` to the indices of the scorers reading it.
+    """
+
+    def __init__(self, scorers, chunk_size=DEFAULT_CHUNK_SIZE):
+        self.scorers = scorers
+        self.chunk_size = chunk_size
+        self.requirements_ = defaultdict(set)
+        self.consumers_ = defaultdict(list)
+        for position, scorer in enumerate(scorers):
+            if not isinstance(scorer, GraphScorer):
+                continue
+            graph = scorer.get_compiled_graph()
+            names = scorer.neighborhood_score_names()
+            self.requirements_[graph].update(names)
+            self.consumers_[graph, "pairs" if names else "node_indices"].append(position)
+            if names:
+                self.consumers_[graph, "neighborhood"].append(position)
+
+    def batch(self, X):
+        """:class:`SharedBatch` of X carrying the requirements of the plan."""
+        return SharedBatch(X, self.requirements_, self.chunk_size)
+
+    def transform(self, X):
+        """Outputs of every scorer on X, computing each shared primitive once."""
+        batch = self.batch(X)
+        return [
+            scorer.transform(batch) if isinstance(scorer, GraphScorer) else scorer.transform(X)
+            for scorer in self.scorers
+        ]
+
+
+class GraphFeatureUnion(FeatureUnion):
+    """Drop-in :class:`sklearn.pipeline.FeatureUnion` that shares work between scorers.
+
+    Fitting is unchanged. Transform runs the fitted transformers through a
+    :class:`FeaturePlan`, so graph scorers share per-graph and per-batch primitives, and
+    stacks their outputs with the transformer weights applied like FeatureUnion does.
+    """
+
+    def fit_transform(self, X, y=None, **params):
+        return self.fit(X, y, **params).transform(X)
+
+    def transform(self, X, **params):
+        weights = self.transformer_weights or {}
+        active = [
+            (name, trans)
+            for name, trans in self.transformer_list
+            if not (isinstance(trans, str) and trans == "drop")
+        ]
+        if not active:
+            return np.zeros((len(X), 0))
+        scorers = [trans for _, trans in active if not isinstance(trans, str)]
+        outputs = iter(FeaturePlan(scorers).transform(X))
+        Xs = []
+        for name, trans in active:
+            output = X if isinstance(trans, str) else next(outputs)
+            if name in weights:
+                output = output * weights[name]
+            Xs.append(output)
+        return self._hstack(Xs)
@@ -0,0 +1,193 @@
+import warnings
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+import scipy.sparse as sp
+from scipy.sparse.linalg import ArpackNoConvergence, cg, eigsh, lobpcg, spsolve
+from sklearn.exceptions import ConvergenceWarning
+
+from ._pagerank import pagerank_power
+
+# below this many nodes a dense eigensolver is cheaper and more robust than ARPACK
+DENSE_EIGEN_LIMIT = 64
+
+
+@dataclass
+class SpectralDiagnostics:
+    """Convergence report of a spectral centrality computation."""
+
+    method: str
+    converged: bool
+    tol: float
+    iterations: Optional[int] = None
+    residual: Optional[float] = None
+    eigenvalue: Optional[float] = None
+    alpha: Optional[float] = None
+
+    def warn_if_not_converged(self, name):
+        if not self.converged:
+            warnings.warn(
+                f"{name} did not converge with {self.method} "
+                f"(tol={self.tol}, residual={self.residual})",
+                ConvergenceWarning,
+            )
+
+
+def _normalize(x):
+    x = x * np.sign(x.sum()) if x.sum() != 0 else x
+    norm = np.linalg.norm(x)
+    return x / norm if norm > 0 else x
+
+
+def leading_eigenpair(graph, tol=1e-6, max_iter=None, v0=None, method="arpack"):
+    """Largest eigenvalue and its eigenvector of the adjacency matrix of ``graph``.
+
+    Uses ARPACK (``eigsh``) or LOBPCG on the sparse adjacency, with ``v0`` as a warm start,
+    and a dense solver for graphs of at most ``DENSE_EIGEN_LIMIT`` nodes. The eigenvector
+    is returned non-negative with unit L2 norm, together with :class:`SpectralDiagnostics`.
+    A solver that does not converge returns its best estimate with ``converged=False``.
+    """
+    n = graph.num_nodes
+    adjacency = graph.adjacency_matrix()
+    iterations = None
+    converged = True
+    if graph.num_edges == 0:
+        vector, value, method = np.full(n, 1.0 / np.sqrt(max(n, 1))), 0.0, "trivial"
+    elif n <= DENSE_EIGEN_LIMIT:
+        values, vectors = np.linalg.eigh(adjacency.toarray())
+        value, vector, method = values[-1], vectors[:, -1], "dense"
+    elif method == "arpack":
+        if v0 is None:
+            v0 = np.ones(n)
+        try:
+            values, vectors = eigsh(adjacency, k=1, which="LA", v0=v0, tol=tol, maxiter=max_iter)
+        except ArpackNoConvergence as err:
+            converged = False
+            if err.eigenvalues.shape[0]:
+                values, vectors = err.eigenvalues, err.eigenvectors
+            else:
+                values, vectors = np.array([np.nan]), np.asarray(v0, dtype=np.float64)[:, None]
+        value, vector = values[0], vectors[:, 0]
+    elif method == "lobpcg":
+        x0 = (np.ones(n) if v0 is None else np.asarray(v0, dtype=np.float64)).reshape(n, 1)
+        values, vectors, history = lobpcg(
+            adjacency,
+            x0,
+            tol=tol,
+            maxiter=max_iter or 200,
+            largest=True,
+            retResidualNormsHistory=True,
+        )
+        value, vector, iterations = values[0], vectors[:, 0], len(history)
+    else:
+        raise ValueError(f"method must be 'arpack' or 'lobpcg', got {method!r}")
+    vector = np.abs(_normalize(vector))
+    residual = float(np.linalg.norm(adjacency @ vector - value * vector))
+    if method == "lobpcg":
+        converged = residual <= tol * max(abs(value), 1.0)
+    diagnostics = SpectralDiagnostics(
+        method, converged, tol, iterations=iterations, residual=residual, eigenvalue=float(value)
+    )
+    return vector, diagnostics
+
+
+def eigenvector_centrality(graph, tol=1e-6, max_iter=None, v0=None, method="arpack"):
+    """Eigenvector centrality, the leading adjacency eigenvector with unit L2 norm."""
+    return leading_eigenpair(graph, tol, max_iter, v0, method)
+
+
+def spectral_radius(graph, tol=1e-6):
+    """Largest adjacency eigenvalue of ``graph``."""
+    return leading_eigenpair(graph, tol)[1].eigenvalue
+
+
+def katz_centrality(
+    graph, alpha=None, beta=1.0, tol=1e-6, max_iter=1000, x0=None, solver="cg", normalized=True
+):
+    """Katz centrality ``x = alpha * A x + beta`` on the sparse adjacency of ``graph``.
+
+    Without ``alpha``, ``0.9 / rho(A)`` is used so that the Katz series converges; a given
+    ``alpha`` costs no eigensolve and only warns when it is not below ``1 / d``, with ``d``
+    the larger of the mean degree and the square root of the maximum degree, lower bounds
+    of ``rho(A)``. The system is solved with conjugate gradients (``solver="cg"``), falling
+    back to a sparse direct solve when they fail, or summed as a power series
+    (``solver="series"``). ``x0`` warm starts either iterative solver. With ``normalized``
+    the result has unit L2 norm like ``networkx.katz_centrality_numpy``.
+    """
+    n = graph.num_nodes
+    adjacency = graph.adjacency_matrix()
+    radius = None
+    if alpha is None:
+        radius = spectral_radius(graph)
+        alpha = 0.9 / radius if radius > 0 else 0.1
+    elif n:
+        radius_bound = max(graph.degree.mean(), np.sqrt(graph.degree.max()))
+        if alpha * radius_bound >= 1:
+            warnings.warn(
+                f"Katz alpha={alpha} is not below 1 / rho(A) <= {1 / radius_bound:.6g}, the "
+                "Katz series diverges and the solution is not a centrality"
+            )
+    b = np.full(n, float(beta))
+    if x0 is not None:
+        # a warm start may be normalized, rescale it to best fit the unnormalized system
+        x0 = np.asarray(x0, dtype=np.float64)
+        mx0 = x0 - alpha * (adjacency @ x0)
+        denom = mx0 @ mx0
+        x0 = x0 * (mx0 @ b / denom) if denom > 0 else None
+    iterations = 0
+    if solver == "series":
+        x = b.copy() if x0 is None else np.asarray(x0, dtype=np.float64).copy()
+        converged = False
+        for iterations in range(1, max_iter + 1):
+            x_last = x
+            x = alpha * (adjacency @ x_last) + b
+            if np.abs(x - x_last).sum() < n * tol:
+                converged = True
+                break
+        method = "series"
+    elif solver == "cg":
+        system = sp.identity(n, format="csr") - alpha * adjacency
+
+        def count(_):
+            nonlocal iterations
+            iterations += 1
+
+        # the system is only positive definite while alpha < 1 / rho(A)
+        x, info = cg(system, b, x0=x0, rtol=tol, maxiter=max_iter, callback=count)
+        converged = info == 0
+        method = "cg"
+        if not converged:
+            x = spsolve(system.tocsc(), b)
+            converged = bool(np.isfinite(x).all())
+            method = "spsolve"
+    else:
+        raise ValueError(f"solver must be 'cg' or 'series', got {solver!r}")
+    residual = float(np.linalg.norm(x - alpha * (adjacency @ x) - b))
+    if normalized:
+        x = _normalize(x)
+    diagnostics = SpectralDiagnostics(
+        method,
+        converged,
+        tol,
+        iterations=None if method == "spsolve" else iterations,
+        residual=residual,
+        eigenvalue=None if radius is None else float(radius),
+        alpha=float(alpha),
+    )
+    return x, diagnostics
+
+
+def pagerank(graph, alpha=0.85, tol=1e-6, max_iter=100, x0=None):
+    """Global PageRank by sparse power iteration, see :func:`pagerank_power`.
+
+    Non-convergence is reported in the diagnostics with the last iterate returned instead
+    of raising.
+    """
+    n = graph.num_nodes
+    personalization = np.full((n, 1), 1.0 / n)
+    x, iterations, converged = pagerank_power(
+        graph, personalization, alpha, tol, max_iter, x0, strict=False
+    )
+    diagnostics = SpectralDiagnostics("power", converged, tol, iterations=iterations, alpha=alpha)
+    return x[:, 0], diagnostics
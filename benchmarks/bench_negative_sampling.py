@@ -0,0 +1,57 @@
+"""Peak memory and wall time of negative pair sampling as the graph grows.
+
+Run with ``python -m eelp.models.benchmarks.bench_negative_sampling`` from the project root.
+The rejection sampler should stay flat in memory while the exhaustive enumeration grows
+with the square of the number of nodes.
+"""
+import time
+import tracemalloc
+
+import click
+import networkx as nx
+
+from eelp.models.sampling import GraphSampler
+
+
+def measure(sampler, num_samples, method):
+    G_orig = sampler.input_network
+    G_sample = nx.Graph()
+    G_sample.add_nodes_from(G_orig.nodes)
+    tracemalloc.start()
+    start = time.perf_counter()
+    if method == "rejection":
+        sampler.sample_pos_neg_edges(G_orig, G_sample, num_samples)
+    else:
+        sampler.get_pos_neg_edges(G_orig, G_sample).groupby("label").sample(
+            n=num_samples, replace=True, random_state=0
+        )
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+@click.command()
+@click.option("--sizes", default="1000,4000,16000,64000", show_default=True)
+@click.option("--avg-degree", default=8, type=click.INT, show_default=True)
+@click.option("--n-samples", "num_samples", default=10000, type=click.INT, show_default=True)
+@click.option(
+    "--exhaustive-limit",
+    default=4000,
+    type=click.INT,
+    show_default=True,
+    help="Largest graph on which the exhaustive enumeration is also measured.",
+)
+def main(sizes, avg_degree, num_samples, exhaustive_limit):
+    click.echo(f"{'method':>10} {'nodes':>8} {'seconds':>9} {'peak MiB':>9}")
+    for num_nodes in [int(i) for i in sizes.split(",")]:
+        G = nx.gnm_random_graph(num_nodes, num_nodes * avg_degree // 2, seed=0)
+        methods = ["rejection"] + (["exhaustive"] if num_nodes <= exhaustive_limit else [])
+        for method in methods:
+            sampler = GraphSampler(G, random_state=0, negative_sampling=method)
+            elapsed, peak = measure(sampler, num_samples, method)
+            click.echo(f"{method:>10} {num_nodes:>8} {elapsed:>9.3f} {peak / 2**20:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
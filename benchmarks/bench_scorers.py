@@ -0,0 +1,291 @@
+"""Wall time, peak RSS and throughput of every graph scorer and of ``GraphSampler.sample``.
+
+Run with ``python -m eelp.models.benchmarks.bench_scorers run -o results.json`` from the
+project root, and check a new run against a stored baseline with
+``python -m eelp.models.benchmarks.bench_scorers compare baseline.json results.json``.
+
+Graphs are generated locally from the Erdos-Renyi, Barabasi-Albert, stochastic block
+model and powerlaw cluster families, so the suite runs offline on a CPU-only machine.
+Every measurement runs in a forked child process and reports the growth of its resident
+set over the state at fork time as peak RSS. A target that exceeds ``--budget`` seconds
+on a graph is skipped on the larger graphs of the same family.
+"""
+import importlib
+import json
+import multiprocessing
+import platform
+import resource
+import sys
+import time
+from datetime import datetime, timezone
+
+import click
+import networkx as nx
+import numpy as np
+
+from eelp.models._base import GraphScorer
+from eelp.models.sampling import GraphSampler
+
+SCORER_MODULES = (
+    "eelp.models._base",
+    "eelp.models.node_predictors",
+    "eelp.models.pairwise_predictors",
+    "eelp.models.model_predictors",
+)
+FAMILIES = ("er", "ba", "sbm", "plc")
+AVG_DEGREE = 10
+
+# state inherited by the forked measurement processes
+_graph = None
+_X = None
+
+
+def make_graph(family, num_edges, seed=0):
+    """Connected-ish graph of ``family`` with about ``num_edges`` edges and average degree 10."""
+    num_nodes = max(2 * num_edges // AVG_DEGREE, AVG_DEGREE + 1)
+    m = AVG_DEGREE // 2
+    if family == "er":
+        return nx.gnm_random_graph(num_nodes, num_edges, seed=seed)
+    if family == "ba":
+        return nx.barabasi_albert_graph(num_nodes, m, seed=seed)
+    if family == "plc":
+        return nx.powerlaw_cluster_graph(num_nodes, m, 0.3, seed=seed)
+    if family == "sbm":
+        num_blocks = 10
+        sizes = [num_nodes // num_blocks] * num_blocks
+        sizes[0] += num_nodes - sum(sizes)
+        # four fifths of the degree inside the block
+        p_in = 0.8 * AVG_DEGREE / sizes[1]
+        p_out = 0.2 * AVG_DEGREE / (num_nodes - sizes[1])
+        probs = np.full((num_blocks, num_blocks), p_out)
+        np.fill_diagonal(probs, min(p_in, 1.0))
+        G = nx.stochastic_block_model(sizes, probs.tolist(), seed=seed, sparse=True)
+        return nx.Graph(G)
+    raise ValueError(f"Unknown graph family {family!r}")
+
+
+def discover_scorers():
+    """Every concrete :class:`GraphScorer` subclass of the scorer modules that import."""
+    unavailable = {}
+    for name in SCORER_MODULES:
+        try:
+            importlib.import_module(name)
+        except ImportError as exc:
+            unavailable[name] = str(exc)
+    scorers = {}
+    pending = list(GraphScorer.__subclasses__())
+    while pending:
+        cls = pending.pop()
+        pending.extend(cls.__subclasses__())
+        # base classes such as PairwiseScorer leave fit and transform to their subclasses
+        concrete = hasattr(cls, "fit") and hasattr(cls, "transform")
+        if cls.__module__ in SCORER_MODULES and concrete:
+            scorers[cls.__name__] = cls
+    return dict(sorted(scorers.items())), unavailable
+
+
+def _rss_bytes():
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * resource.getpagesize()
+
+
+def _run_target(target, conn):
+    """Measure one target in a forked child and send the records back through ``conn``."""
+    try:
+        baseline = _rss_bytes()
+        records = []
+
+        def timed(phase, func, rows):
+            start = time.perf_counter()
+            func()
+            seconds = time.perf_counter() - start
+            # ru_maxrss is in KiB on Linux
+            peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+            records.append(
+                {
+                    "phase": phase,
+                    "seconds": seconds,
+                    "rows": rows,
+                    "rows_per_second": rows / seconds if seconds > 0 else None,
+                    "peak_rss_mib": max(peak - baseline, 0) / 2**20,
+                }
+            )
+
+        rows = _X.shape[0]
+        if target.startswith("GraphSampler"):
+            backend = target.split(":")[1]
+            sampler = GraphSampler(
+                _graph, random_state=0, negative_sampling="rejection", backend=backend
+            )
+            timed("sample", lambda: sampler.sample(num_samples=rows // 2), rows)
+        else:
+            scorer = discover_scorers()[0][target](_graph)
+            timed("fit", lambda: scorer.fit(_X), rows)
+            timed("transform", lambda: scorer.transform(_X), rows)
+        conn.send(("ok", records))
+    except Exception as exc:  # report any failure of the target to the parent
+        conn.send(("error", f"{type(exc).__name__}: {exc}"))
+    finally:
+        conn.close()
+
+
+def measure(target, timeout):
+    ctx = multiprocessing.get_context("fork")
+    parent, child = ctx.Pipe(duplex=False)
+    process = ctx.Process(target=_run_target, args=(target, child))
+    process.start()
+    child.close()
+    if parent.poll(timeout):
+        status, payload = parent.recv()
+    else:
+        status, payload = "timeout", f"exceeded {timeout}s"
+    if process.is_alive():
+        process.kill()
+    process.join()
+    return status, payload
+
+
+@click.group()
+def cli():
+    pass
+
+
+@cli.command()
+@click.option("--output", "-o", "output_path", required=True, type=click.Path(dir_okay=False))
+@click.option("--families", default=",".join(FAMILIES), show_default=True)
+@click.option("--edges", default="1000,10000,100000,1000000", show_default=True)
+@click.option("--rows", default=10000, type=click.INT, show_default=True)
+@click.option("--scorers", default=None, help="Comma separated scorer names, all by default.")
+@click.option(
+    "--budget",
+    default=60.0,
+    type=click.FLOAT,
+    show_default=True,
+    help="Seconds after which a target is stopped and skipped on larger graphs.",
+)
+def run(output_path, families, edges, rows, scorers, budget):
+    """Benchmark the scorers and the sampler on every family and size."""
+    global _graph, _X
+    available, unavailable = discover_scorers()
+    for name, reason in unavailable.items():
+        click.echo(f"skipping {name}: {reason}", err=True)
+    names = list(available) if scorers is None else scorers.split(",")
+    targets = names + ["GraphSampler:networkx", "GraphSampler:array"]
+    results = []
+    for family in families.split(","):
+        over_budget = set()
+        for num_edges in [int(i) for i in edges.split(",")]:
+            _graph = make_graph(family, num_edges)
+            rng = np.random.default_rng(0)
+            _X = rng.integers(0, _graph.number_of_nodes(), size=(rows, 2))
+            for target in targets:
+                if target in over_budget:
+                    continue
+                status, payload = measure(target, budget)
+                base = {
+                    "family": family,
+                    "num_nodes": _graph.number_of_nodes(),
+                    "num_edges": _graph.number_of_edges(),
+                    "size": num_edges,
+                    "target": target,
+                }
+                if status != "ok":
+                    over_budget.add(target)
+                    results.append({**base, "phase": None, "status": status, "error": payload})
+                    click.echo(f"{family:>4} {num_edges:>8} {target:<36} {status}: {payload}")
+                    continue
+                for record in payload:
+                    results.append({**base, **record, "status": status})
+                    click.echo(
+                        f"{family:>4} {num_edges:>8} {target:<36} {record['phase']:>9} "
+                        f"{record['seconds']:>9.3f}s {record['peak_rss_mib']:>8.1f} MiB"
+                    )
+    report = {
+        "created": datetime.now(timezone.utc).isoformat(),
+        "python": sys.version.split()[0],
+        "numpy": np.__version__,
+        "networkx": nx.__version__,
+        "platform": platform.platform(),
+        "rows": rows,
+        "results": results,
+    }
+    with open(output_path, "w") as f:
+        json.dump(report, f, indent=2)
+
+
+def _index(report):
+    return {
+        (r["family"], r["size"], r["target"], r["phase"]): r
+        for r in report["results"]
+        if r["status"] == "ok"
+    }
+
+
+def _failures(report):
+    """Smallest size at which each ``(family, target)`` failed or ran over budget."""
+    failures = {}
+    for r in report["results"]:
+        if r["status"] != "ok":
+            key = (r["family"], r["target"])
+            failures[key] = min(r["size"], failures.get(key, r["size"]))
+    return failures
+
+
+@cli.command()
+@click.argument("baseline_path", type=click.Path(exists=True, dir_okay=False))
+@click.argument("current_path", type=click.Path(exists=True, dir_okay=False))
+@click.option(
+    "--threshold",
+    default=1.25,
+    type=click.FLOAT,
+    show_default=True,
+    help="Time ratio over the baseline reported as a slowdown.",
+)
+@click.option(
+    "--min-seconds",
+    default=0.05,
+    type=click.FLOAT,
+    show_default=True,
+    help="Baseline times below this are too noisy to compare.",
+)
+def compare(baseline_path, current_path, threshold, min_seconds):
+    """Flag targets that got slower than the baseline or now fail, exiting with 1 if any did.
+
+    A measurement that succeeded in the baseline fails in the current run when its target
+    errored or ran over budget on that graph or on a smaller one of the same family.
+    """
+    with open(baseline_path) as f:
+        baseline = _index(json.load(f))
+    with open(current_path) as f:
+        current_report = json.load(f)
+    current = _index(current_report)
+    failures = _failures(current_report)
+    slowdowns = 0
+    for key in sorted(set(baseline) & set(current), key=str):
+        before, after = baseline[key]["seconds"], current[key]["seconds"]
+        if before < min_seconds:
+            continue
+        ratio = after / before
+        if ratio > threshold:
+            slowdowns += 1
+            family, size, target, phase = key
+            click.echo(
+                f"SLOWER {family:>4} {size:>8} {target:<36} {phase:>9} "
+                f"{before:.3f}s -> {after:.3f}s ({ratio:.2f}x)"
+            )
+    failed = 0
+    for key in sorted(set(baseline) - set(current), key=str):
+        family, size, target, phase = key
+        if failures.get((family, target), float("inf")) <= size:
+            failed += 1
+            click.echo(f"FAILED {family:>4} {size:>8} {target:<36} {phase:>9}")
+        else:
+            click.echo(f"MISSING {key}")
+    compared = len(set(baseline) & set(current))
+    click.echo(f"{slowdowns} of {compared} measurements slower than {threshold}x the baseline")
+    click.echo(f"{failed} measurements of the baseline failed or ran over budget")
+    sys.exit(1 if slowdowns or failed else 0)
+
+
+if __name__ == "__main__":
+    cli()
@@ -1,12 +1,19 @@
 import logging
+from functools import partial
 from logging.handlers import TimedRotatingFileHandler
 from multiprocessing import Pool, cpu_count
 from pathlib import Path
 
 import click
-import numpy as np
 
-from eelp.utils.parallel_utils import chunk, process_shap
+from eelp.models.shap_batches import (
+    SHAP_DIR,
+    commit_shap,
+    explain_graph,
+    is_shap_complete,
+    order_by_cost,
+)
+from eelp.utils.parallel_utils import process_shap
 
 
 @click.command()
@@ -14,26 +21,54 @@ from eelp.utils.parallel_utils import chunk, process_shap
     "--data-path", "data_path", required=True, type=click.Path(exists=True, dir_okay=True)
 )
 @click.option("--num-procs", type=click.INT, default=-1)
-def main(data_path, num_procs):
+@click.option(
+    "--batch-size",
+    type=click.INT,
+    default=1000,
+    show_default=True,
+    help="Rows explained at a time, which bounds the SHAP values held in memory.",
+)
+@click.option(
+    "--background-size",
+    type=click.INT,
+    default=100,
+    show_default=True,
+    help="Rows sampled as the explainer background.",
+)
+@click.option(
+    "--force",
+    is_flag=True,
+    default=False,
+    help="Recompute graphs already explained, discarding their stored batches.",
+)
+def main(data_path, num_procs, batch_size, background_size, force):
     procs = num_procs if num_procs > 0 else cpu_count()
     data_path = Path(data_path).resolve()
 
-    output_paths = [i for i in data_path.glob("*") if i.is_dir()]
-    num_graphs_per_proc = len(output_paths) / float(procs)
-    num_graphs_per_proc = int(np.ceil(num_graphs_per_proc))
-    chunked_paths = chunk(output_paths, num_graphs_per_proc)
+    # graph directories are named by network index, skip the edge store and results
+    output_paths = [i for i in data_path.glob("*") if i.is_dir() and i.name.isdigit()]
+    if not force:
+        output_paths = [i for i in output_paths if not is_shap_complete(i)]
+    # One graph per task, most rows times features first, so workers stay balanced
     payloads = []
-
-    for idx, graph_set in enumerate(chunked_paths):
-        data = {"id": idx, "graph_paths": graph_set}
+    for idx, graph_path in enumerate(order_by_cost(output_paths)):
+        data = {
+            "id": idx,
+            "graph_paths": [graph_path],
+            "batch_size": batch_size,
+            "background_size": background_size,
+            "shap_path": graph_path / SHAP_DIR,
+            "force": force,
+        }
         payloads.append(data)
 
     # Now we use multiprocessing
     logger.info("Launching pool using {} processes...".format(procs))
-    pool = Pool(processes=procs)
-    pool.map(process_shap, payloads)
-    pool.close()
-    pool.join()
+    # process_shap explains one batch of rows per call, see explain_graph
+    explain = partial(commit_shap, partial(explain_graph, process_shap))
+    with Pool(processes=procs) as pool:
+        for graph_path in pool.imap_unordered(explain, payloads):
+            logger.info("Computed SHAP values for {}".format(graph_path))
     logger.info("Multiprocessing complete")
 
 
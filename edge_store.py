@@ -0,0 +1,136 @@
+import json
+import os
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from .result_sink import atomic_write
+
+EDGES_FILE = "edges.npy"
+METADATA_FILE = "metadata.csv"
+SOURCE_FILE = "source.json"
+
+_open_stores = {}
+
+
+def source_fingerprint(path):
+    """Resolved path, size and modification time of the input file ``path``."""
+    path = Path(path).resolve()
+    stat = os.stat(path)
+    return {"path": str(path), "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+def write_edge_store(df, directory, edges_column="edges_id", source=None):
+    """Write the edge lists of ``df`` into one memory-mappable edge store.
+
+    All edge lists are concatenated into a single (total_edges, 2) int32 ``edges.npy``.
+    ``metadata.csv`` holds one row per network with its ``network_index``,
+    ``network_name``, ``level_0``, ``num_nodes``, ``num_edges`` and the ``offset`` and
+    ``length`` of its rows in the edge array. ``source``, the :func:`source_fingerprint`
+    of the file ``df`` was read from, is recorded in ``source.json``. Every file is
+    written to a temporary file and renamed into place. Returns the opened
+    :class:`EdgeStore`.
+    """
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    lengths = np.fromiter((len(edges) for edges in df[edges_column]), dtype=np.int64)
+    offsets = np.concatenate(([0], np.cumsum(lengths)[:-1])).astype(np.int64)
+    tmp_path = directory / f".{EDGES_FILE}.tmp"
+    edges_out = np.lib.format.open_memmap(
+        tmp_path, mode="w+", dtype=np.int32, shape=(int(lengths.sum()), 2)
+    )
+    for offset, length, edges in zip(offsets, lengths, df[edges_column]):
+        edges = np.asarray(edges, dtype=np.int64).reshape(-1, 2)
+        if edges.size and (edges.min() < 0 or edges.max() > np.iinfo(np.int32).max):
+            raise ValueError("Edge store node ids must be non-negative int32 values")
+        stop = offset + length
+        edges_out[offset:stop] = edges
+    edges_out.flush()
+    del edges_out
+    tmp_path.replace(directory / EDGES_FILE)
+    metadata = pd.DataFrame(
+        {
+            "network_index": df["network_index"].astype(np.int64).to_numpy(),
+            "network_name": df["network_name"].to_numpy(),
+            "level_0": df["level_0"].astype(np.int64).to_numpy(),
+            "num_nodes": df["number_nodes"].astype(np.int64).to_numpy(),
+            "num_edges": df["number_edges"].astype(np.int64).to_numpy(),
+            "offset": offsets,
+            "length": lengths,
+        }
+    )
+    atomic_write(directory / METADATA_FILE, metadata.to_csv(index=False).encode())
+    if source is not None:
+        atomic_write(directory / SOURCE_FILE, json.dumps(source).encode())
+    else:
+        (directory / SOURCE_FILE).unlink(missing_ok=True)
+    return EdgeStore(directory)
+
+
+class EdgeStore:
+    """Read-only view of an edge store written by :func:`write_edge_store`.
+
+    The edge array is memory-mapped, so the edges of a network are a zero-copy slice
+    that worker processes read straight from the page cache.
+    """
+
+    def __init__(self, directory):
+        self.directory = Path(directory)
+        self.edges = np.load(self.directory / EDGES_FILE, mmap_mode="r")
+        self.metadata = pd.read_csv(self.directory / METADATA_FILE)
+
+    @staticmethod
+    def exists(directory):
+        directory = Path(directory)
+        return (directory / EDGES_FILE).exists() and (directory / METADATA_FILE).exists()
+
+    @staticmethod
+    def source(directory):
+        """The ``source`` recorded by :func:`write_edge_store`, or None when it is unknown."""
+        try:
+            with open(Path(directory) / SOURCE_FILE) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    @classmethod
+    def check_source(cls, directory, source):
+        """Raise ``ValueError`` unless the store was written from the input ``source``."""
+        recorded = cls.source(directory)
+        if recorded != source:
+            raise ValueError(
+                f"Edge store {directory} was written from {recorded}, not from {source}; "
+                "remove it or choose another edge store directory"
+            )
+
+    def __len__(self):
+        return self.metadata.shape[0]
+
+    def edge_list(self, offset, length):
+        """(length, 2) int32 view of the edges starting at row ``offset``."""
+        stop = offset + length
+        return self.edges[offset:stop]
+
+
+def open_edge_store(directory):
+    """:class:`EdgeStore` of ``directory``, opened once per process."""
+    key = str(Path(directory).resolve())
+    if key not in _open_stores:
+        _open_stores[key] = EdgeStore(directory)
+    return _open_stores[key]
+
+
+def call_with_edges(func, payload):
+    """Run ``func(payload)`` after attaching the stored edges of its ``input_graphs``.
+
+    Graph meta dicts that carry ``edge_store``, ``offset`` and ``length`` instead of an
+    ``edge_list`` get ``edge_list`` set to the zero-copy int32 view of their edges.
+    Module level so that ``functools.partial(call_with_edges, func)`` can be sent to
+    pool workers.
+    """
+    for graph in payload["input_graphs"]:
+        if "edge_list" not in graph and "edge_store" in graph:
+            store = open_edge_store(graph["edge_store"])
+            graph["edge_list"] = store.edge_list(graph["offset"], graph["length"])
+    return func(payload)
@@ -1,3 +1,6 @@
+import warnings
+import weakref
+
 import graph_tool as gt
 import networkx as nx
 import numpy as np
@@ -6,13 +9,36 @@ from graph_tool.all import BlockState, minimize_blockmodel_dl
 from infomap import Infomap
 
 from ..utils import nx2gt
-from ._base import GraphScorer
+from ._base import GraphScorer, PairwiseScorer
+from ._community import (
+    codelength,
+    codelength_gain,
+    edge_weight_array,
+    map_equation_aggregates,
+    modularity,
+    modularity_aggregates,
+    modularity_gain,
+)
+from ._parallel import DEFAULT_BLOCK_SIZE
+
+# graph-tool copies of the scored graphs, keyed by content hash and kept while in use
+_gt_graphs: "weakref.WeakValueDictionary" = weakref.WeakValueDictionary()
 
 # TODO: Improve computation speed with parallelization where possible
 # TODO: Add Documentation
 
 
-class LouvainScorer(GraphScorer):
+class LouvainScorer(PairwiseScorer):
+    """Modularity gain of adding each pair as an edge, under the best Louvain partition.
+
+    Fit keeps the per-community degree sums and the intra-community weight of the
+    partition, from which transform derives the gain of every pair in closed form without
+    modifying ``input_network``. Pairs that are already edges score 0. Transform can run
+    on ``n_jobs`` processes.
+    """
+
+    worker_excluded_state = ("best_partition_",)
+
     def __init__(
         self,
         input_network: nx.Graph,
@@ -21,8 +47,11 @@ class LouvainScorer(GraphScorer):
         resolution=1.0,
         randomize=None,
         random_state=None,
+        n_jobs=1,
+        block_size=DEFAULT_BLOCK_SIZE,
+        compiled_graph=None,
     ):
-        super(LouvainScorer, self).__init__(input_network)
+        super(LouvainScorer, self).__init__(input_network, n_jobs, block_size, compiled_graph)
         self.weight = weight
         self.partition = partition
         self.resolution = resolution
@@ -30,6 +59,10 @@ class LouvainScorer(GraphScorer):
         self.random_state = random_state
         self.best_partition_ = None
         self.base_modularity_ = None
+        self.membership_ = None
+        self.total_weight_ = None
+        self.community_degree_ = None
+        self.internal_weight_ = None
 
     def fit(self, X, y=None):
         self.best_partition_ = community_louvain.best_partition(
@@ -40,57 +73,124 @@ class LouvainScorer(GraphScorer):
             self.randomize,
             self.random_state,
         )
-        self.base_modularity_ = community_louvain.modularity(
-            self.best_partition_, self.input_network
+        graph = self.get_compiled_graph()
+        _, self.membership_ = np.unique(
+            graph.values_from_mapping(self.best_partition_, dtype=np.int64), return_inverse=True
+        )
+        edges, weights = edge_weight_array(self.input_network, graph, self.weight)
+        (
+            self.total_weight_,
+            self.community_degree_,
+            self.internal_weight_,
+        ) = modularity_aggregates(self.membership_, edges, weights)
+        self.base_modularity_ = modularity(
+            self.total_weight_, self.community_degree_, self.internal_weight_
         )
         return self
 
     def transform(self, X):
-        X = self.make_dataset(X)
-        score = []
-        for e_pair in X.itertuples(name=None, index=False):
-            # Commenting out the below code in the interest of efficiency.
-            # Assumption is that the edges being scored are not part of the initial network
-            # Which is true for our analysis.
+        graph = self.get_compiled_graph()
+        pairs = self.encode_pairs(X)
+        score = modularity_gain(
+            pairs,
+            self.membership_,
+            self.total_weight_,
+            self.community_degree_,
+            self.internal_weight_,
+        )
+        # adding an existing edge leaves the graph, and its modularity, unchanged
+        score[graph.has_edges(pairs)] = 0.0
+        return score.reshape(-1, 1)
+
+
+class InfomapScorer(PairwiseScorer):
+    """Codelength saved by adding each pair as a link, under the Infomap partition.
+
+    With ``mode="fast"`` fit keeps the node strengths and the module flow and exit flow
+    aggregates of the map equation, and transform scores all pairs at once from local
+    updates of the affected terms, leaving ``im_`` untouched. ``mode="exact"`` adds each
+    link to ``im_`` and reruns Infomap on the fitted partition, for validation. Fast mode
+    needs a two-level undirected solution and falls back to exact mode with a warning
+    when the aggregates do not reproduce the codelength of ``im_``. Fast mode transforms
+    can run on ``n_jobs`` processes.
+    """
 
-            # in_copy = self.input_network.copy()
-            # if e_pair in in_copy.edges:
-            #     in_copy.remove_edge(*e_pair)
-            # q_wo_edge = community_louvain.modularity(self.partition, in_copy)
-            # in_copy.add_edge(*e_pair)
-            # q_w_edge = community_louvain.modularity(self.partition, in_copy)
-            # score.append(q_w_edge - q_wo_edge)
-            q_wo_edge = self.base_modularity_
-            self.input_network.add_edge(*e_pair)
-            q_w_edge = community_louvain.modularity(self.best_partition_, self.input_network)
-            self.input_network.remove_edge(*e_pair)
-            score.append(q_w_edge - q_wo_edge)
-        return np.array(score).reshape(-1, 1)
-
-
-class InfomapScorer(GraphScorer):
-    def __init__(self, input_network, args=None, two_level=True, num_trials=1):
-        super(InfomapScorer, self).__init__(input_network)
+    modes = ("fast", "exact")
+    worker_excluded_state = ("im_", "im_modules_")
+
+    def __init__(
+        self,
+        input_network,
+        args=None,
+        two_level=True,
+        num_trials=1,
+        mode="fast",
+        n_jobs=1,
+        block_size=DEFAULT_BLOCK_SIZE,
+        compiled_graph=None,
+    ):
+        super(InfomapScorer, self).__init__(input_network, n_jobs, block_size, compiled_graph)
         self.args = args
         self.two_level = two_level
         self.num_trials = num_trials
+        self.mode = mode
         self.im_ = None
         # self.im = Infomap(args=args, two_level=two_level, silent=True, num_trials=num_trials)
         # self.im.add_networkx_graph(self.input_network)
         self.im_modules_ = None
         self.im_code_length_ = None
+        self.mode_ = None
+        self.membership_ = None
+        self.node_strength_ = None
+        self.module_flow_ = None
+        self.module_exit_ = None
 
     def fit(self, X, y=None):
+        if self.mode not in self.modes:
+            raise ValueError(f"mode must be one of {self.modes}, got {self.mode!r}")
         self.im_ = Infomap(
             args=self.args, two_level=self.two_level, silent=True, num_trials=self.num_trials
         )
-        self.im_.add_networkx_graph(self.input_network)
+        # node labels by Infomap id, the ids differ from the labels for non-int labels
+        node_labels = self.im_.add_networkx_graph(self.input_network)
         self.im_.run()
         self.im_modules_ = self.im_.get_modules()
         self.im_code_length_ = self.im_.codelength
+        self.mode_ = self.mode
+        if self.mode == "fast":
+            graph = self.get_compiled_graph()
+            modules = {node_labels[node]: module for node, module in self.im_modules_.items()}
+            _, self.membership_ = np.unique(
+                graph.values_from_mapping(modules, dtype=np.int64), return_inverse=True
+            )
+            edges, weights = edge_weight_array(self.input_network, graph)
+            (
+                self.node_strength_,
+                self.module_flow_,
+                self.module_exit_,
+            ) = map_equation_aggregates(self.membership_, edges, weights, graph.num_nodes)
+            aggregate_length = codelength(self.node_strength_, self.module_flow_, self.module_exit_)
+            if not np.isclose(aggregate_length, self.im_code_length_, rtol=1e-9, atol=1e-9):
+                warnings.warn(
+                    f"Map equation aggregates give a codelength of {aggregate_length}, Infomap "
+                    f"reports {self.im_code_length_}; falling back to mode='exact'"
+                )
+                self.mode_ = "exact"
         return self
 
+    def supports_parallel_transform(self):
+        return self.mode_ == "fast"
+
     def transform(self, X):
+        if self.mode_ == "fast":
+            score = codelength_gain(
+                self.encode_pairs(X),
+                self.membership_,
+                self.node_strength_,
+                self.module_flow_,
+                self.module_exit_,
+            )
+            return score.reshape(-1, 1)
         X = self.make_dataset(X)
         im_score = []
         for e_pair in X.itertuples(name=None, index=False):
@@ -116,14 +216,40 @@ class InfomapScorer(GraphScorer):
 
 
 class MDLScorer(GraphScorer):
-    def __init__(self, input_network, deg_corr=False):
-        super(MDLScorer, self).__init__(input_network)
-        self.gt_in = nx2gt(input_network)
+    """Log probability of each pair as a missing edge under the fitted stochastic blockmodel.
+
+    The graph-tool copy of ``input_network`` is only built when ``gt_in`` is first used
+    and is shared, by content hash, between scorers of equal graphs such as clones.
+    With ``mode="batched"`` transform evaluates ``get_edges_prob`` once per group of pairs
+    with the same blocks, end degrees (for ``deg_corr``), self-loop and existing-edge flag,
+    which all share the same entropy terms. ``mode="per_pair"`` calls it for every row.
+    """
+
+    modes = ("batched", "per_pair")
+
+    def __init__(self, input_network, deg_corr=False, mode="batched", compiled_graph=None):
+        super(MDLScorer, self).__init__(input_network, compiled_graph)
         self.deg_corr = deg_corr
+        self.mode = mode
         self.block_state_ = None
         self.base_entropy_ = None
 
+    @property
+    def gt_in(self):
+        key = self.get_compiled_graph().content_hash
+        gt_graph = _gt_graphs.get(key)
+        if gt_graph is None:
+            gt_graph = nx2gt(self.input_network)
+            _gt_graphs[key] = gt_graph
+        return gt_graph
+
+    def fit_is_deterministic(self):
+        # minimize_blockmodel_dl is stochastic and takes no seed
+        return False
+
     def fit(self, X, y=None):
+        if self.mode not in self.modes:
+            raise ValueError(f"mode must be one of {self.modes}, got {self.mode!r}")
         self.block_state_ = minimize_blockmodel_dl(
             self.gt_in, state_args=dict(deg_corr=self.deg_corr)
         )
@@ -131,8 +257,40 @@ class MDLScorer(GraphScorer):
         return self
 
     def transform(self, X):
-        X = self.make_dataset(X)
-        dl_score = [
-            self.block_state_.get_edges_prob([i]) for i in X.itertuples(name=None, index=False)
-        ]
-        return np.array(dl_score).reshape(-1, 1)
+        # nx2gt adds the vertices in the node order of input_network, so graph-tool vertex
+        # i is node i of the compiled graph whatever the node labels are
+        pairs = self.encode_pairs(X).astype(np.int64)
+        if self.mode == "per_pair":
+            dl_score = [self.block_state_.get_edges_prob([tuple(pair)]) for pair in pairs.tolist()]
+            return np.array(dl_score).reshape(-1, 1)
+        first, inverse = self._group_pairs(pairs)
+        group_score = np.array(
+            [self.block_state_.get_edges_prob([tuple(pairs[row].tolist())]) for row in first]
+        )
+        return group_score[inverse].reshape(-1, 1)
+
+    def _group_pairs(self, pairs):
+        """Representative row and group id of node-index pairs with the same entropy change."""
+        state = self.block_state_
+        blocks = state.get_blocks().a[pairs]
+        if self.deg_corr:
+            degree = state.g.get_total_degrees(np.arange(state.g.num_vertices()))[pairs]
+        else:
+            degree = np.zeros_like(pairs)
+        # order the two ends so that (r, s) and (s, r) fall in the same group
+        swap = (blocks[:, 0] > blocks[:, 1]) | (
+            (blocks[:, 0] == blocks[:, 1]) & (degree[:, 0] > degree[:, 1])
+        )
+        blocks[swap] = blocks[swap, ::-1]
+        degree[swap] = degree[swap, ::-1]
+        graph = self.get_compiled_graph()
+        keys = np.column_stack(
+            (
+                blocks,
+                degree,
+                pairs[:, 0] == pairs[:, 1],
+                graph.has_edges(pairs),
+            )
+        )
+        _, first, inverse = np.unique(keys, axis=0, return_index=True, return_inverse=True)
+        return first, inverse.ravel()
@@ -1,167 +1,319 @@
-import networkx as nx
+import numbers
+
 import numpy as np
 
 from ._base import GraphScorer
+from ._centrality import path_centralities, rescale_betweenness, rescale_load
+from ._global import local_clustering, shared_triangle_counts
+from ._spectral import eigenvector_centrality, katz_centrality, pagerank
+
+
+def _warm_start_value(scorer, attribute, num_nodes):
+    previous = getattr(scorer, attribute, None) if scorer.warm_start else None
+    if previous is None or previous.shape[0] != num_nodes:
+        return None
+    return previous
+
+
+def _shared_path_centralities(scorer):
+    graph = scorer.get_compiled_graph()
+    params = (scorer.mode, scorer.k, scorer.epsilon, scorer.delta, scorer.random_state)
+
+    def compute():
+        return path_centralities(graph, *params, n_jobs=scorer.n_jobs)
+
+    if scorer.mode == "exact":
+        return graph.cached(("path_centralities", "exact"), compute)
+    if isinstance(scorer.random_state, numbers.Integral):
+        return graph.cached(("path_centralities",) + params, compute)
+    return compute()
 
 
 class PageRankScorer(GraphScorer):
-    def __init__(self, input_network):
-        super(PageRankScorer, self).__init__(input_network)
-        self.page_rank_dict_ = None
+    def __init__(
+        self,
+        input_network,
+        alpha=0.85,
+        tol=1e-6,
+        max_iter=100,
+        warm_start=False,
+        compiled_graph=None,
+    ):
+        super(PageRankScorer, self).__init__(input_network, compiled_graph)
+        self.alpha = alpha
+        self.tol = tol
+        self.max_iter = max_iter
+        self.warm_start = warm_start
+        self.page_rank_ = None
+        self.convergence_ = None
 
     def fit(self, X, y=None):
-        self.page_rank_dict_ = nx.pagerank(self.input_network)
+        graph = self.get_compiled_graph()
+        x0 = _warm_start_value(self, "page_rank_", graph.num_nodes)
+        self.page_rank_, self.convergence_ = pagerank(
+            graph, self.alpha, self.tol, self.max_iter, x0
+        )
+        self.convergence_.warn_if_not_converged("PageRank")
         return self
 
     def transform(self, X):
-        X = self.make_dataset(X)
-        pr = [self.page_rank_dict_[row.node_i] for row in X.itertuples(index=False)]
-        return np.array(pr).reshape(-1, 1)
+        return self.lookup_node_values(self.page_rank_, X)
 
 
 class LocalClusteringCoefficientScorer(GraphScorer):
-    def __init__(self, input_network):
-        super(LocalClusteringCoefficientScorer, self).__init__(input_network)
-        self.local_clustering_dict_ = None
+    def __init__(self, input_network, compiled_graph=None):
+        super(LocalClusteringCoefficientScorer, self).__init__(input_network, compiled_graph)
+        self.local_clustering_ = None
 
     def fit(self, X, y=None):
-        self.local_clustering_dict_ = nx.clustering(self.input_network)
+        self.local_clustering_ = local_clustering(self.get_compiled_graph())
         return self
 
     def transform(self, X):
-        X = self.make_dataset(X)
-        lcc = [self.local_clustering_dict_[row.node_i] for row in X.itertuples(index=False)]
-        return np.array(lcc).reshape(-1, 1)
+        return self.lookup_node_values(self.local_clustering_, X)
 
 
 class EigenvectorCentralityScorer(GraphScorer):
-    def __init__(self, input_network, tolerance=1e-6):
-        super(EigenvectorCentralityScorer, self).__init__(input_network)
+    def __init__(
+        self,
+        input_network,
+        tolerance=1e-6,
+        method="arpack",
+        max_iter=None,
+        warm_start=False,
+        compiled_graph=None,
+    ):
+        super(EigenvectorCentralityScorer, self).__init__(input_network, compiled_graph)
         self.tolerance = tolerance
-        self.eig_cen_dict_ = None
+        self.method = method
+        self.max_iter = max_iter
+        self.warm_start = warm_start
+        self.eig_cen_ = None
+        self.convergence_ = None
 
     def fit(self, X, y=None):
-        flag = 1
-        while flag == 1:
-            try:
-                self.eig_cen_dict_ = nx.eigenvector_centrality(
-                    self.input_network, tol=self.tolerance
-                )
-                flag = 0
-            except:
-                self.tolerance = self.tolerance * 1e1
+        graph = self.get_compiled_graph()
+        v0 = _warm_start_value(self, "eig_cen_", graph.num_nodes)
+        self.eig_cen_, self.convergence_ = eigenvector_centrality(
+            graph, self.tolerance, self.max_iter, v0, self.method
+        )
+        self.convergence_.warn_if_not_converged("Eigenvector centrality")
         return self
 
     def transform(self, X):
-        X = self.make_dataset(X)
-        eig_cent = [self.eig_cen_dict_[row.node_i] for row in X.itertuples(index=False)]
-        return np.array(eig_cent).reshape(-1, 1)
+        return self.lookup_node_values(self.eig_cen_, X)
 
 
 class DegreeCentralityScorer(GraphScorer):
-    def __init__(self, input_network):
-        super(DegreeCentralityScorer, self).__init__(input_network)
-        self.deg_cen_dict_ = None
+    def __init__(self, input_network, compiled_graph=None):
+        super(DegreeCentralityScorer, self).__init__(input_network, compiled_graph)
+        self.deg_cen_ = None
 
     def fit(self, X, y=None):
-        self.deg_cen_dict_ = nx.degree_centrality(self.input_network)
+        graph = self.get_compiled_graph()
+        if graph.num_nodes <= 1:
+            # matches nx.degree_centrality
+            self.deg_cen_ = np.ones(graph.num_nodes)
+        else:
+            self.deg_cen_ = graph.degree / (graph.num_nodes - 1.0)
         return self
 
     def transform(self, X):
-        X = self.make_dataset(X)
-        deg_cen = [self.deg_cen_dict_[row.node_i] for row in X.itertuples(index=False)]
-        return np.array(deg_cen).reshape(-1, 1)
+        return self.lookup_node_values(self.deg_cen_, X)
 
 
 class ClosenessCentralityScorer(GraphScorer):
-    def __init__(self, input_network):
-        super(ClosenessCentralityScorer, self).__init__(input_network)
-        self.closeness_cent_dict_ = None
+    """Closeness centrality from the BFS sweeps shared with betweenness and load.
+
+    ``mode="approximate"`` estimates distance sums from ``k`` pivot sweeps, or from the
+    number of pivots that bounds the betweenness error by ``epsilon`` with probability
+    ``1 - delta``. ``n_jobs`` splits the sweeps over worker processes.
+    """
+
+    def __init__(
+        self,
+        input_network,
+        mode="exact",
+        k=None,
+        epsilon=0.01,
+        delta=0.1,
+        random_state=None,
+        n_jobs=1,
+        compiled_graph=None,
+    ):
+        super(ClosenessCentralityScorer, self).__init__(input_network, compiled_graph)
+        self.mode = mode
+        self.k = k
+        self.epsilon = epsilon
+        self.delta = delta
+        self.random_state = random_state
+        self.n_jobs = n_jobs
+        self.closeness_cent_ = None
+
+    def fit_is_deterministic(self):
+        return self.mode == "exact" or super(ClosenessCentralityScorer, self).fit_is_deterministic()
 
     def fit(self, X, y=None):
-        self.closeness_cent_dict_ = nx.closeness_centrality(self.input_network)
+        self.closeness_cent_ = _shared_path_centralities(self)["closeness"]
         return self
 
     def transform(self, X):
-        X = self.make_dataset(X)
-        cc = [self.closeness_cent_dict_[row.node_i] for row in X.itertuples()]
-        return np.array(cc).reshape(-1, 1)
+        return self.lookup_node_values(self.closeness_cent_, X)
 
 
 class BetweennessCentralityScorer(GraphScorer):
-    def __init__(self, input_network, normalized=True):
-        super(BetweennessCentralityScorer, self).__init__(input_network)
+    """Betweenness centrality, exact or from ``k`` pivots as in ClosenessCentralityScorer.
+
+    ``error_bound_`` is the additive error on the normalized values that holds with
+    probability ``1 - delta``, zero in exact mode.
+    """
+
+    def __init__(
+        self,
+        input_network,
+        normalized=True,
+        mode="exact",
+        k=None,
+        epsilon=0.01,
+        delta=0.1,
+        random_state=None,
+        n_jobs=1,
+        compiled_graph=None,
+    ):
+        super(BetweennessCentralityScorer, self).__init__(input_network, compiled_graph)
         self.normalized = normalized
-        self.bet_cen_dict_ = None
+        self.mode = mode
+        self.k = k
+        self.epsilon = epsilon
+        self.delta = delta
+        self.random_state = random_state
+        self.n_jobs = n_jobs
+        self.bet_cen_ = None
+        self.error_bound_ = None
+
+    def fit_is_deterministic(self):
+        return (
+            self.mode == "exact" or super(BetweennessCentralityScorer, self).fit_is_deterministic()
+        )
 
     def fit(self, X, y=None):
-        self.bet_cen_dict_ = nx.betweenness_centrality(self.input_network, self.normalized)
+        centralities = _shared_path_centralities(self)
+        num_nodes = self.get_compiled_graph().num_nodes
+        self.bet_cen_ = rescale_betweenness(centralities["betweenness"], num_nodes, self.normalized)
+        self.error_bound_ = centralities["error_bound"]
         return self
 
     def transform(self, X):
-        X = self.make_dataset(X)
-        bet_cen = [self.bet_cen_dict_[row.node_i] for row in X.itertuples(index=False)]
-        return np.array(bet_cen).reshape(-1, 1)
+        return self.lookup_node_values(self.bet_cen_, X)
 
 
 class LoadCentralityScorer(GraphScorer):
-    def __init__(self, input_network, normalized=True):
-        super(LoadCentralityScorer, self).__init__(input_network)
+    """Load centrality, exact or from ``k`` pivots as in ClosenessCentralityScorer."""
+
+    def __init__(
+        self,
+        input_network,
+        normalized=True,
+        mode="exact",
+        k=None,
+        epsilon=0.01,
+        delta=0.1,
+        random_state=None,
+        n_jobs=1,
+        compiled_graph=None,
+    ):
+        super(LoadCentralityScorer, self).__init__(input_network, compiled_graph)
         self.normalized = normalized
-        self.load_cen_dict_ = None
+        self.mode = mode
+        self.k = k
+        self.epsilon = epsilon
+        self.delta = delta
+        self.random_state = random_state
+        self.n_jobs = n_jobs
+        self.load_cen_ = None
+
+    def fit_is_deterministic(self):
+        return self.mode == "exact" or super(LoadCentralityScorer, self).fit_is_deterministic()
 
     def fit(self, X, y=None):
-        self.load_cen_dict_ = nx.load_centrality(self.input_network, normalized=self.normalized)
+        centralities = _shared_path_centralities(self)
+        num_nodes = self.get_compiled_graph().num_nodes
+        self.load_cen_ = rescale_load(centralities["load"], num_nodes, self.normalized)
         return self
 
     def transform(self, X):
-        X = self.make_dataset(X)
-        load_cen = [self.load_cen_dict_[row.node_i] for row in X.itertuples()]
-        return np.array(load_cen).reshape(-1, 1)
+        return self.lookup_node_values(self.load_cen_, X)
 
 
 class KatzCentralityScorer(GraphScorer):
-    def __init__(self, input_network):
-        super(KatzCentralityScorer, self).__init__(input_network)
-        self.katz_cen_dict_ = None
+    """Katz centrality from a sparse solve.
+
+    ``alpha`` defaults to 0.1 like ``networkx.katz_centrality_numpy``; ``alpha=None`` uses
+    ``0.9 / rho(A)``, which always converges but costs an eigensolve.
+    """
+
+    def __init__(
+        self,
+        input_network,
+        alpha=0.1,
+        beta=1.0,
+        solver="cg",
+        tol=1e-6,
+        max_iter=1000,
+        warm_start=False,
+        compiled_graph=None,
+    ):
+        super(KatzCentralityScorer, self).__init__(input_network, compiled_graph)
+        self.alpha = alpha
+        self.beta = beta
+        self.solver = solver
+        self.tol = tol
+        self.max_iter = max_iter
+        self.warm_start = warm_start
+        self.katz_cen_ = None
+        self.convergence_ = None
 
     def fit(self, X, y=None):
-        self.katz_cen_dict_ = nx.katz_centrality_numpy(self.input_network)
+        graph = self.get_compiled_graph()
+        x0 = _warm_start_value(self, "katz_cen_", graph.num_nodes)
+        self.katz_cen_, self.convergence_ = katz_centrality(
+            graph, self.alpha, self.beta, self.tol, self.max_iter, x0, self.solver
+        )
+        self.convergence_.warn_if_not_converged("Katz centrality")
         return self
 
     def transform(self, X):
-        X = self.make_dataset(X)
-        katz_cen = [self.katz_cen_dict_[row.node_i] for row in X.itertuples(index=False)]
-        return np.array(katz_cen).reshape(-1, 1)
+        return self.lookup_node_values(self.katz_cen_, X)
 
 
 class NumTrianglesScorer(GraphScorer):
-    def __init__(self, input_network):
-        super(NumTrianglesScorer, self).__init__(input_network)
-        self.num_triangles_dict_ = None
+    def __init__(self, input_network, compiled_graph=None):
+        super(NumTrianglesScorer, self).__init__(input_network, compiled_graph)
+        self.num_triangles_ = None
 
     def fit(self, X, y=None):
-        self.num_triangles_dict_ = nx.triangles(self.input_network)
+        self.num_triangles_ = shared_triangle_counts(self.get_compiled_graph())
         return self
 
     def transform(self, X):
-        X = self.make_dataset(X)
-        num_triangles = [self.num_triangles_dict_[row.node_i] for row in X.itertuples(index=False)]
-        return np.array(num_triangles).reshape(-1, 1)
+        return self.lookup_node_values(self.num_triangles_, X)
 
 
 class AvgNeighborDegreeScorer(GraphScorer):
-    def __init__(self, input_network):
-        super(AvgNeighborDegreeScorer, self).__init__(input_network)
-        self.avg_neighbor_degree_dict_ = None
+    def __init__(self, input_network, compiled_graph=None):
+        super(AvgNeighborDegreeScorer, self).__init__(input_network, compiled_graph)
+        self.avg_neighbor_degree_ = None
 
     def fit(self, X, y=None):
-        self.avg_neighbor_degree_dict_ = nx.average_neighbor_degree(self.input_network)
+        graph = self.get_compiled_graph()
+        neighbor_degree_sum = graph.adjacency_matrix() @ graph.degree
+        self.avg_neighbor_degree_ = np.divide(
+            neighbor_degree_sum,
+            graph.degree,
+            out=np.zeros(graph.num_nodes),
+            where=graph.degree > 0,
+        )
         return self
 
     def transform(self, X):
-        X = self.make_dataset(X)
-        avg_neighbor_deg = [
-            self.avg_neighbor_degree_dict_[row.node_i] for row in X.itertuples(index=False)
-        ]
-        return np.array(avg_neighbor_deg).reshape(-1, 1)
+        return self.lookup_node_values(self.avg_neighbor_degree_, X)
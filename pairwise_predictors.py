@@ -1,112 +1,256 @@
 import networkx as nx
 import numpy as np
-import pandas as pd
 
-from ._base import GraphScorer
+from ._base import PairwiseScorer, SharedBatch
+from ._lru import LRUCache
+from ._neighborhood import DEFAULT_CHUNK_SIZE, NEIGHBORHOOD_SCORES, neighborhood_scores
+from ._pagerank import personalized_pagerank, push_pagerank
+from ._parallel import DEFAULT_BLOCK_SIZE
+from ._paths import pair_distances
 
 
-class CommonNeighborsScorer(GraphScorer):
+class CommonNeighborsScorer(PairwiseScorer):
+    def neighborhood_score_names(self):
+        return ("common_neighbors",)
+
     def fit(self, X, y=None):
         return self
 
-    def transform(self, X: pd.DataFrame):
-        common_neighbors = []
-        for row in X.itertuples():
-            cn = nx.common_neighbors(self.input_network, row.node_i, row.node_j)
-            common_neighbors.append(len(list(cn)))
-        return np.array(common_neighbors).reshape(-1, 1)
+    def transform(self, X):
+        cn = self.neighborhood(X)["common_neighbors"]
+        return cn.astype(np.int64).reshape(-1, 1)
 
 
-class AdamicAdarScorer(GraphScorer):
+class AdamicAdarScorer(PairwiseScorer):
+    def neighborhood_score_names(self):
+        return ("adamic_adar",)
+
     def fit(self, X, y=None):
         return self
 
     def transform(self, X):
-        X = self.make_dataset(X)
-        aa = nx.adamic_adar_index(self.input_network, X.itertuples(index=False, name=None))
-        return np.array([i[-1] for i in aa]).reshape(-1, 1)
+        aa = self.neighborhood(X)["adamic_adar"]
+        return aa.reshape(-1, 1)
 
 
-class ShortestPathScorer(GraphScorer):
-    def __init__(self, input_network):
-        super(ShortestPathScorer, self).__init__(input_network)
+class ShortestPathScorer(PairwiseScorer):
+    """Hop count of the shortest path between the two nodes of each pair.
+
+    With ``mode="bfs"`` fit only indexes the graph and transform runs one early-stopping
+    BFS per distinct source node, keeping the distance arrays in an LRU cache of at most
+    ``cache_bytes``. ``mode="all_pairs"`` precomputes every distance in fit. Pairs that are
+    not connected, or further apart than ``max_hops`` in BFS mode, score ``unreachable``.
+    BFS mode transforms can run on ``n_jobs`` processes, each with its own cache.
+    """
+
+    def __init__(
+        self,
+        input_network,
+        mode="bfs",
+        max_hops=None,
+        unreachable=9999,
+        cache_bytes=256 * 2**20,
+        n_jobs=1,
+        block_size=DEFAULT_BLOCK_SIZE,
+        compiled_graph=None,
+    ):
+        super(ShortestPathScorer, self).__init__(input_network, n_jobs, block_size, compiled_graph)
+        self.mode = mode
+        self.max_hops = max_hops
+        self.unreachable = unreachable
+        self.cache_bytes = cache_bytes
         self.shortest_path_mat = None
+        self.distance_cache_ = None
 
     def fit(self, X, y=None):
-        self.shortest_path_mat = dict(nx.shortest_path_length(self.input_network))
+        if self.mode == "all_pairs":
+            self.shortest_path_mat = dict(nx.shortest_path_length(self.input_network))
+        elif self.mode == "bfs":
+            self.get_compiled_graph()
+            self.distance_cache_ = LRUCache(self.cache_bytes)
+        else:
+            raise ValueError(f"mode must be 'bfs' or 'all_pairs', got {self.mode!r}")
         return self
 
+    def supports_parallel_transform(self):
+        return self.mode == "bfs"
+
     def transform(self, X):
+        if self.mode == "bfs":
+            sp = pair_distances(
+                self.get_compiled_graph(),
+                self.encode_pairs(X),
+                self.distance_cache_,
+                self.max_hops,
+                self.unreachable,
+            )
+            return sp.reshape(-1, 1)
         X = self.make_dataset(X)
         sp = []
         for row in X.itertuples():
             if row.node_j in self.shortest_path_mat[row.node_i].keys():
                 path_length = self.shortest_path_mat[row.node_i][row.node_j]
             else:
-                # path_length =np.inf
-                path_length = 9999
+                path_length = self.unreachable
             sp.append(path_length)
         return np.array(sp).reshape(-1, 1)
 
 
-class JaccardScorer(GraphScorer):
+class JaccardScorer(PairwiseScorer):
+    def neighborhood_score_names(self):
+        return ("jaccard",)
+
     def fit(self, X, y=None):
         return self
 
     def transform(self, X):
-        X = self.make_dataset(X)
-        js = nx.jaccard_coefficient(self.input_network, X.itertuples(index=False, name=None))
-        return np.array([i[-1] for i in js]).reshape(-1, 1)
+        js = self.neighborhood(X)["jaccard"]
+        return js.reshape(-1, 1)
 
 
-class PreferentialAttachmentScorer(GraphScorer):
+class PreferentialAttachmentScorer(PairwiseScorer):
+    def neighborhood_score_names(self):
+        return ("preferential_attachment",)
+
     def fit(self, X, y=None):
         return self
 
     def transform(self, X):
-        X = self.make_dataset(X)
-        pa = nx.preferential_attachment(self.input_network, X.itertuples(index=False, name=None))
-        return np.array([i[-1] for i in pa]).reshape(-1, 1)
+        pa = self.neighborhood(X)["preferential_attachment"]
+        return pa.astype(np.int64).reshape(-1, 1)
 
 
-class LHNScorer(GraphScorer):
+class LHNScorer(PairwiseScorer):
+    def neighborhood_score_names(self):
+        return ("lhn",)
+
     def fit(self, X, y=None):
         return self
 
     def transform(self, X):
-        X = self.make_dataset(X)
-        lhn = []
-        for e_pair in X.itertuples(index=False, name=None):
-            num_common_neighbors = len(
-                list(nx.common_neighbors(self.input_network, e_pair[0], e_pair[1]))
-            )
-            degree_product = self.input_network.degree(e_pair[0]) * self.input_network.degree(
-                e_pair[1]
+        lhn = self.neighborhood(X)["lhn"]
+        return lhn.reshape(-1, 1)
+
+
+class NeighborhoodScorer(PairwiseScorer):
+    """Several neighborhood scores of each pair from one shared intersection pass.
+
+    Computes any subset of common neighbors, Jaccard, Adamic-Adar, resource allocation,
+    preferential attachment and LHN, one output column per entry of ``scores``.
+    """
+
+    def __init__(
+        self,
+        input_network,
+        scores=NEIGHBORHOOD_SCORES,
+        chunk_size=DEFAULT_CHUNK_SIZE,
+        n_jobs=1,
+        block_size=DEFAULT_BLOCK_SIZE,
+        compiled_graph=None,
+    ):
+        super(NeighborhoodScorer, self).__init__(input_network, n_jobs, block_size, compiled_graph)
+        self.scores = scores
+        self.chunk_size = chunk_size
+
+    def neighborhood_score_names(self):
+        return tuple(self.scores)
+
+    def fit(self, X, y=None):
+        return self
+
+    def transform(self, X):
+        if isinstance(X, SharedBatch):
+            output = X.neighborhood(self.get_compiled_graph())
+        else:
+            output = neighborhood_scores(
+                self.get_compiled_graph(), self.encode_pairs(X), self.scores, self.chunk_size
             )
-            if num_common_neighbors == 0 and degree_product == 0:
-                lhn.append(0)
-            else:
-                lhn.append(num_common_neighbors / degree_product)
-        return np.array(lhn).reshape(-1, 1)
+        return np.column_stack([output[name] for name in self.scores])
+
+    def get_feature_names_out(self, input_features=None):
+        return list(self.scores)
+
 
+class PersonalizedPageRankScorer(PairwiseScorer):
+    """Personalized PageRank of ``node_j`` with restarts at ``node_i``.
 
-class PersonalizedPageRankScorer(GraphScorer):
-    def __init__(self, input_network):
-        super(PersonalizedPageRankScorer, self).__init__(input_network)
-        self.pers_page_rank = {}
+    Fit only indexes the graph. Transform computes PPR vectors for the distinct sources
+    of X, either exactly with a batched power iteration over ``batch_size`` sources at a
+    time (``mode="power"``) or approximately with local push (``mode="push"``) for very
+    large graphs. Vectors are kept in an LRU cache of at most ``cache_bytes``, one per
+    process when transform runs on ``n_jobs`` processes. Power iteration uses edge weights
+    like ``networkx.pagerank``; push does not and rejects weighted graphs.
+    """
+
+    def __init__(
+        self,
+        input_network,
+        alpha=0.85,
+        mode="power",
+        tol=1e-6,
+        max_iter=100,
+        epsilon=1e-7,
+        batch_size=256,
+        cache_bytes=256 * 2**20,
+        n_jobs=1,
+        block_size=DEFAULT_BLOCK_SIZE,
+        compiled_graph=None,
+    ):
+        super(PersonalizedPageRankScorer, self).__init__(
+            input_network, n_jobs, block_size, compiled_graph
+        )
+        self.alpha = alpha
+        self.mode = mode
+        self.tol = tol
+        self.max_iter = max_iter
+        self.epsilon = epsilon
+        self.batch_size = batch_size
+        self.cache_bytes = cache_bytes
+        self.ppr_cache_ = None
 
     def fit(self, X, y=None):
-        num_nodes = nx.number_of_nodes(self.input_network)
-        hot_vec = dict(zip(range(num_nodes), [0] * num_nodes))
-        for node in range(num_nodes):
-            hot_vec.update({node: 1})
-            self.pers_page_rank[node] = nx.pagerank(self.input_network, personalization=hot_vec)
-            hot_vec.update({node: 0})
+        if self.mode not in ("power", "push"):
+            raise ValueError(f"mode must be 'power' or 'push', got {self.mode!r}")
+        if self.mode == "push" and self.get_compiled_graph().weights is not None:
+            raise ValueError(
+                "mode='push' ignores edge weights, use mode='power' on weighted graphs"
+            )
+        self.ppr_cache_ = LRUCache(self.cache_bytes)
         return self
 
     def transform(self, X):
-        X = self.make_dataset(X)
-        ppr = []
-        for e_pair in X.itertuples(index=False, name=None):
-            ppr.append(self.pers_page_rank[e_pair[0]][e_pair[1]])
-        return np.array(ppr).reshape(-1, 1)
+        graph = self.get_compiled_graph()
+        pairs = self.encode_pairs(X)
+        sources = np.unique(pairs[:, 0])
+        missing = [source for source in sources.tolist() if source not in self.ppr_cache_]
+        if self.mode == "power":
+            for start in range(0, len(missing), self.batch_size):
+                stop = start + self.batch_size
+                batch = missing[start:stop]
+                block = personalized_pagerank(graph, batch, self.alpha, self.tol, self.max_iter)
+                for col, source in enumerate(batch):
+                    self.ppr_cache_.put(source, np.ascontiguousarray(block[:, col]))
+        else:
+            for source in missing:
+                self.ppr_cache_.put(source, push_pagerank(graph, source, self.alpha, self.epsilon))
+        ppr = np.empty(pairs.shape[0])
+        order = np.argsort(pairs[:, 0], kind="stable")
+        _, starts = np.unique(pairs[order, 0], return_index=True)
+        for rows in np.split(order, starts[1:]):
+            source, targets = pairs[rows[0], 0], pairs[rows, 1]
+            entry = self.ppr_cache_.get(source)
+            if entry is None:
+                # evicted by a later source of this call
+                if self.mode == "power":
+                    entry = personalized_pagerank(
+                        graph, [source], self.alpha, self.tol, self.max_iter
+                    )[:, 0]
+                else:
+                    entry = push_pagerank(graph, source, self.alpha, self.epsilon)
+            if self.mode == "power":
+                ppr[rows] = entry[targets]
+            else:
+                support, values = entry
+                pos = np.minimum(np.searchsorted(support, targets), support.shape[0] - 1)
+                ppr[rows] = np.where(support[pos] == targets, values[pos], 0.0)
+        return ppr.reshape(-1, 1)
@@ -0,0 +1,135 @@
+import json
+import os
+import pickle
+from pathlib import Path
+
+import pandas as pd
+
+RESULT_FILE = "result.pickle"
+SUCCESS_FILE = "_SUCCESS.json"
+MANIFEST_FILE = "manifest.jsonl"
+RESULTS_DIR = "results"
+RESULT_FORMATS = ("parquet", "csv")
+
+
+def atomic_write(path, data):
+    """Write ``data`` bytes to ``path`` through a temporary file and a rename."""
+    path = Path(path)
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    with open(tmp, "wb") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+def results_frame(result):
+    """Tabular view of a pickled graph result, or None when it is not tabular.
+
+    A list or tuple holding data frames, possibly next to other objects such as a fitted
+    model, is viewed as the concatenation of its frames.
+    """
+    if isinstance(result, pd.DataFrame):
+        return result
+    if isinstance(result, (list, tuple)):
+        frames = [item for item in result if isinstance(item, pd.DataFrame)]
+        if frames:
+            return pd.concat(frames, ignore_index=True)
+    try:
+        return pd.DataFrame(result)
+    except (ValueError, TypeError):
+        return None
+
+
+def result_num_rows(graph_output_path):
+    """Rows of the :func:`results_frame` of the committed result in ``graph_output_path``.
+
+    Read from the completion record, or from the result file for graphs committed before
+    records held it. None when the result is not tabular.
+    """
+    graph_output_path = Path(graph_output_path)
+    try:
+        with open(graph_output_path / SUCCESS_FILE) as f:
+            return json.load(f)["num_rows"]
+    except (OSError, ValueError, KeyError):
+        pass
+    with open(graph_output_path / RESULT_FILE, "rb") as f:
+        frame = results_frame(pickle.load(f))
+    return None if frame is None else frame.shape[0]
+
+
+def is_complete(graph_output_path):
+    """Whether the graph writing to ``graph_output_path`` finished in an earlier run."""
+    return (Path(graph_output_path) / SUCCESS_FILE).exists()
+
+
+def write_part(frame, results_path, network_index, results_format="parquet"):
+    """Store ``frame`` as the part file of ``network_index`` in the columnar results dataset.
+
+    Every graph gets its own part, written atomically, so results are appended as graphs
+    finish and ``pandas.read_parquet(results_path)`` reads the whole dataset.
+    """
+    results_path = Path(results_path)
+    results_path.mkdir(parents=True, exist_ok=True)
+    path = results_path / f"part-{network_index}.{results_format}"
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    if results_format == "parquet":
+        frame.to_parquet(tmp, index=False)
+    else:
+        frame.to_csv(tmp, index=False)
+    os.replace(tmp, path)
+    return path
+
+
+def commit_graph_result(func, payload):
+    """Run ``func`` on a one-graph ``payload`` and commit its result atomically.
+
+    ``func`` writes to a temporary file that is renamed to the payload ``output_path``
+    only once it returns. The result is then appended to the columnar dataset at
+    ``results_path`` when it is tabular, and a ``_SUCCESS.json`` completion record is
+    written last, so a crash at any point leaves the graph either complete or redone.
+    ``RuntimeError`` is raised when ``func`` returns without writing a result, and the
+    graph is not marked complete. Module level so that
+    ``functools.partial(commit_graph_result, func)`` can be sent to pool workers.
+    """
+    (graph,) = payload["input_graphs"]
+    final = Path(payload["output_path"])
+    tmp = final.with_name(f".{final.name}.{os.getpid()}.tmp")
+    try:
+        output = func({**payload, "output_path": tmp})
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+    if not tmp.exists():
+        raise RuntimeError(
+            f"No result was written for network {graph['network_index']} to {tmp}, "
+            "it is not marked complete"
+        )
+    os.replace(tmp, final)
+    part = None
+    shape = None
+    with open(final, "rb") as f:
+        frame = results_frame(pickle.load(f))
+    if frame is not None:
+        shape = frame.shape
+        frame = frame.assign(network_index=graph["network_index"])
+        part = write_part(
+            frame, payload["results_path"], graph["network_index"], payload["results_format"]
+        )
+    record = {
+        "network_index": graph["network_index"],
+        "output_path": str(final),
+        "results_part": None if part is None else str(part),
+        "num_rows": None if shape is None else int(shape[0]),
+        "num_columns": None if shape is None else int(shape[1]),
+    }
+    atomic_write(final.parent / SUCCESS_FILE, json.dumps(record).encode())
+    return output
+
+
+def append_manifest(output_path, record):
+    """Append a completion ``record`` to the run manifest in ``output_path``."""
+    with open(Path(output_path) / MANIFEST_FILE, "a") as f:
+        f.write(json.dumps(record) + "\n")
+        f.flush()
+        os.fsync(f.fileno())
@@ -2,6 +2,7 @@ import itertools
 import warnings
 
 import networkx as nx
+import numpy as np
 import pandas as pd
 from littleballoffur.edge_sampling import (
     HybridNodeEdgeSampler,
@@ -10,6 +11,15 @@ from littleballoffur.edge_sampling import (
 )
 from sklearn.utils import check_random_state, shuffle
 
+from ._edge_samplers import sample_split_replicates
+from ._edges import EdgeArrayGraph, sample_non_edges
+from ._index import NodeIndex, label_array
+
+SPLIT_FAILED_MESSAGE = (
+    "Sampling failed: Expected edge counts\n(orig:{0}, holdout:{1}, train:{2})\n"
+    "Found edge counts\n(orig:{0}, holdout:{3}, train:{4})\n"
+)
+
 
 class GraphSampler:
     sampler_dict = {
@@ -17,30 +27,83 @@ class GraphSampler:
         "rswi": RandomEdgeSamplerWithInduction,
         "hnes": HybridNodeEdgeSampler,
     }
+    negative_sampling_methods = ("exhaustive", "rejection")
+    backends = ("networkx", "array")
 
-    def __init__(self, input_network, sampling_method="rs", alpha=0.8, alpha_=0.8, random_state=42):
+    def __init__(
+        self,
+        input_network,
+        sampling_method="rs",
+        alpha=0.8,
+        alpha_=0.8,
+        random_state=42,
+        negative_sampling="exhaustive",
+        backend="networkx",
+    ):
+        if negative_sampling not in self.negative_sampling_methods:
+            raise ValueError(
+                f"negative_sampling must be one of {self.negative_sampling_methods}, "
+                f"got {negative_sampling!r}"
+            )
+        if backend not in self.backends:
+            raise ValueError(f"backend must be one of {self.backends}, got {backend!r}")
         self.input_network = input_network
         self.sampling_method = sampling_method
         self.alpha = alpha
         self.alpha_ = alpha_
         self.random_state = random_state
-        self.G_ho = nx.Graph()
-        self.G_ho.add_nodes_from(self.input_network.nodes)
-        self.G_tr = nx.Graph()
-        self.G_tr.add_nodes_from(self.input_network.nodes)
+        self.negative_sampling = negative_sampling
+        self.backend = backend
+        self.orig_edges_ = None
+        self.ho_edges_ = None
+        self.tr_edges_ = None
+        self._node_index = None
+        if backend == "networkx":
+            self._G_ho = nx.Graph()
+            self._G_ho.add_nodes_from(self.input_network.nodes)
+            self._G_tr = nx.Graph()
+            self._G_tr.add_nodes_from(self.input_network.nodes)
+        else:
+            self._G_ho = None
+            self._G_tr = None
 
-    def sample(self, num_samples=10000, shuffle_flag=False):
+    @property
+    def G_ho(self):
+        if self._G_ho is None and self.ho_edges_ is not None:
+            self._G_ho = self.ho_edges_.to_networkx()
+        return self._G_ho
+
+    @property
+    def G_tr(self):
+        if self._G_tr is None and self.tr_edges_ is not None:
+            self._G_tr = self.tr_edges_.to_networkx()
+        return self._G_tr
+
+    def sample(self, num_samples=10000, shuffle_flag=False, replace=True):
         self.random_state = check_random_state(self.random_state)
         self.create_subgraphs()
-        tr_df = self.get_pos_neg_edges(self.G_ho, self.G_tr)
-        ho_df = self.get_pos_neg_edges(self.input_network, self.G_ho)
+        if self.backend == "array":
+            tr_sample = self.sample_pos_neg_edges(
+                self.ho_edges_, self.tr_edges_, num_samples, replace
+            )
+            ho_sample = self.sample_pos_neg_edges(
+                self.orig_edges_, self.ho_edges_, num_samples, replace
+            )
+        elif self.negative_sampling == "rejection":
+            tr_sample = self.sample_pos_neg_edges(self.G_ho, self.G_tr, num_samples, replace)
+            ho_sample = self.sample_pos_neg_edges(
+                self.input_network, self.G_ho, num_samples, replace
+            )
+        else:
+            tr_df = self.get_pos_neg_edges(self.G_ho, self.G_tr)
+            ho_df = self.get_pos_neg_edges(self.input_network, self.G_ho)
 
-        tr_sample = tr_df.groupby("label").sample(
-            n=num_samples, replace=True, random_state=self.random_state
-        )
-        ho_sample = ho_df.groupby("label").sample(
-            n=num_samples, replace=True, random_state=self.random_state
-        )
+            tr_sample = tr_df.groupby("label").sample(
+                n=num_samples, replace=replace, random_state=self.random_state
+            )
+            ho_sample = ho_df.groupby("label").sample(
+                n=num_samples, replace=replace, random_state=self.random_state
+            )
         if shuffle_flag:
             tr_sample = shuffle(tr_sample)
             ho_sample = shuffle(ho_sample)
@@ -49,6 +112,8 @@ class GraphSampler:
         return tr_sample, ho_sample
 
     def create_subgraphs(self):
+        if self.backend == "array":
+            return self.create_edge_array_subgraphs()
         n_edges_ho = int(self.alpha * nx.number_of_edges(self.input_network))
         s1 = self.sampler_dict[self.sampling_method](n_edges_ho)
         G1: nx.Graph = s1.sample(self.input_network)
@@ -59,12 +124,95 @@ class GraphSampler:
         orig_num_e = self.input_network.number_of_edges()
         ho_num_e = G1.number_of_edges()
         tr_num_e = G2.number_of_edges()
-        assert tr_num_e < ho_num_e < orig_num_e, (
-            f"Sampling failed: Expected edge counts\n(orig:{orig_num_e}, holdout:{n_edges_ho}, train:{n_edges_tr})\n"
-            f"Found edge counts\n(orig:{orig_num_e}, holdout:{ho_num_e}, train:{tr_num_e})\n"
+        assert tr_num_e < ho_num_e < orig_num_e, SPLIT_FAILED_MESSAGE.format(
+            orig_num_e, n_edges_ho, n_edges_tr, ho_num_e, tr_num_e
         )
         self.G_tr.add_edges_from(G2.edges)
 
+    def create_edge_array_subgraphs(self):
+        """Array backed counterpart of :meth:`create_subgraphs`.
+
+        Edges are sampled with the NumPy implementations of the ``sampler_dict`` methods in
+        :mod:`._edge_samplers`, seeded from ``random_state``. The sampled graphs are kept as
+        :class:`EdgeArrayGraph` views over the node order of ``input_network`` in
+        ``orig_edges_``, ``ho_edges_`` and ``tr_edges_``. ``G_ho`` and ``G_tr`` are only
+        materialized as networkx graphs when accessed.
+        """
+        self.orig_edges_ = self.as_edge_array(self.input_network)
+        seed = check_random_state(self.random_state).randint(np.iinfo(np.int32).max)
+        ((self.ho_edges_, self.tr_edges_),) = self.create_split_replicates(seeds=[seed])
+        self._G_ho = None
+        self._G_tr = None
+        orig_num_e = self.orig_edges_.number_of_edges()
+        ho_num_e = self.ho_edges_.number_of_edges()
+        tr_num_e = self.tr_edges_.number_of_edges()
+        n_edges_ho = int(self.alpha * orig_num_e)
+        n_edges_tr = int(self.alpha_ * n_edges_ho)
+        assert tr_num_e < ho_num_e < orig_num_e, SPLIT_FAILED_MESSAGE.format(
+            orig_num_e, n_edges_ho, n_edges_tr, ho_num_e, tr_num_e
+        )
+
+    def create_split_replicates(self, num_replicates=None, seeds=None, alphas=None, alphas_=None):
+        """Sample several holdout/training splits of ``input_network`` in one call.
+
+        Replicates differ by seed and optionally by ``alpha``/``alpha_``, each of which
+        defaults to the sampler's own value. Without ``seeds``, ``num_replicates``
+        independent seeds are spawned from ``random_state``. Returns a list of
+        ``(ho_graph, tr_graph)`` :class:`EdgeArrayGraph` pairs.
+        """
+        if seeds is None:
+            if num_replicates is None:
+                raise ValueError("Either num_replicates or seeds must be given")
+            entropy = check_random_state(self.random_state).randint(np.iinfo(np.int32).max)
+            seeds = np.random.SeedSequence(entropy).spawn(num_replicates)
+        num_replicates = len(seeds)
+        alphas = [self.alpha] * num_replicates if alphas is None else alphas
+        alphas_ = [self.alpha_] * num_replicates if alphas_ is None else alphas_
+        if not len(alphas) == len(alphas_) == num_replicates:
+            raise ValueError("seeds, alphas and alphas_ must have the same length")
+        return sample_split_replicates(
+            self.as_edge_array(self.input_network), self.sampling_method, alphas, alphas_, seeds
+        )
+
+    def sample_replicates(
+        self,
+        num_samples=10000,
+        num_replicates=None,
+        seeds=None,
+        alphas=None,
+        alphas_=None,
+        shuffle_flag=False,
+        replace=True,
+    ):
+        """Batched :meth:`sample` over the splits of :meth:`create_split_replicates`.
+
+        Returns a list of ``(tr_sample, ho_sample)`` frames, one per replicate.
+        """
+        self.random_state = check_random_state(self.random_state)
+        samples = []
+        splits = self.create_split_replicates(num_replicates, seeds, alphas, alphas_)
+        for ho_graph, tr_graph in splits:
+            tr_sample = self.sample_pos_neg_edges(ho_graph, tr_graph, num_samples, replace)
+            ho_sample = self.sample_pos_neg_edges(self.orig_edges_, ho_graph, num_samples, replace)
+            if shuffle_flag:
+                tr_sample = shuffle(tr_sample, random_state=self.random_state)
+                ho_sample = shuffle(ho_sample, random_state=self.random_state)
+                tr_sample.reset_index(drop=True, inplace=True)
+                ho_sample.reset_index(drop=True, inplace=True)
+            samples.append((tr_sample, ho_sample))
+        return samples
+
+    def as_edge_array(self, G):
+        """Return ``G`` as an :class:`EdgeArrayGraph` over the node order of ``input_network``."""
+        if isinstance(G, EdgeArrayGraph):
+            return G
+        if self.orig_edges_ is None:
+            self._node_index = NodeIndex(label_array(self.input_network.nodes))
+            self.orig_edges_ = EdgeArrayGraph.from_networkx(self.input_network, self._node_index)
+        if G is self.input_network:
+            return self.orig_edges_
+        return EdgeArrayGraph.from_networkx(G, self._node_index)
+
     def get_pos_neg_edges(self, G_orig, G_sample):
         all_node_pairs = itertools.combinations(G_orig.nodes, 2)
         pos_edges = list(set(G_orig.edges).difference(set(G_sample.edges)))
@@ -73,3 +221,46 @@ class GraphSampler:
         label = [1] * len(pos_edges) + [0] * len(neg_edges)
         df = pd.DataFrame(data, columns=["node_i", "node_j"]).assign(label=label)
         return df
+
+    def sample_pos_neg_edges(self, G_orig, G_sample, num_samples, replace=True):
+        """Sample ``num_samples`` positive and negative pairs with vectorized edge-set algebra.
+
+        ``G_orig`` and ``G_sample`` are networkx graphs over the nodes of ``input_network``
+        or :class:`EdgeArrayGraph` views of them. Positive pairs are drawn from the edge
+        keys of ``G_orig`` missing in ``G_sample``. Negative pairs are drawn by rejection
+        against the sorted keys of ``G_orig`` or, for ``negative_sampling="exhaustive"``,
+        from the enumerated non-edges. The returned frame has the same schema as the
+        grouped sample of :meth:`get_pos_neg_edges`.
+        """
+        random_state = check_random_state(self.random_state)
+        orig = self.as_edge_array(G_orig)
+        pos_keys = orig.difference(self.as_edge_array(G_sample))
+        if not replace and num_samples > len(pos_keys):
+            raise ValueError(
+                f"Cannot sample {num_samples} positive edges without replacement, "
+                f"only {len(pos_keys)} exist"
+            )
+        if self.negative_sampling == "rejection":
+            neg_sample = orig.nodes[
+                sample_non_edges(orig.edge_index, num_samples, random_state, replace)
+            ]
+        else:
+            neg_keys = orig.edge_index.non_edges()
+            neg_sample = orig.edge_labels(
+                self._sample_keys(neg_keys, num_samples, random_state, replace)
+            )
+        pos_sample = orig.edge_labels(
+            self._sample_keys(pos_keys, num_samples, random_state, replace)
+        )
+        data = np.concatenate((neg_sample, pos_sample))
+        label = np.repeat([0, 1], num_samples)
+        df = pd.DataFrame(data, columns=["node_i", "node_j"]).assign(label=label)
+        return df
+
+    @staticmethod
+    def _sample_keys(keys, num_samples, random_state, replace):
+        if len(keys) == 0:
+            raise ValueError("No edge keys to sample from")
+        if replace:
+            return keys[random_state.randint(0, len(keys), size=num_samples)]
+        return keys[random_state.permutation(len(keys))[:num_samples]]
@@ -0,0 +1,92 @@
+import json
+import os
+import time
+from pathlib import Path
+
+import numpy as np
+
+
+class CostModel:
+    """Run time estimate of a graph from its size, for largest-first scheduling.
+
+    Without history the cost is ``num_nodes * num_edges``, the order of the all-sources
+    BFS sweeps that dominate feature extraction. Once enough timings are recorded,
+    :meth:`fit` calibrates ``log(seconds) = c0 + c1 log(num_nodes) + c2 log(num_edges)``
+    by least squares.
+    """
+
+    min_records = 3
+
+    def __init__(self, coef=None):
+        self.coef = coef
+
+    @staticmethod
+    def _design(num_nodes, num_edges):
+        num_nodes = np.log1p(np.asarray(num_nodes, dtype=np.float64))
+        num_edges = np.log1p(np.asarray(num_edges, dtype=np.float64))
+        return np.column_stack((np.ones_like(num_nodes), num_nodes, num_edges))
+
+    def fit(self, records):
+        """Calibrate from timing records with ``num_nodes``, ``num_edges`` and ``seconds``."""
+        records = [r for r in records if r.get("seconds", 0) > 0]
+        if len(records) < self.min_records:
+            return self
+        design = self._design([r["num_nodes"] for r in records], [r["num_edges"] for r in records])
+        target = np.log([r["seconds"] for r in records])
+        self.coef, *_ = np.linalg.lstsq(design, target, rcond=None)
+        return self
+
+    @classmethod
+    def from_log(cls, path):
+        """Model calibrated from the timing log written by :func:`append_timing`."""
+        return cls().fit(read_timings(path))
+
+    def predict(self, num_nodes, num_edges):
+        """Estimated cost of graphs of the given sizes, in seconds once calibrated."""
+        if self.coef is None:
+            return np.asarray(num_nodes, dtype=np.float64) * np.asarray(num_edges)
+        return np.exp(self._design(num_nodes, num_edges) @ self.coef)
+
+    def order(self, graphs):
+        """``graphs`` meta dicts sorted by decreasing estimated cost."""
+        costs = self.predict([g["num_nodes"] for g in graphs], [g["num_edges"] for g in graphs])
+        return [graphs[i] for i in np.argsort(-np.atleast_1d(costs), kind="stable")]
+
+
+def read_timings(path):
+    """Timing records of past runs, an empty list when there are none."""
+    path = Path(path)
+    if not path.exists():
+        return []
+    records = []
+    with open(path) as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                records.append(json.loads(line))
+    return records
+
+
+def append_timing(path, record):
+    """Append one timing record as a JSON line."""
+    with open(path, "a") as f:
+        f.write(json.dumps(record) + "\n")
+
+
+def timed_call(func, payload):
+    """Run ``func(payload)`` and return the timing record of its ``input_graphs``.
+
+    Module level so that ``functools.partial(timed_call, func)`` can be sent to pool
+    workers.
+    """
+    start = time.perf_counter()
+    func(payload)
+    seconds = time.perf_counter() - start
+    graphs = payload["input_graphs"]
+    return {
+        "network_indices": [g["network_index"] for g in graphs],
+        "num_nodes": int(sum(g["num_nodes"] for g in graphs)),
+        "num_edges": int(sum(g["num_edges"] for g in graphs)),
+        "seconds": seconds,
+        "pid": os.getpid(),
+    }
@@ -0,0 +1,158 @@
+import json
+import os
+from pathlib import Path
+
+import numpy as np
+from sklearn.utils import check_random_state
+
+from .result_sink import RESULT_FILE, SUCCESS_FILE, atomic_write, result_num_rows
+
+SHAP_DIR = "shap_values"
+SHAP_SUCCESS_FILE = "_SHAP_SUCCESS.json"
+
+
+def shap_cost(graph_path):
+    """Estimated SHAP cost of a graph directory, its feature rows times its features.
+
+    The sizes come from the completion record of the training run. Graphs without one
+    fall back to the size of their result file.
+    """
+    graph_path = Path(graph_path)
+    try:
+        with open(graph_path / SUCCESS_FILE) as f:
+            record = json.load(f)
+        if record.get("num_rows") is not None:
+            return record["num_rows"] * record["num_columns"]
+    except (OSError, ValueError):
+        pass
+    result = graph_path / RESULT_FILE
+    return result.stat().st_size if result.exists() else 0
+
+
+def order_by_cost(graph_paths):
+    """``graph_paths`` sorted by decreasing :func:`shap_cost`."""
+    costs = [shap_cost(path) for path in graph_paths]
+    return [graph_paths[i] for i in np.argsort(-np.asarray(costs), kind="stable")]
+
+
+def is_shap_complete(graph_path):
+    return (Path(graph_path) / SHAP_SUCCESS_FILE).exists()
+
+
+def background_sample(X, background_size, random_state=None):
+    """At most ``background_size`` rows of X drawn without replacement."""
+    if X.shape[0] <= background_size:
+        return X
+    rows = check_random_state(random_state).choice(X.shape[0], background_size, replace=False)
+    rows.sort()
+    return X.iloc[rows] if hasattr(X, "iloc") else X[rows]
+
+
+class BatchSink:
+    """Per-batch ``.npy`` files of SHAP values, written atomically as batches finish.
+
+    Files are named by ``batch_size`` and batch index. Batches already on disk are
+    skipped by :func:`explain_in_batches`, so an interrupted graph resumes from its last
+    finished batch, and batches of another batch size are never mixed in. :meth:`load`
+    concatenates them.
+    """
+
+    def __init__(self, directory, batch_size):
+        self.directory = Path(directory)
+        self.batch_size = batch_size
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def path(self, batch_index):
+        return self.directory / f"batch-{self.batch_size}-{batch_index:06d}.npy"
+
+    def __contains__(self, batch_index):
+        return self.path(batch_index).exists()
+
+    def write(self, batch_index, values):
+        path = self.path(batch_index)
+        tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        with open(tmp, "wb") as f:
+            np.save(f, np.asarray(values))
+        os.replace(tmp, path)
+
+    def missing(self, num_rows):
+        """Indices of the batches of ``num_rows`` rows that are not on disk."""
+        num_batches = -(-num_rows // self.batch_size)
+        return [i for i in range(num_batches) if i not in self]
+
+    def clear(self, other_sizes_only=False):
+        """Remove the stored batches, or only those written with another batch size."""
+        for path in self.directory.glob("batch-*.npy"):
+            if not other_sizes_only or not path.name.startswith(f"batch-{self.batch_size}-"):
+                path.unlink(missing_ok=True)
+
+    def load(self, mmap_mode="r"):
+        paths = sorted(self.directory.glob(f"batch-{self.batch_size}-*.npy"))
+        return np.concatenate([np.load(path, mmap_mode=mmap_mode) for path in paths])
+
+
+def explain_in_batches(explain, X, batch_size, sink):
+    """Call ``explain`` on consecutive ``batch_size`` row slices of X and stream to ``sink``.
+
+    Only one batch of SHAP values is held in memory at a time. Returns the number of
+    batches computed, excluding those found in ``sink``.
+    """
+    computed = 0
+    for batch_index, start in enumerate(range(0, X.shape[0], batch_size)):
+        if batch_index in sink:
+            continue
+        rows = slice(start, start + batch_size)
+        sink.write(batch_index, explain(X.iloc[rows] if hasattr(X, "iloc") else X[rows]))
+        computed += 1
+    return computed
+
+
+def explain_graph(explain, payload):
+    """Run ``explain``, such as ``process_shap``, on a one-graph payload one batch at a time.
+
+    The rows to explain are those of the tabular training result of the graph, see
+    :func:`~.result_sink.result_num_rows`. For every batch of ``batch_size`` rows missing
+    from the :class:`BatchSink` in ``shap_path``, ``explain`` gets the payload with the
+    ``batch_index`` and the ``(start, stop)`` range of its ``rows`` and returns their SHAP
+    values, which are written to the sink, so only one batch is held in memory. Batches
+    of another batch size are removed first, and all of them with ``force``. Returns the
+    number of rows of the graph.
+    """
+    (graph_path,) = payload["graph_paths"]
+    num_rows = result_num_rows(graph_path)
+    if num_rows is None:
+        raise ValueError(f"The training result of {graph_path} is not tabular")
+    batch_size = payload["batch_size"]
+    sink = BatchSink(payload["shap_path"], batch_size)
+    sink.clear(other_sizes_only=not payload.get("force", False))
+    for batch_index in sink.missing(num_rows):
+        start = batch_index * batch_size
+        rows = (start, min(start + batch_size, num_rows))
+        sink.write(batch_index, explain({**payload, "batch_index": batch_index, "rows": rows}))
+    return num_rows
+
+
+def commit_shap(func, payload):
+    """Run ``func`` on a one-graph SHAP ``payload`` and mark the graph complete.
+
+    ``func``, such as ``partial(explain_graph, process_shap)``, returns the number of rows
+    it explained. The
+    graph is only marked complete when every batch of those rows is in ``shap_path``,
+    otherwise ``RuntimeError`` is raised. Module level so that
+    ``functools.partial(commit_shap, func)`` can be sent to pool workers. Returns the
+    graph path.
+    """
+    (graph_path,) = payload["graph_paths"]
+    num_rows = func(payload)
+    missing = BatchSink(payload["shap_path"], payload["batch_size"]).missing(num_rows)
+    if missing:
+        raise RuntimeError(
+            f"SHAP batches {missing[:10]} of {graph_path} are missing, it is not marked complete"
+        )
+    record = {
+        "batch_size": payload["batch_size"],
+        "background_size": payload["background_size"],
+        "num_rows": num_rows,
+    }
+    atomic_write(Path(graph_path) / SHAP_SUCCESS_FILE, json.dumps(record).encode())
+    return graph_path
@@ -0,0 +1,75 @@
+import networkx as nx
+import numpy as np
+import pytest
+
+from eelp.models import _cache, set_fit_cache
+from eelp.models.pairwise_predictors import JaccardScorer, PersonalizedPageRankScorer
+
+
+@pytest.fixture
+def fit_cache(tmp_path):
+    cache = set_fit_cache(tmp_path / "cache")
+    yield cache
+    set_fit_cache(None)
+
+
+@pytest.fixture
+def graph_and_pairs():
+    G = nx.gnm_random_graph(200, 800, seed=0)
+    X = np.random.default_rng(0).integers(0, 200, (500, 2))
+    return G, X
+
+
+def test_cached_fit_restores_the_fitted_state(fit_cache, graph_and_pairs):
+    G, X = graph_and_pairs
+    expected = PersonalizedPageRankScorer(G).fit(X).transform(X)
+    assert fit_cache.misses == 1
+    scorer = PersonalizedPageRankScorer(G).fit(X)
+    assert fit_cache.hits == 1
+    np.testing.assert_allclose(scorer.transform(X), expected)
+
+
+def test_caches_are_persisted_empty(graph_and_pairs):
+    G, X = graph_and_pairs
+    scorer = PersonalizedPageRankScorer(G).fit(X)
+    scorer.transform(X)
+    assert len(scorer.ppr_cache_)
+    state = _cache.persisted_state(scorer)
+    assert len(state["ppr_cache_"]) == 0
+    assert state["ppr_cache_"].max_bytes == scorer.cache_bytes
+
+
+def test_key_depends_on_the_code_version(fit_cache, graph_and_pairs, monkeypatch):
+    G, X = graph_and_pairs
+    scorer = JaccardScorer(G)
+    key = fit_cache.key_for(scorer)
+    monkeypatch.setattr(_cache, "code_version", lambda: "another version")
+    assert fit_cache.key_for(scorer) != key
+
+
+def test_mdl_fit_is_not_cached(fit_cache, graph_and_pairs):
+    pytest.importorskip("graph_tool")
+    from eelp.models.model_predictors import MDLScorer
+
+    G, _ = graph_and_pairs
+    assert fit_cache.key_for(MDLScorer(G)) is None
+
+
+def test_key_covers_a_custom_weight_attribute(fit_cache):
+    from eelp.models.model_predictors import LouvainScorer
+
+    def graph(strengths, edges=((0, 1), (1, 2), (2, 3), (3, 0))):
+        G = nx.Graph()
+        G.add_nodes_from(range(4))
+        for (u, v), strength in zip(edges, strengths):
+            G.add_edge(u, v, strength=strength)
+        return G
+
+    def key(G):
+        return fit_cache.key_for(LouvainScorer(G, weight="strength", random_state=0))
+
+    base = key(graph([1.0, 2.0, 3.0, 4.0]))
+    assert key(graph([1.0, 2.0, 3.0, 5.0])) != base
+    # the same weight on the same edge, added in another order
+    assert key(graph([4.0, 3.0, 2.0, 1.0], ((3, 0), (2, 3), (1, 2), (0, 1)))) == base
+    assert key(graph([1.0, 2.0, 3.0, 4.0], ((1, 2), (0, 1), (2, 3), (3, 0)))) != base
@@ -0,0 +1,52 @@
+import pickle
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from eelp.models.edge_store import EdgeStore, source_fingerprint, write_edge_store
+
+
+def networks_frame(seed):
+    rng = np.random.default_rng(seed)
+    edges = [rng.integers(0, 50, (num_edges, 2)) for num_edges in (10, 0, 25)]
+    return pd.DataFrame(
+        {
+            "network_index": [0, 1, 2],
+            "network_name": ["a", "b", "c"],
+            "level_0": [0, 1, 2],
+            "number_nodes": [50, 50, 50],
+            "number_edges": [len(e) for e in edges],
+            "edges_id": edges,
+        }
+    )
+
+
+def write_input(path, df):
+    with open(path, "wb") as f:
+        pickle.dump(df, f)
+    return source_fingerprint(path)
+
+
+def test_store_round_trips_the_edge_lists(tmp_path):
+    df = networks_frame(0)
+    store = write_edge_store(df, tmp_path / "store")
+    for row, edges in zip(store.metadata.itertuples(index=False), df["edges_id"]):
+        np.testing.assert_array_equal(store.edge_list(row.offset, row.length), edges)
+    assert not list((tmp_path / "store").glob(".*.tmp"))
+
+
+def test_store_of_another_input_is_rejected(tmp_path):
+    source = write_input(tmp_path / "input.pkl", networks_frame(0))
+    write_edge_store(networks_frame(0), tmp_path / "store", source=source)
+    EdgeStore.check_source(tmp_path / "store", source)
+    other = write_input(tmp_path / "other.pkl", networks_frame(1))
+    with pytest.raises(ValueError, match="was written from"):
+        EdgeStore.check_source(tmp_path / "store", other)
+
+
+def test_store_without_a_recorded_source_is_rejected(tmp_path):
+    source = write_input(tmp_path / "input.pkl", networks_frame(0))
+    write_edge_store(networks_frame(0), tmp_path / "store")
+    with pytest.raises(ValueError):
+        EdgeStore.check_source(tmp_path / "store", source)
@@ -0,0 +1,46 @@
+import networkx as nx
+import numpy as np
+import pytest
+
+from eelp.models._base import GlobalGraphPropertiesScorer
+
+
+def connected_graphs():
+    graphs = []
+    for seed in range(60):
+        graphs.append(nx.random_geometric_graph(30 + seed, 0.3, seed=seed))
+        graphs.append(nx.connected_watts_strogatz_graph(50, 4, 0.1, seed=seed))
+        graphs.append(nx.barabasi_albert_graph(60, 1, seed=seed))
+        graphs.append(nx.gnm_random_graph(40, 60, seed=seed))
+    return [G for G in graphs if nx.is_connected(G)]
+
+
+@pytest.mark.parametrize("G", connected_graphs())
+def test_fast_diameter_matches_networkx(G):
+    X = np.array([[0, 1]])
+    scorer = GlobalGraphPropertiesScorer(G, mode="fast").fit(X)
+    assert scorer.diameter_bounds_ == (nx.diameter(G), nx.diameter(G))
+
+
+def test_fast_diameter_of_geometric_graph_with_late_fringe():
+    # the longest path starts in a fringe level that an early exit left half scanned
+    G = nx.random_geometric_graph(44, 0.3, seed=94)
+    X = np.array([[0, 1]])
+    assert GlobalGraphPropertiesScorer(G, mode="fast").fit(X).network_diameter == 6
+
+
+def test_capped_sweeps_bound_the_diameter():
+    G = nx.random_geometric_graph(80, 0.2, seed=3)
+    G = G.subgraph(max(nx.connected_components(G), key=len)).copy()
+    scorer = GlobalGraphPropertiesScorer(G, max_sweeps=4).fit(np.array([[0, 0]]))
+    lower, upper = scorer.diameter_bounds_
+    assert lower <= nx.diameter(G) <= upper
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_fast_statistics_match_networkx(seed):
+    G = nx.powerlaw_cluster_graph(200, 3, 0.3, seed=seed)
+    X = np.array([[0, 1], [2, 3]])
+    fast = GlobalGraphPropertiesScorer(G, mode="fast").fit(X).transform(X)
+    exact = GlobalGraphPropertiesScorer(G, mode="networkx").fit(X).transform(X)
+    np.testing.assert_allclose(fast, exact)
@@ -0,0 +1,71 @@
+import networkx as nx
+import numpy as np
+import pandas as pd
+import pytest
+
+from eelp.models import node_predictors, pairwise_predictors
+from eelp.models._index import NodeIndex
+
+SCORERS = [
+    node_predictors.PageRankScorer,
+    node_predictors.DegreeCentralityScorer,
+    node_predictors.LocalClusteringCoefficientScorer,
+    node_predictors.BetweennessCentralityScorer,
+    node_predictors.NumTrianglesScorer,
+    pairwise_predictors.CommonNeighborsScorer,
+    pairwise_predictors.JaccardScorer,
+    pairwise_predictors.AdamicAdarScorer,
+    pairwise_predictors.PreferentialAttachmentScorer,
+    pairwise_predictors.ShortestPathScorer,
+    pairwise_predictors.PersonalizedPageRankScorer,
+]
+RELABELINGS = {
+    "str": lambda node: f"n{node}",
+    "tuple": lambda node: (node // 10, node % 10),
+    "shifted": lambda node: 3 * node + 1000,
+}
+
+
+@pytest.mark.parametrize("cls", SCORERS)
+@pytest.mark.parametrize("relabel", list(RELABELINGS))
+def test_scores_do_not_depend_on_node_labels(cls, relabel):
+    G = nx.powerlaw_cluster_graph(100, 3, 0.3, seed=3)
+    X = np.random.default_rng(0).integers(0, 100, (400, 2))
+    expected = cls(G).fit(X).transform(X)
+    mapping = {node: RELABELINGS[relabel](node) for node in G}
+    H = nx.relabel_nodes(G, mapping)
+    labelled = pd.DataFrame(
+        {"node_i": [mapping[i] for i in X[:, 0]], "node_j": [mapping[j] for j in X[:, 1]]}
+    )
+    np.testing.assert_allclose(cls(H).fit(labelled).transform(labelled), expected)
+
+
+@pytest.mark.parametrize("relabel", list(RELABELINGS))
+def test_node_index_round_trips_labels(relabel):
+    labels = [RELABELINGS[relabel](node) for node in range(50)]
+    index = NodeIndex(labels)
+    idx = index.encode(pd.Series(labels[::-1]).to_numpy())
+    assert idx.tolist() == list(range(49, -1, -1))
+    assert list(index.decode(idx)) == labels[::-1]
+    with pytest.raises(KeyError):
+        index.encode(np.array(["missing"], dtype=object))
+
+
+@pytest.mark.parametrize("mode", ["batched", "per_pair"])
+@pytest.mark.parametrize("relabel", list(RELABELINGS))
+def test_mdl_scores_do_not_depend_on_node_labels(mode, relabel):
+    pytest.importorskip("graph_tool")
+    from eelp.models.model_predictors import MDLScorer
+
+    G = nx.powerlaw_cluster_graph(60, 3, 0.3, seed=3)
+    X = np.random.default_rng(0).integers(0, 60, (100, 2))
+    scorer = MDLScorer(G, mode=mode).fit(X)
+    expected = scorer.transform(X)
+    mapping = {node: RELABELINGS[relabel](node) for node in G}
+    relabelled = MDLScorer(nx.relabel_nodes(G, mapping), mode=mode)
+    # the blockmodel fit is stochastic, score the relabelled graph under the same partition
+    relabelled.block_state_ = scorer.block_state_
+    labelled = pd.DataFrame(
+        {"node_i": [mapping[i] for i in X[:, 0]], "node_j": [mapping[j] for j in X[:, 1]]}
+    )
+    np.testing.assert_allclose(relabelled.transform(labelled), expected)
@@ -0,0 +1,38 @@
+import networkx as nx
+import numpy as np
+import pytest
+
+from eelp.models import MemorySink, set_instrumentation
+from eelp.models._base import GraphScorer
+
+
+class AllocatingScorer(GraphScorer):
+    def fit(self, X, y=None):
+        return self
+
+    def transform(self, X):
+        # touch every page so that the allocation is resident
+        return np.ones((len(X), 2**21)).sum(axis=1, keepdims=True)
+
+
+@pytest.fixture
+def sink():
+    sink = MemorySink()
+    yield sink
+    set_instrumentation()
+
+
+@pytest.mark.parametrize("memory", ["tracemalloc", "resource"])
+def test_every_call_reports_its_own_peak(sink, memory):
+    set_instrumentation(sink, memory=memory)
+    X = np.zeros((4, 2), dtype=np.int64)
+    scorer = AllocatingScorer(nx.path_graph(3)).fit(X)
+    scorer.transform(X)
+    scorer.transform(X)
+    records = [r for r in sink.drain() if r["phase"] == "transform"]
+    assert len(records) == 2
+    for record in records:
+        assert record["memory"] in (memory, "resource_high_water_mark")
+        if record["memory"] != "resource_high_water_mark":
+            # four rows of 2**21 float64 are 64 MiB
+            assert record["peak_memory_bytes"] >= 48 * 2**20
@@ -0,0 +1,48 @@
+import warnings
+
+import networkx as nx
+import numpy as np
+import pytest
+from community import community_louvain
+
+from eelp.models.model_predictors import InfomapScorer, LouvainScorer
+
+
+@pytest.fixture
+def graph():
+    G = nx.powerlaw_cluster_graph(120, 3, 0.3, seed=2)
+    for u, v in G.edges:
+        G[u][v]["weight"] = 1.0 + (u + v) % 3
+    return G
+
+
+@pytest.fixture
+def pairs():
+    return np.random.default_rng(0).integers(0, 120, (60, 2))
+
+
+def test_louvain_gain_matches_community_louvain(graph, pairs):
+    scorer = LouvainScorer(graph, random_state=0).fit(pairs)
+    partition = scorer.best_partition_
+    base = community_louvain.modularity(partition, graph)
+    assert scorer.base_modularity_ == pytest.approx(base, abs=1e-12)
+    for (i, j), gain in zip(pairs.tolist(), scorer.transform(pairs).ravel()):
+        if graph.has_edge(i, j):
+            assert gain == 0.0
+            continue
+        H = graph.copy()
+        H.add_edge(i, j, weight=1.0)
+        assert gain == pytest.approx(community_louvain.modularity(partition, H) - base, abs=1e-12)
+
+
+def test_infomap_fast_mode_matches_exact_mode(graph, pairs):
+    G = nx.Graph(graph.edges)
+    # exact mode assumes that the scored pairs are not edges yet
+    pairs = np.array([(i, j) for i, j in pairs.tolist() if i != j and not G.has_edge(i, j)])
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", PendingDeprecationWarning)
+        fast = InfomapScorer(G, args="--seed 1").fit(pairs)
+        exact = InfomapScorer(G, args="--seed 1", mode="exact").fit(pairs)
+        assert fast.mode_ == "fast"
+        assert fast.im_modules_ == exact.im_modules_
+        np.testing.assert_allclose(fast.transform(pairs), exact.transform(pairs), atol=1e-9)
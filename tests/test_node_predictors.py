@@ -0,0 +1,97 @@
+import warnings
+
+import networkx as nx
+import numpy as np
+import pytest
+
+from eelp.models.node_predictors import (
+    BetweennessCentralityScorer,
+    ClosenessCentralityScorer,
+    EigenvectorCentralityScorer,
+    KatzCentralityScorer,
+    LoadCentralityScorer,
+    PageRankScorer,
+)
+
+
+@pytest.fixture
+def graph():
+    G = nx.powerlaw_cluster_graph(200, 3, 0.3, seed=1)
+    for u, v in G.edges:
+        G[u][v]["weight"] = 1.0 + (u * v) % 5
+    return G
+
+
+def _node_values(scorer, G):
+    X = np.column_stack((list(G), list(G)))
+    return scorer.fit(X).transform(X).ravel()
+
+
+def _expected(values, G):
+    return np.array([values[node] for node in G])
+
+
+def test_pagerank_matches_networkx(graph):
+    scorer = PageRankScorer(graph, tol=1e-12, max_iter=1000)
+    expected = nx.pagerank(graph, tol=1e-12, max_iter=1000)
+    np.testing.assert_allclose(_node_values(scorer, graph), _expected(expected, graph), atol=1e-12)
+
+
+def test_eigenvector_centrality_matches_networkx(graph):
+    scorer = EigenvectorCentralityScorer(graph, tolerance=1e-12)
+    expected = nx.eigenvector_centrality_numpy(graph, weight=None)
+    np.testing.assert_allclose(_node_values(scorer, graph), _expected(expected, graph), atol=1e-10)
+
+
+@pytest.mark.parametrize("solver", ["cg", "series"])
+def test_katz_centrality_matches_networkx(graph, solver):
+    scorer = KatzCentralityScorer(graph, alpha=0.05, solver=solver, tol=1e-12)
+    expected = nx.katz_centrality_numpy(graph, alpha=0.05, weight=None)
+    np.testing.assert_allclose(_node_values(scorer, graph), _expected(expected, graph), atol=1e-10)
+
+
+def test_katz_default_alpha_matches_networkx():
+    G = nx.path_graph(20)
+    expected = nx.katz_centrality_numpy(G)
+    np.testing.assert_allclose(
+        _node_values(KatzCentralityScorer(G, tol=1e-12), G), _expected(expected, G), atol=1e-10
+    )
+
+
+def test_katz_spectral_alpha_is_below_the_spectral_radius(graph):
+    scorer = KatzCentralityScorer(graph, alpha=None, tol=1e-12)
+    scorer.fit(np.zeros((1, 2), dtype=np.int64))
+    radius = max(abs(np.linalg.eigvalsh(nx.to_numpy_array(graph, weight=None))))
+    assert scorer.convergence_.alpha == pytest.approx(0.9 / radius, rel=1e-6)
+
+
+def test_katz_warns_when_alpha_diverges(graph):
+    with pytest.warns(UserWarning, match="Katz series diverges"):
+        KatzCentralityScorer(graph, alpha=0.5).fit(np.zeros((1, 2), dtype=np.int64))
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        KatzCentralityScorer(graph, alpha=0.05).fit(np.zeros((1, 2), dtype=np.int64))
+
+
+@pytest.mark.parametrize(
+    "cls, expected",
+    [
+        (BetweennessCentralityScorer, nx.betweenness_centrality),
+        (LoadCentralityScorer, nx.load_centrality),
+        (ClosenessCentralityScorer, nx.closeness_centrality),
+    ],
+)
+def test_exact_path_centralities_match_networkx(cls, expected):
+    # a disconnected graph, closeness uses the Wasserman-Faust scaling of networkx
+    G = nx.disjoint_union(nx.powerlaw_cluster_graph(120, 3, 0.3, seed=4), nx.path_graph(10))
+    np.testing.assert_allclose(
+        _node_values(cls(G), G), _expected(expected(G), G), rtol=1e-10, atol=1e-12
+    )
+
+
+def test_approximate_betweenness_is_within_its_error_bound():
+    G = nx.powerlaw_cluster_graph(300, 3, 0.3, seed=4)
+    scorer = BetweennessCentralityScorer(G, mode="approximate", k=150, random_state=0)
+    values = _node_values(scorer, G)
+    error = np.abs(values - _expected(nx.betweenness_centrality(G), G)).max()
+    assert 0 < scorer.error_bound_ and error <= scorer.error_bound_
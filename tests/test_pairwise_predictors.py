@@ -0,0 +1,91 @@
+import networkx as nx
+import numpy as np
+import pytest
+
+from eelp.models import pairwise_predictors
+from eelp.models.pairwise_predictors import PersonalizedPageRankScorer, ShortestPathScorer
+
+
+@pytest.fixture
+def graph():
+    G = nx.powerlaw_cluster_graph(200, 3, 0.3, seed=1)
+    for u, v in G.edges:
+        G[u][v]["weight"] = 1.0 + (u * v) % 5
+    return G
+
+
+def test_personalized_pagerank_matches_networkx(graph):
+    X = np.random.default_rng(0).integers(0, 200, (300, 2))
+    scores = PersonalizedPageRankScorer(graph, tol=1e-12, max_iter=1000).fit(X).transform(X)
+    for (source, target), score in zip(X[:20].tolist(), scores[:20, 0]):
+        expected = nx.pagerank(graph, personalization={source: 1}, tol=1e-12, max_iter=1000)
+        assert score == pytest.approx(expected[target], abs=1e-9)
+
+
+def test_push_pagerank_rejects_weighted_graphs(graph):
+    with pytest.raises(ValueError, match="ignores edge weights"):
+        PersonalizedPageRankScorer(graph, mode="push").fit(np.zeros((1, 2), dtype=np.int64))
+
+
+def test_push_pagerank_approximates_power_iteration():
+    G = nx.powerlaw_cluster_graph(200, 3, 0.3, seed=1)
+    X = np.random.default_rng(0).integers(0, 200, (300, 2))
+    power = PersonalizedPageRankScorer(G, tol=1e-12, max_iter=1000).fit(X).transform(X)
+    push = PersonalizedPageRankScorer(G, mode="push", epsilon=1e-9).fit(X).transform(X)
+    np.testing.assert_allclose(push, power, atol=1e-6)
+
+
+def test_shortest_path_reuses_only_complete_searches():
+    G = nx.path_graph(50)
+    scorer = ShortestPathScorer(G).fit(np.zeros((1, 2), dtype=np.int64))
+    # the first search stops at node 2, the second needs to go further from the same source
+    near = scorer.transform(np.array([[0, 2]]))
+    far = scorer.transform(np.array([[0, 40], [0, 2]]))
+    assert near.ravel().tolist() == [2]
+    assert far.ravel().tolist() == [40, 2]
+
+
+@pytest.mark.parametrize("max_hops", [None, 3])
+def test_shortest_path_matches_networkx(max_hops):
+    G = nx.disjoint_union(nx.gnm_random_graph(150, 300, seed=0), nx.path_graph(20))
+    X = np.random.default_rng(0).integers(0, 170, (1000, 2))
+    scores = ShortestPathScorer(G, max_hops=max_hops).fit(X).transform(X).ravel()
+    lengths = dict(nx.shortest_path_length(G))
+    expected = [lengths[i].get(j, 9999) for i, j in X.tolist()]
+    if max_hops is not None:
+        expected = [d if d <= max_hops else 9999 for d in expected]
+    assert scores.tolist() == expected
+    all_pairs = ShortestPathScorer(G, mode="all_pairs").fit(X).transform(X).ravel()
+    if max_hops is None:
+        assert all_pairs.tolist() == expected
+
+
+def _neighborhood_expected(G, X):
+    def jaccard(i, j):
+        union = len(set(G[i]) | set(G[j]))
+        return len(set(G[i]) & set(G[j])) / union if union else 0.0
+
+    def adamic_adar(i, j):
+        return sum(1 / np.log(G.degree(w)) for w in nx.common_neighbors(G, i, j))
+
+    return {
+        pairwise_predictors.CommonNeighborsScorer: [
+            len(list(nx.common_neighbors(G, i, j))) for i, j in X
+        ],
+        pairwise_predictors.JaccardScorer: [jaccard(i, j) for i, j in X],
+        pairwise_predictors.AdamicAdarScorer: [adamic_adar(i, j) for i, j in X],
+        pairwise_predictors.PreferentialAttachmentScorer: [G.degree(i) * G.degree(j) for i, j in X],
+    }
+
+
+@pytest.mark.parametrize("chunk_size", [7, 2**16])
+def test_neighborhood_scores_match_networkx(chunk_size):
+    G = nx.powerlaw_cluster_graph(200, 4, 0.3, seed=5)
+    G.add_node(200)
+    X = np.random.default_rng(0).integers(0, 201, (1000, 2))
+    expected = _neighborhood_expected(G, X.tolist())
+    for cls, values in expected.items():
+        np.testing.assert_allclose(cls(G).fit(X).transform(X).ravel(), values, rtol=1e-12)
+    names = ("common_neighbors", "jaccard", "adamic_adar", "preferential_attachment")
+    combined = pairwise_predictors.NeighborhoodScorer(G, names, chunk_size).fit(X).transform(X)
+    np.testing.assert_allclose(combined, np.column_stack(list(expected.values())), rtol=1e-12)
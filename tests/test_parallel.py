@@ -0,0 +1,73 @@
+import multiprocessing
+import warnings
+
+import networkx as nx
+import numpy as np
+import pytest
+
+from eelp.models.model_predictors import InfomapScorer, LouvainScorer
+from eelp.models.node_predictors import BetweennessCentralityScorer
+from eelp.models.pairwise_predictors import (
+    JaccardScorer,
+    PersonalizedPageRankScorer,
+    ShortestPathScorer,
+)
+
+SCORERS = [
+    (JaccardScorer, {}),
+    (ShortestPathScorer, {}),
+    # batches of sources differ between processes, converge far below the tolerance
+    (PersonalizedPageRankScorer, {"tol": 1e-12, "max_iter": 1000}),
+    (LouvainScorer, {"random_state": 0}),
+    (InfomapScorer, {"args": "--seed 1"}),
+]
+
+
+def _graph_and_pairs():
+    G = nx.powerlaw_cluster_graph(300, 3, 0.3, seed=0)
+    X = np.random.default_rng(0).integers(0, 300, (2000, 2))
+    return G, X
+
+
+def _serial_and_parallel(cls, params):
+    G, X = _graph_and_pairs()
+    serial = cls(G, **params).fit(X)
+    parallel = cls(G, n_jobs=2, block_size=256, **params).fit(X)
+    assert parallel.transform_is_parallel(X) == (not multiprocessing.current_process().daemon)
+    return serial.transform(X), parallel.transform(X)
+
+
+@pytest.mark.parametrize("cls, params", SCORERS)
+def test_parallel_transform_matches_serial(cls, params):
+    serial, parallel = _serial_and_parallel(cls, params)
+    np.testing.assert_allclose(parallel, serial, rtol=1e-9, atol=1e-10)
+
+
+def _in_pool_worker(args):
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter("always")
+        serial, parallel = _serial_and_parallel(*args)
+    return serial, parallel, [str(w.message) for w in caught]
+
+
+@pytest.mark.parametrize("cls, params", SCORERS[:2])
+def test_parallel_transform_in_pool_worker_runs_serially(cls, params):
+    with multiprocessing.Pool(1) as pool:
+        [(serial, parallel, messages)] = pool.map(_in_pool_worker, [(cls, params)])
+    np.testing.assert_allclose(parallel, serial, rtol=1e-12)
+    assert any("daemonic" in message for message in messages)
+
+
+def _betweenness_in_pool_worker(n_jobs):
+    G, X = _graph_and_pairs()
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        return BetweennessCentralityScorer(G, n_jobs=n_jobs).fit(X).bet_cen_
+
+
+def test_path_centralities_in_pool_worker_run_serially():
+    G, _ = _graph_and_pairs()
+    with multiprocessing.Pool(1) as pool:
+        [betweenness] = pool.map(_betweenness_in_pool_worker, [2])
+    expected = nx.betweenness_centrality(G)
+    np.testing.assert_allclose(betweenness, [expected[node] for node in G], atol=1e-12)
@@ -0,0 +1,65 @@
+import pickle
+
+import pandas as pd
+import pytest
+
+from eelp.models.result_sink import RESULT_FILE, commit_graph_result, is_complete
+
+
+def graph_payload(tmp_path):
+    graph_path = tmp_path / "7"
+    graph_path.mkdir()
+    return {
+        "input_graphs": [{"network_index": 7}],
+        "output_path": graph_path / RESULT_FILE,
+        "results_path": tmp_path / "results",
+        "results_format": "csv",
+    }
+
+
+def write_result(payload):
+    with open(payload["output_path"], "wb") as f:
+        pickle.dump(pd.DataFrame({"score": [0.5, 1.0]}), f)
+
+
+def test_written_result_is_committed(tmp_path):
+    payload = graph_payload(tmp_path)
+    commit_graph_result(write_result, payload)
+    assert is_complete(tmp_path / "7")
+    assert pd.read_pickle(payload["output_path"]).shape == (2, 1)
+    assert (tmp_path / "results" / "part-7.csv").exists()
+
+
+def test_graph_without_a_result_is_not_complete(tmp_path):
+    with pytest.raises(RuntimeError, match="not marked complete"):
+        commit_graph_result(lambda payload: None, graph_payload(tmp_path))
+    assert not is_complete(tmp_path / "7")
+
+
+def test_failed_graph_leaves_no_partial_result(tmp_path):
+    def fail(payload):
+        payload["output_path"].write_bytes(b"partial")
+        raise ValueError("boom")
+
+    with pytest.raises(ValueError):
+        commit_graph_result(fail, graph_payload(tmp_path))
+    assert not is_complete(tmp_path / "7")
+    assert list((tmp_path / "7").iterdir()) == []
+
+
+def test_frames_of_a_mixed_result_are_committed(tmp_path):
+    from sklearn.linear_model import LogisticRegression
+
+    frame = pd.DataFrame({"score": [0.5, 1.0], "label": [0, 1]})
+    model = LogisticRegression().fit(frame[["score"]], frame["label"])
+
+    def write_mixed_result(payload):
+        with open(payload["output_path"], "wb") as f:
+            pickle.dump([frame, frame, model], f)
+
+    payload = graph_payload(tmp_path)
+    commit_graph_result(write_mixed_result, payload)
+    assert is_complete(tmp_path / "7")
+    part = pd.read_csv(tmp_path / "results" / "part-7.csv")
+    assert part.shape == (4, 3)
+    assert part["network_index"].eq(7).all()
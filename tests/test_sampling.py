@@ -0,0 +1,63 @@
+import networkx as nx
+import numpy as np
+import pytest
+
+from eelp.models.sampling import GraphSampler
+
+
+@pytest.fixture
+def graph():
+    return nx.powerlaw_cluster_graph(300, 4, 0.3, seed=6)
+
+
+def edge_set(edge_graph):
+    return set(edge_graph.keys.tolist())
+
+
+def is_induced(edge_graph, orig):
+    nodes = np.zeros(orig.num_nodes, dtype=bool)
+    nodes[edge_graph.edges.ravel()] = True
+    edges = orig.edges
+    return edge_set(edge_graph) == set(orig.keys[nodes[edges[:, 0]] & nodes[edges[:, 1]]].tolist())
+
+
+@pytest.mark.parametrize("sampling_method", ["rs", "rswi", "hnes"])
+def test_split_replicates_are_nested_and_reproducible(graph, sampling_method):
+    sampler = GraphSampler(graph, sampling_method, backend="array", random_state=0)
+    splits = sampler.create_split_replicates(seeds=[1, 2, 3], alphas=[0.8, 0.6, 0.8])
+    again = sampler.create_split_replicates(seeds=[1, 2, 3], alphas=[0.8, 0.6, 0.8])
+    orig = sampler.orig_edges_
+    num_edges = orig.number_of_edges()
+    for (ho, tr), (ho_again, tr_again), alpha in zip(splits, again, [0.8, 0.6, 0.8]):
+        # induction may add back every edge of a dense sample
+        assert edge_set(tr) <= edge_set(ho) <= edge_set(orig)
+        assert edge_set(ho) == edge_set(ho_again) and edge_set(tr) == edge_set(tr_again)
+        if sampling_method == "rswi":
+            assert ho.number_of_edges() >= int(alpha * num_edges)
+            assert is_induced(ho, orig) and is_induced(tr, ho)
+        else:
+            assert edge_set(tr) < edge_set(ho) < edge_set(orig)
+            assert ho.number_of_edges() == int(alpha * num_edges)
+            assert tr.number_of_edges() == int(0.8 * ho.number_of_edges())
+    if sampling_method != "rswi":
+        assert edge_set(splits[0][0]) != edge_set(splits[2][0])
+
+
+def test_random_edge_replicates_are_uniform(graph):
+    sampler = GraphSampler(graph, "rs", alpha=0.5, alpha_=0.5, backend="array", random_state=0)
+    splits = sampler.create_split_replicates(num_replicates=2000)
+    keys = sampler.orig_edges_.keys
+    ho_rate = np.mean([np.isin(keys, ho.keys) for ho, _ in splits], axis=0)
+    tr_rate = np.mean([np.isin(keys, tr.keys) for _, tr in splits], axis=0)
+    # 4 standard deviations of a binomial rate over 2000 replicates
+    np.testing.assert_allclose(ho_rate, 0.5, atol=4 * np.sqrt(0.25 / 2000))
+    np.testing.assert_allclose(tr_rate, 0.25, atol=4 * np.sqrt(0.1875 / 2000))
+
+
+def test_array_backend_sample_labels_pairs(graph):
+    sampler = GraphSampler(graph, backend="array", negative_sampling="rejection", random_state=0)
+    tr_sample, ho_sample = sampler.sample(num_samples=50)
+    for sample, orig in ((tr_sample, sampler.G_ho), (ho_sample, graph)):
+        assert sample.shape == (100, 3)
+        is_edge = [orig.has_edge(i, j) for i, j in zip(sample["node_i"], sample["node_j"])]
+        assert (np.array(is_edge) == (sample["label"] == 1)).all()
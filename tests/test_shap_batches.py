@@ -0,0 +1,98 @@
+import pickle
+from functools import partial
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from eelp.models.result_sink import RESULT_FILE, commit_graph_result
+from eelp.models.shap_batches import (
+    BatchSink,
+    commit_shap,
+    explain_graph,
+    explain_in_batches,
+    is_shap_complete,
+)
+
+
+def shap_payload(graph_path, batch_size, force=False):
+    return {
+        "graph_paths": [graph_path],
+        "batch_size": batch_size,
+        "background_size": 20,
+        "shap_path": graph_path / "shap_values",
+        "force": force,
+    }
+
+
+def test_batches_resume_and_are_keyed_by_batch_size(tmp_path):
+    X = np.arange(50.0).reshape(25, 2)
+    sink = BatchSink(tmp_path, 10)
+    assert explain_in_batches(lambda batch: batch * 2, X, 10, sink) == 3
+    assert explain_in_batches(lambda batch: batch * 2, X, 10, sink) == 0
+    np.testing.assert_array_equal(sink.load(), X * 2)
+    other = BatchSink(tmp_path, 7)
+    assert other.missing(25) == [0, 1, 2, 3]
+    other.clear(other_sizes_only=True)
+    assert sink.missing(25) == [0, 1, 2]
+
+
+def test_graph_with_missing_batches_is_not_complete(tmp_path):
+    payload = shap_payload(tmp_path, 10)
+    with pytest.raises(RuntimeError, match="not marked complete"):
+        commit_shap(lambda payload: 25, payload)
+    assert not is_shap_complete(tmp_path)
+
+
+def test_graph_with_all_batches_is_complete(tmp_path):
+    payload = shap_payload(tmp_path, 10)
+
+    def explain(payload):
+        X = np.ones((25, 3))
+        explain_in_batches(lambda batch: batch, X, 10, BatchSink(payload["shap_path"], 10))
+        return X.shape[0]
+
+    assert commit_shap(explain, payload) == tmp_path
+    assert is_shap_complete(tmp_path)
+
+
+def committed_graph(tmp_path, num_rows):
+    payload = {
+        "input_graphs": [{"network_index": 3}],
+        "output_path": tmp_path / "3" / RESULT_FILE,
+        "results_path": tmp_path / "results",
+        "results_format": "csv",
+    }
+    payload["output_path"].parent.mkdir()
+
+    def write_result(payload):
+        with open(payload["output_path"], "wb") as f:
+            pickle.dump([pd.DataFrame({"score": np.arange(num_rows)}), "model"], f)
+
+    commit_graph_result(write_result, payload)
+    return tmp_path / "3"
+
+
+def test_explain_graph_calls_explain_once_per_missing_batch(tmp_path):
+    graph_path = committed_graph(tmp_path, 25)
+    calls = []
+
+    def explain(payload):
+        calls.append((payload["batch_index"], payload["rows"]))
+        start, stop = payload["rows"]
+        return np.arange(start, stop, dtype=np.float64)
+
+    payload = shap_payload(graph_path, 10)
+    commit_shap(partial(explain_graph, explain), payload)
+    assert calls == [(0, (0, 10)), (1, (10, 20)), (2, (20, 25))]
+    np.testing.assert_array_equal(BatchSink(payload["shap_path"], 10).load(), np.arange(25))
+    assert is_shap_complete(graph_path)
+
+    # an interrupted graph only explains the batches that are missing
+    BatchSink(payload["shap_path"], 10).path(1).unlink()
+    calls.clear()
+    explain_graph(explain, payload)
+    assert calls == [(1, (10, 20))]
+    calls.clear()
+    explain_graph(explain, shap_payload(graph_path, 10, force=True))
+    assert [batch_index for batch_index, _ in calls] == [0, 1, 2]
@@ -1,13 +1,30 @@
 import logging
 import pickle
+from functools import partial
 from logging.handlers import TimedRotatingFileHandler
 from multiprocessing import Pool, cpu_count
 from pathlib import Path
 
 import click
-import numpy as np
 
-from eelp.utils.parallel_utils import chunk, process_graphs
+from eelp.models import JsonlSink, set_fit_cache, set_instrumentation
+from eelp.models._instrument import MEMORY_MODES, emit, forward_records
+from eelp.models.edge_store import (
+    EdgeStore,
+    call_with_edges,
+    source_fingerprint,
+    write_edge_store,
+)
+from eelp.models.result_sink import (
+    RESULT_FILE,
+    RESULT_FORMATS,
+    RESULTS_DIR,
+    append_manifest,
+    commit_graph_result,
+    is_complete,
+)
+from eelp.models.scheduling import CostModel, append_timing, timed_call
+from eelp.utils.parallel_utils import process_graphs
 
 
 @click.command()
@@ -24,19 +41,91 @@ from eelp.utils.parallel_utils import chunk, process_graphs
     "--sampling-method", type=click.Choice(["rs", "rswi", "hnes"]), default="rs", show_default=True
 )
 @click.option("--num-procs", type=click.INT, default=-1)
-def main(input_data_path, output_path, num_samples, sampling_method, num_procs):
+@click.option(
+    "--cache-dir",
+    type=click.Path(file_okay=False),
+    default=None,
+    help="Directory of the fitted scorer cache shared by all processes, disabled if unset.",
+)
+@click.option("--cache-max-bytes", type=click.INT, default=2**30, show_default=True)
+@click.option(
+    "--timings-path",
+    type=click.Path(dir_okay=False),
+    default=None,
+    help="JSON lines log of per-graph run times used to calibrate the scheduling cost model, "
+    "defaults to graph_timings.jsonl in the output path.",
+)
+@click.option(
+    "--edge-store",
+    "edge_store_path",
+    type=click.Path(file_okay=False),
+    default=None,
+    help="Directory of the memory-mapped edge store, written from the input data if missing. "
+    "Defaults to edge_store in the output path.",
+)
+@click.option(
+    "--resume", is_flag=True, default=False, help="Skip graphs completed by an earlier run."
+)
+@click.option(
+    "--results-format", type=click.Choice(RESULT_FORMATS), default="parquet", show_default=True
+)
+@click.option(
+    "--instrument-path",
+    type=click.Path(dir_okay=False),
+    default=None,
+    help="JSON lines log of the time and rows of every scorer fit and transform, "
+    "disabled if unset.",
+)
+@click.option(
+    "--instrument-memory",
+    type=click.Choice(MEMORY_MODES),
+    default=None,
+    help="Also record the peak memory growth of every scorer call, of the traced Python and "
+    "NumPy allocations with tracemalloc, or of the process resident set with resource.",
+)
+def main(
+    input_data_path,
+    output_path,
+    num_samples,
+    sampling_method,
+    num_procs,
+    cache_dir,
+    cache_max_bytes,
+    timings_path,
+    edge_store_path,
+    resume,
+    results_format,
+    instrument_path,
+    instrument_memory,
+):
     # Determine the number of concurrent processes to launch
     procs = num_procs if num_procs > 0 else cpu_count()
+    if cache_dir is not None:
+        # the workers inherit the cache location through the environment
+        set_fit_cache(Path(cache_dir).resolve(), cache_max_bytes)
     output_path = Path(output_path).resolve()
-    proc_ids = list(range(0, procs))
-    # Load input data
-    logging.info("Grabbing Input Data")
-    with open(input_data_path, "rb") as f:
-        df = pickle.load(f)
+    # Ingest the edge lists into a memory-mapped edge store once, later runs and the
+    # workers read the edges from it without unpickling or copying them
+    edge_store_path = Path(edge_store_path) if edge_store_path else output_path / "edge_store"
+    source = source_fingerprint(input_data_path)
+    if EdgeStore.exists(edge_store_path):
+        # a store written from another input would silently train on its edges
+        try:
+            EdgeStore.check_source(edge_store_path, source)
+        except ValueError as err:
+            raise click.ClickException(str(err))
+    else:
+        logging.info("Grabbing Input Data")
+        with open(input_data_path, "rb") as f:
+            df = pickle.load(f)
+        logging.info("Writing edge store to {}".format(edge_store_path))
+        write_edge_store(df, edge_store_path, source=source)
+        del df
+    store = EdgeStore(edge_store_path)
     # Create graph meta dictionaries
     input_graphs = []
     logging.info("Creating output directories")
-    for row in df.itertuples(index=False):
+    for row in store.metadata.itertuples(index=False):
         graph_out_path = output_path / f"{int(row.network_index)}"
         graph_out_path.mkdir(exist_ok=True, parents=True)
         input_graphs.append(
@@ -44,42 +133,76 @@ def main(input_data_path, output_path, num_samples, sampling_method, num_procs):
                 "level_0": int(row.level_0),
                 "network_index": int(row.network_index),
                 "network_name": row.network_name,
-                "num_nodes": int(row.number_nodes),
-                "num_edges": int(row.number_edges),
-                "edge_list": row.edges_id,
+                "num_nodes": int(row.num_nodes),
+                "num_edges": int(row.num_edges),
+                "edge_store": str(store.directory),
+                "offset": int(row.offset),
+                "length": int(row.length),
                 "output_path": graph_out_path,
             }
         )
-    # Divide the graphs into chunks to be consumed by each process
-    num_graphs_per_proc = len(input_graphs) / float(procs)
-    num_graphs_per_proc = int(np.ceil(num_graphs_per_proc))
-    chunked_graphs = chunk(input_graphs, num_graphs_per_proc)
-    # initialize the list of payloads
+    # Schedule graphs one at a time, most expensive first, so that the largest networks
+    # start early and the remaining workers keep pulling the smaller ones
+    timings_path = Path(timings_path) if timings_path else output_path / "graph_timings.jsonl"
+    cost_model = CostModel.from_log(timings_path)
+    if resume:
+        pending = [g for g in input_graphs if not is_complete(g["output_path"])]
+        logger.info(
+            "Resuming, {} of {} graphs already done".format(
+                len(input_graphs) - len(pending), len(input_graphs)
+            )
+        )
+        input_graphs = pending
     payloads = []
+    for i, graph in enumerate(cost_model.order(input_graphs)):
+        payloads.append(
+            {
+                "id": i,
+                "input_graphs": [graph],
+                "output_path": graph["output_path"] / RESULT_FILE,
+                "results_path": output_path / RESULTS_DIR,
+                "results_format": results_format,
+                "num_samples": num_samples,
+                "sampling_method": sampling_method,
+            }
+        )
 
-    # loop over the set chunked graph sets
-    for i, graph_set in enumerate(chunked_graphs):
-        # construct the path to the output intermediary file for the
-        # current process
-        pickle_output_path = Path(output_path) / f"proc_{i}.pickle"
-
-        # construct a dictionary of data for the payload, then add it
-        # to the payloads list
-        data = {
-            "id": i,
-            "input_graphs": graph_set,
-            "output_path": pickle_output_path,
-            "num_samples": num_samples,
-            "sampling_method": sampling_method,
-        }
-        payloads.append(data)
+    process = partial(
+        timed_call, partial(commit_graph_result, partial(call_with_edges, process_graphs))
+    )
+    if instrument_path is not None:
+        # the workers return the scorer records of every graph, written here
+        set_instrumentation(JsonlSink(instrument_path), memory=instrument_memory)
+        process = partial(forward_records, process)
 
     # Now we use multiprocessing
     logger.info("Launching pool using {} processes...".format(procs))
-    pool = Pool(processes=procs)
-    pool.map(process_graphs, payloads)
-    pool.close()
-    pool.join()
+    with Pool(processes=procs) as pool:
+        for record in pool.imap_unordered(process, payloads):
+            if instrument_path is not None:
+                record, scorer_records = record
+                for scorer_record in scorer_records:
+                    emit(scorer_record)
+                if scorer_records:
+                    slowest = max(scorer_records, key=lambda r: r["seconds"])
+                    logger.info(
+                        "Slowest scorer of network {}: {} {} in {:.1f}s".format(
+                            ", ".join(map(str, record["network_indices"])),
+                            slowest["scorer"],
+                            slowest["phase"],
+                            slowest["seconds"],
+                        )
+                    )
+            append_timing(timings_path, record)
+            append_manifest(output_path, record)
+            logger.info(
+                "Processed network {} ({} nodes, {} edges) in {:.1f}s".format(
+                    ", ".join(map(str, record["network_indices"])),
+                    record["num_nodes"],
+                    record["num_edges"],
+                    record["seconds"],
+                )
+            )
     logger.info("Multiprocessing complete")
 
 